@@ -0,0 +1,119 @@
+"""
+ROI 直方图自动阈值
+
+只在目标 ROI 上统计直方图求分割阈值，再做指数平滑和滞回：平滑值偏离当前
+阈值超过 hysteresis 才更新，阈值不会逐帧抖动导致检测结果闪烁；测量值与平滑值
+相差超过 snap 时视为光照突变，直接跳到测量值。直方图只读
+ROI 一遍、不改写图像，开销只是整帧 histeq 的一小部分。
+
+复位（调参、加载方案）后第一次成功测得的阈值记为参考电平：学习值从它开始，
+限制在参考电平 ± window 内，遇到误检的候选也不会跑偏。固定阈值（滑块、方案
+里的值）是在调参时的光照下定的，shifted() 只按学习值相对参考电平的漂移平移它们，
+不用 Otsu 阈值与滑块中点之间本来就有的差。调用方先用更新前的阈值判断候选，
+只用通过判断的候选学习：
+
+    auto = AutoThreshold(initial=(black + center) // 2, window=40)
+    b, c = auto.shifted(black, center)          # 边框/中心阈值随光照漂移平移，间距不变
+    if border_mean < b and center_mean > c:
+        if auto.update(gray, roi=rect.rect()):  # 阈值变化时返回 True，下一帧起生效
+            redraw_labels()
+
+method:
+    "otsu"  Otsu 分出暗、亮两类，阈值取两类均值的中点（暗框/白纸两侧余量相同）
+    0~1     取该百分位，已知暗区在 ROI 中的占比时使用
+ROI 的 5%~95% 百分位相差不到 min_contrast（没有目标、过曝、全黑）时不更新，
+保持上一次的阈值。
+"""
+
+
+class AutoThreshold:
+    def __init__(self, initial=128, method="otsu", alpha=0.3, hysteresis=3, snap=24,
+                 min_contrast=40, bins=64, lo=0, hi=255, window=None):
+        self.method = method
+        self.alpha = alpha
+        self.hysteresis = hysteresis
+        self.snap = snap
+        self.min_contrast = min_contrast
+        self.bins = bins
+        self.window = window     # 学习值相对参考电平的最大偏移，None 时只受 lo/hi 限制
+        self._lo = lo
+        self._hi = hi
+        self.ref = None          # 参考电平，复位后第一次成功测量时记录；shifted() 以它为零点
+        self.lo = lo             # 当前允许的范围
+        self.hi = hi
+        self.value = initial     # 当前使用的阈值，测到参考电平之前为初值
+        self.raw = None          # 最近一次测得的阈值（未平滑）
+        self.updates = 0         # 阈值实际变化的次数
+        self.held = 0            # 因对比度不足而保持的次数
+        self.reset(initial)
+
+    def _centre(self, value):
+        self._smooth = float(value)
+        if self.window is not None:
+            self.lo = max(self._lo, value - self.window)
+            self.hi = min(self._hi, value + self.window)
+
+    def reset(self, value):
+        """手动设定阈值（调参、加载方案），丢弃参考电平，下一次成功测量时重新记录"""
+        self.value = value
+        self.ref = None
+        self._centre(value)
+
+    def shifted(self, *thresholds):
+        """一组固定阈值按学习值相对参考电平的漂移平移，返回元组；还没有参考电平时不平移"""
+        d = 0 if self.ref is None else self.value - self.ref
+        return tuple(t + d for t in thresholds)
+
+    def measure(self, img, roi=None):
+        """ROI 的分割阈值，对比度不足时返回 None"""
+        hist = img.get_histogram(roi=roi, bins=self.bins)
+        if hist.get_percentile(0.95).value() - hist.get_percentile(0.05).value() < self.min_contrast:
+            return None
+        if self.method != "otsu":
+            return hist.get_percentile(self.method).value()
+
+        # get_threshold 给出暗类的最后一个 bin，两类均值由 bins 累加得到
+        bins = hist.bins()
+        n = len(bins)
+        split = (hist.get_threshold().value() * (n - 1) + 254) // 255
+        w0 = m0 = w1 = m1 = 0.0
+        for i in range(n):
+            p = bins[i]
+            if i <= split:
+                w0 += p
+                m0 += p * i
+            else:
+                w1 += p
+                m1 += p * i
+        if w0 == 0 or w1 == 0:
+            return None
+        return int((m0 / w0 + m1 / w1) * 0.5 * 255 / (n - 1) + 0.5)
+
+    def update(self, img, roi=None):
+        """测量并平滑，阈值变化时返回 True"""
+        raw = self.measure(img, roi)
+        if raw is None:
+            self.held += 1
+            return False
+        self.raw = raw
+        if self.ref is None:
+            # 复位后第一次测量：记为参考电平，允许范围以它为中心
+            self.ref = raw
+            self._centre(raw)
+            if raw == self.value:
+                return False
+            self.value = raw
+            self.updates += 1
+            return True
+        if abs(raw - self._smooth) > self.snap:
+            self._smooth = float(raw)        # 光照突变（开灯、转向强光）直接跟上
+        else:
+            self._smooth += self.alpha * (raw - self._smooth)
+        # 平滑值也钳在范围内，离开边界时不用先把越界的部分追回来
+        self._smooth = max(self.lo, min(self.hi, self._smooth))
+        target = int(self._smooth + 0.5)
+        if abs(target - self.value) <= self.hysteresis:
+            return False
+        self.value = target
+        self.updates += 1
+        return True
@@ -0,0 +1,319 @@
+"""
+detect_outer_rectangle 回放基准
+
+在同一组录制/合成帧上依次运行 serial2.py、get_rect.py、tuoji可调.py 中的
+detect_outer_rectangle，报告帧率、各阶段 p50/p99 耗时以及检出率。
+
+    python bench_rect.py --frames 200
+    python bench_rect.py --corpus venue.npz --json now.json --baseline last.json
+
+阶段划分（按独占时间统计，嵌套调用不会重复计时）:
+    grayscale   to_grayscale
+    pool        mean_pooled / 带缩放的 draw_image（金字塔粗搜的池化小图）
+    find_rects  find_rects（含金字塔在池化小图上的粗搜）
+    statistics  get_statistics / get_histogram（自动阈值）
+    draw        draw_*
+    log         print
+    uart        send_uart_data（仅 serial2）
+    select      其余时间，即候选筛选与判断逻辑
+计时通过替换仿真 Image 类的方法实现，脚本内部新建的图像（池化小图、
+FrameContext 的缓冲区）上的调用同样计入对应阶段。
+"""
+import argparse
+import builtins
+import importlib.util
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, "emu"))
+
+import hostboard  # noqa: E402
+
+hostboard.install()
+
+import numpy as np  # noqa: E402
+
+import frames  # noqa: E402
+from image import Image  # noqa: E402
+
+# ================ 被测版本 ================
+VARIANTS = {
+    "serial2": "serial2.py",
+    "get_rect": "get_rect.py",
+    "tuoji": "tuoji可调.py",
+}
+
+STAGES = ("grayscale", "pool", "find_rects", "select", "statistics", "draw", "log", "uart")
+
+_METHOD_STAGE = {
+    "to_grayscale": "grayscale",
+    "mean_pooled": "pool",
+    "find_rects": "find_rects",
+    "get_statistics": "statistics",
+    "get_histogram": "statistics",
+}
+
+
+class StageClock:
+    """按阶段累计独占耗时（秒）"""
+
+    def __init__(self):
+        self.frame = {}
+        self._stack = []
+
+    def reset(self):
+        self.frame = dict.fromkeys(STAGES, 0.0)
+
+    def run(self, stage, fn, *args, **kwargs):
+        t0 = time.perf_counter()
+        self._stack.append(0.0)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            child = self._stack.pop()
+            dt = time.perf_counter() - t0
+            self.frame[stage] += dt - child
+            if self._stack:
+                self._stack[-1] += dt
+
+
+class ImageTimer:
+    """
+    把 Image 类的方法换成计时版本：按方法名把耗时记到对应阶段，
+    并记下本帧图像 img 上第一次画出的矩形
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.img = None
+        self.probe = {}
+        self._saved = {}
+
+    def install(self):
+        for name in dir(Image):
+            stage = _METHOD_STAGE.get(name, "draw" if name.startswith("draw_") else None)
+            if stage is not None:
+                self._saved[name] = getattr(Image, name)
+                setattr(Image, name, self._wrap(name, self._saved[name], stage))
+        return self
+
+    def uninstall(self):
+        for name, fn in self._saved.items():
+            setattr(Image, name, fn)
+        self._saved.clear()
+
+    def frame(self, img):
+        """开始新的一帧"""
+        self.img = img
+        self.probe = {}
+
+    def _wrap(self, name, fn, stage):
+        timer = self
+
+        def call(img, *args, **kwargs):
+            s = stage
+            if name == "draw_image" and (kwargs.get("x_scale", 1) != 1 or kwargs.get("y_scale", 1) != 1):
+                s = "pool"      # 按 AREA 缩小即均值池化（FrameContext.pooled）
+            elif name == "draw_rectangle" and img is timer.img and timer.probe.get("rect") is None:
+                timer.probe["rect"] = tuple(args[0][:4]) if len(args) == 1 else tuple(args[:4])
+            return timer.clock.run(s, fn, img, *args, **kwargs)
+
+        return call
+
+
+def load_variant(name):
+    """以独立模块名加载脚本（不会执行 main）"""
+    path = os.path.join(ROOT, VARIANTS[name])
+    spec = importlib.util.spec_from_file_location(f"bench_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def scale_truth(truth, sx, sy):
+    if truth is None or truth.get("rect") is None:
+        return None
+    x, y, w, h = truth["rect"]
+    return (x * sx, y * sy, w * sx, h * sy)
+
+
+def iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union else 0.0
+
+
+def bench_variant(name, corpus, truths, warmup=3):
+    """返回 {stage: 每帧耗时数组(ms)}、总耗时数组和检出统计"""
+    module = load_variant(name)
+    clock = StageClock()
+    devnull = open(os.devnull, "w")
+
+    def timed_print(*args, **kwargs):
+        kwargs["file"] = devnull
+        clock.run("log", builtins.print, *args, **kwargs)
+
+    module.print = timed_print
+    if hasattr(module, "send_uart_data"):
+        import machine
+        module.uart = machine.UART(module.UART_PORT, baudrate=module.UART_BAUDRATE)
+        module.last_send_time = -1000
+        send = module.send_uart_data
+
+        def timed_send(*args, **kwargs):
+            module.last_send_time = -1000   # 回放不受 50Hz 限速影响
+            return clock.run("uart", send, *args, **kwargs)
+
+        module.send_uart_data = timed_send
+
+    width, height = module.DETECT_WIDTH, module.DETECT_HEIGHT
+    per_stage = {s: [] for s in STAGES}
+    totals = []
+    counts = {"frames": 0, "targets": 0, "hits": 0, "false_pos": 0}
+    by_light = {}
+
+    timer = ImageTimer(clock).install()
+    try:
+        for i, frame in enumerate(corpus):
+            src_h, src_w = frame.shape[:2]
+            img = Image.from_array(frames.fit_frame(frame, width, height))
+            timer.frame(img)
+            if hasattr(module, "frame"):
+                module.frame.reset(img)
+            clock.reset()
+            t0 = time.perf_counter()
+            ok = clock.run("select", module.detect_outer_rectangle, img)
+            total = time.perf_counter() - t0
+            if i < warmup:
+                continue
+
+            for s in STAGES:
+                per_stage[s].append(clock.frame[s] * 1000.0)
+            totals.append(total * 1000.0)
+
+            truth = truths[i] if truths else None
+            expect = scale_truth(truth, width / src_w, height / src_h)
+            counts["frames"] += 1
+            light = (truth or {}).get("lighting", "-")
+            lb = by_light.setdefault(light, [0, 0])
+            if expect is not None:
+                counts["targets"] += 1
+                lb[0] += 1
+                if ok and timer.probe.get("rect") and iou(timer.probe["rect"], expect) > 0.5:
+                    counts["hits"] += 1
+                    lb[1] += 1
+            elif ok and truths:
+                counts["false_pos"] += 1
+    finally:
+        timer.uninstall()
+
+    devnull.close()
+    return {
+        "stages": {s: np.array(v) for s, v in per_stage.items()},
+        "total": np.array(totals),
+        "counts": counts,
+        "by_lighting": by_light,
+    }
+
+
+def summarize(result):
+    total = result["total"]
+    c = result["counts"]
+    out = {
+        "fps": 1000.0 / total.mean() if len(total) else 0.0,
+        "total_p50": float(np.percentile(total, 50)) if len(total) else 0.0,
+        "total_p99": float(np.percentile(total, 99)) if len(total) else 0.0,
+        "hit_rate": c["hits"] / c["targets"] if c["targets"] else None,
+        "false_pos": c["false_pos"],
+        "stages": {},
+        "by_lighting": {k: (v[1] / v[0] if v[0] else None) for k, v in result["by_lighting"].items()},
+    }
+    for s, v in result["stages"].items():
+        if len(v) and v.max() > 0:
+            out["stages"][s] = [float(np.percentile(v, 50)), float(np.percentile(v, 99))]
+    return out
+
+
+def print_report(reports):
+    print(f"{'variant':<10}{'fps':>8}{'p50 ms':>9}{'p99 ms':>9}{'hit':>8}{'fp':>5}")
+    for name, r in reports.items():
+        hit = "-" if r["hit_rate"] is None else f"{r['hit_rate'] * 100:.1f}%"
+        print(f"{name:<10}{r['fps']:>8.1f}{r['total_p50']:>9.2f}{r['total_p99']:>9.2f}{hit:>8}{r['false_pos']:>5}")
+    print()
+    print(f"{'stage p50/p99 ms':<18}" + "".join(f"{n:>18}" for n in reports))
+    for s in STAGES:
+        cells = []
+        for r in reports.values():
+            v = r["stages"].get(s)
+            cells.append("-" if v is None else f"{v[0]:.2f}/{v[1]:.2f}")
+        print(f"{s:<18}" + "".join(f"{c:>18}" for c in cells))
+    lights = sorted({k for r in reports.values() for k in r["by_lighting"]})
+    if lights and lights != ["-"]:
+        print()
+        print(f"{'hit by lighting':<18}" + "".join(f"{n:>18}" for n in reports))
+        for light in lights:
+            cells = []
+            for r in reports.values():
+                v = r["by_lighting"].get(light)
+                cells.append("-" if v is None else f"{v * 100:.1f}%")
+            print(f"{light:<18}" + "".join(f"{c:>18}" for c in cells))
+
+
+def compare(reports, baseline, tolerance):
+    """与基线对比，返回回退项列表"""
+    problems = []
+    for name, r in reports.items():
+        b = baseline.get(name)
+        if not b:
+            continue
+        if r["total_p50"] > b["total_p50"] * (1 + tolerance):
+            problems.append(f"{name}: p50 {b['total_p50']:.2f} -> {r['total_p50']:.2f} ms")
+        if b["hit_rate"] is not None and r["hit_rate"] is not None and r["hit_rate"] < b["hit_rate"] - 0.02:
+            problems.append(f"{name}: hit rate {b['hit_rate']:.3f} -> {r['hit_rate']:.3f}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="detect_outer_rectangle 回放基准")
+    parser.add_argument("--corpus", help="录制帧语料（.npz 或 .npy 目录），缺省使用合成帧")
+    parser.add_argument("--frames", type=int, default=120, help="合成帧数量")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--lighting", action="append", help="只用指定光照的合成帧，可重复")
+    parser.add_argument("--variant", action="append", choices=sorted(VARIANTS), help="只测指定版本，可重复")
+    parser.add_argument("--json", help="把结果写入 JSON")
+    parser.add_argument("--baseline", help="与之前的 JSON 结果对比，回退时返回非零")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的 p50 变慢比例（主机计时有抖动）")
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        corpus, truths = frames.load_corpus(args.corpus)
+    else:
+        corpus, truths = frames.synthetic_corpus(args.frames, 640, 480, seed=args.seed,
+                                                 lightings=args.lighting)
+
+    reports = {}
+    for name in args.variant or list(VARIANTS):
+        reports[name] = summarize(bench_variant(name, corpus, truths))
+    print_report(reports)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2, ensure_ascii=False)
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(reports, json.load(f), args.tolerance)
+        for p in problems:
+            print(f"REGRESSION {p}")
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
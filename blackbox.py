@@ -0,0 +1,162 @@
+"""
+二进制黑匣子：定长记录写入预分配环形缓冲区，替代逐帧 print
+
+    bb = Blackbox(capacity=256, level=INFO)
+    bb.log(INFO, EV_DETECT, 1, cx, cy, dx, dy, border, center, w)   # 只做一次 pack_into
+    bb.stream()                   # 低频把新记录打印到控制台（可选）
+    bb.dump(20)                   # 按需打印最近 20 条
+    bb.save("/sdcard/bb.bin")     # 保存二进制，主机上 python blackbox.py bb.bin 解析
+
+记录格式 '<IHBB8i'，40 字节: 时间戳 ms, 序号, 事件类型, 级别, 8 个 int32 字段。
+低于 level 的记录直接返回；达到 echo_level 的记录同时立即打印（缺省关闭）。
+"""
+import struct
+import time
+
+# ================ 日志级别 ================
+DEBUG = 10
+INFO = 20
+WARN = 30
+ERROR = 40
+OFF = 100
+
+LEVEL_NAMES = {DEBUG: "D", INFO: "I", WARN: "W", ERROR: "E"}
+
+# ================ 事件类型 ================
+EV_FRAME = 1
+EV_DETECT = 2
+EV_THRESH = 3
+EV_UART = 4
+EV_TOUCH = 5
+EV_ERROR = 6
+
+# 事件名和字段名，dump/解码时使用
+EVENTS = {
+    EV_FRAME: ("frame", ("frame_us", "fps_x10", "mem_free_kb")),
+    EV_DETECT: ("detect", ("found", "center_x", "center_y", "dx", "dy", "border", "center", "rect_w")),
+    EV_THRESH: ("thresh", ("black", "center", "rect")),
+    EV_UART: ("uart", ("seq", "center_x", "center_y", "dx", "dy", "dist_mm", "x_mm10", "y_mm10")),
+    EV_TOUCH: ("touch", ("x", "y", "target")),
+    EV_ERROR: ("error", ("code",)),
+}
+
+RECORD = '<IHBB8i'
+RECORD_SIZE = 40
+FILE_MAGIC = b'BBX1'
+
+
+def format_record(t, seq, kind, level, values):
+    name, fields = EVENTS.get(kind, ("ev%d" % kind, ()))
+    parts = []
+    for i, v in enumerate(values):
+        if i < len(fields):
+            parts.append("%s=%d" % (fields[i], v))
+        elif v:
+            parts.append("f%d=%d" % (i, v))
+    return "[%s %d #%d] %s %s" % (LEVEL_NAMES.get(level, level), t, seq, name, " ".join(parts))
+
+
+class Blackbox:
+    def __init__(self, capacity=256, level=INFO, echo_level=OFF,
+                 stream_level=OFF, stream_interval_ms=500, stream_max=4):
+        self.capacity = capacity
+        self.level = level
+        self.echo_level = echo_level
+        self.stream_level = stream_level
+        self.stream_interval_ms = stream_interval_ms
+        self.stream_max = stream_max
+        self.buf = bytearray(capacity * RECORD_SIZE)
+        self.head = 0          # 下一条写入位置
+        self.count = 0         # 有效记录数
+        self.seq = 0           # 累计记录数
+        self._streamed = 0     # 已经 stream 到的 seq
+        self._last_stream = time.ticks_ms()
+
+    def log(self, level, kind, a=0, b=0, c=0, d=0, e=0, f=0, g=0, h=0):
+        if level < self.level:
+            return
+        t = time.ticks_ms()
+        struct.pack_into(RECORD, self.buf, self.head * RECORD_SIZE, t & 0xFFFFFFFF,
+                         self.seq & 0xFFFF, kind, level,
+                         int(a), int(b), int(c), int(d), int(e), int(f), int(g), int(h))
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+        self.seq += 1
+        if level >= self.echo_level:
+            print(format_record(t, (self.seq - 1) & 0xFFFF, kind, level, (a, b, c, d, e, f, g, h)))
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def records(self, last=None):
+        """按时间顺序返回最近 last 条记录 (t, seq, kind, level, values)"""
+        n = self.count if last is None else min(last, self.count)
+        out = []
+        for i in range(self.count - n, self.count):
+            idx = (self.head - self.count + i) % self.capacity
+            r = struct.unpack_from(RECORD, self.buf, idx * RECORD_SIZE)
+            out.append((r[0], r[1], r[2], r[3], r[4:]))
+        return out
+
+    def dump(self, last=None, min_level=DEBUG):
+        """打印最近的记录"""
+        for t, seq, kind, level, values in self.records(last):
+            if level >= min_level:
+                print(format_record(t, seq, kind, level, values))
+
+    def stream(self, now=None):
+        """间隔到达时打印自上次以来最多 stream_max 条新记录，其余跳过"""
+        if self.stream_level >= OFF:
+            return
+        now = time.ticks_ms() if now is None else now
+        if time.ticks_diff(now, self._last_stream) < self.stream_interval_ms:
+            return
+        self._last_stream = now
+        new = min(self.seq - self._streamed, self.count)
+        self._streamed = self.seq
+        shown = 0
+        for t, seq, kind, level, values in self.records(new):
+            if level >= self.stream_level and shown < self.stream_max:
+                print(format_record(t, seq, kind, level, values))
+                shown += 1
+
+    def save(self, path):
+        """按时间顺序保存为二进制文件"""
+        with open(path, 'wb') as f:
+            f.write(FILE_MAGIC + struct.pack('<HH', RECORD_SIZE, self.count))
+            start = (self.head - self.count) % self.capacity
+            for i in range(self.count):
+                idx = (start + i) % self.capacity
+                f.write(self.buf[idx * RECORD_SIZE:(idx + 1) * RECORD_SIZE])
+
+
+def load(path):
+    """读取 save() 的文件，返回记录列表"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:4] != FILE_MAGIC:
+        raise ValueError("not a blackbox file")
+    size, count = struct.unpack_from('<HH', data, 4)
+    out = []
+    for i in range(count):
+        r = struct.unpack_from(RECORD, data, 8 + i * size)
+        out.append((r[0], r[1], r[2], r[3], r[4:]))
+    return out
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="解析黑匣子文件")
+    parser.add_argument("path")
+    parser.add_argument("--kind", help="只显示指定事件，如 detect/uart")
+    args = parser.parse_args(argv)
+    for t, seq, kind, level, values in load(args.path):
+        if args.kind and EVENTS.get(kind, ("",))[0] != args.kind:
+            continue
+        print(format_record(t, seq, kind, level, values))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+镜头畸变标定与去畸变表生成（主机端）
+
+用棋盘格照片（分辨率与设备检测分辨率相同）拟合内参和畸变，
+再把 去畸变坐标 - 原坐标 在像素网格上量化成 undistort.py 能直接加载的表。
+设备端只校正矩形角点和激光光斑这几个点。
+
+    python calib_lens.py fit shots/*.png --pattern 9x6 --square 25 --out lens_480x320.udt
+    python calib_lens.py grid --size 480x320 --fx 500 --k1 -0.12 --k2 0.03 --out lens_480x320.udt
+
+fit 需要 opencv-python（只在主机上用于找棋盘角点和标定）；grid 直接用已知系数生成表。
+畸变模型与 OpenCV 相同: (k1, k2, p1, p2, k3)。
+"""
+import argparse
+import struct
+
+import numpy as np
+
+from undistort import HEADER, MAGIC, VERSION
+
+OFFSET_SCALE = 16   # 1/16 像素
+
+
+# ================ 畸变模型 ================
+def distort(x, y, dist):
+    """归一化坐标加上畸变"""
+    k1, k2, p1, p2, k3 = dist
+    r2 = x * x + y * y
+    radial = 1 + r2 * (k1 + r2 * (k2 + r2 * k3))
+    xd = x * radial + 2 * p1 * x * y + p2 * (r2 + 2 * x * x)
+    yd = y * radial + p1 * (r2 + 2 * y * y) + 2 * p2 * x * y
+    return xd, yd
+
+
+def undistort_normalized(xd, yd, dist, iters=20):
+    """distort 的不动点迭代逆"""
+    k1, k2, p1, p2, k3 = dist
+    x, y = np.array(xd, np.float64), np.array(yd, np.float64)
+    for _ in range(iters):
+        r2 = x * x + y * y
+        radial = 1 + r2 * (k1 + r2 * (k2 + r2 * k3))
+        dx = 2 * p1 * x * y + p2 * (r2 + 2 * x * x)
+        dy = p1 * (r2 + 2 * y * y) + 2 * p2 * x * y
+        x = (xd - dx) / radial
+        y = (yd - dy) / radial
+    return x, y
+
+
+def undistort_pixels(u, v, K, dist):
+    """像素坐标 -> 去畸变像素坐标（同一组内参）"""
+    fx, fy, cx, cy = K
+    x, y = undistort_normalized((np.asarray(u, np.float64) - cx) / fx,
+                                (np.asarray(v, np.float64) - cy) / fy, dist)
+    return x * fx + cx, y * fy + cy
+
+
+# ================ 标定 ================
+def fit(paths, pattern, square_mm):
+    """棋盘格标定，返回 (K=(fx, fy, cx, cy), dist, (width, height), 重投影 RMS, 有效张数)"""
+    try:
+        import cv2
+    except ImportError:
+        raise SystemExit("fit 需要 opencv-python: pip install opencv-python")
+    cols, rows = pattern
+    obj = np.zeros((cols * rows, 3), np.float32)
+    obj[:, :2] = np.mgrid[0:cols, 0:rows].T.reshape(-1, 2) * square_mm
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 1e-3)
+    obj_pts, img_pts, size = [], [], None
+    for path in paths:
+        gray = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            print(f"skip {path}: unreadable")
+            continue
+        if size is None:
+            size = gray.shape[::-1]
+        elif gray.shape[::-1] != size:
+            print(f"skip {path}: size {gray.shape[::-1]} != {size}")
+            continue
+        ok, corners = cv2.findChessboardCorners(gray, (cols, rows))
+        if not ok:
+            print(f"skip {path}: pattern not found")
+            continue
+        corners = cv2.cornerSubPix(gray, corners, (5, 5), (-1, -1), criteria)
+        obj_pts.append(obj)
+        img_pts.append(corners)
+    if len(obj_pts) < 3:
+        raise SystemExit(f"only {len(obj_pts)} usable images, need at least 3")
+    rms, mtx, dist, _, _ = cv2.calibrateCamera(obj_pts, img_pts, size, None, None)
+    dist = np.zeros(5) if dist is None else np.ravel(dist)[:5]
+    K = (mtx[0, 0], mtx[1, 1], mtx[0, 2], mtx[1, 2])
+    return K, tuple(float(d) for d in dist), size, rms, len(obj_pts)
+
+
+# ================ 表格 ================
+def build(K, dist, width, height, shift=4, scale=OFFSET_SCALE):
+    """生成覆盖整幅画面的偏移表，返回 (nx, ny, data(ny, nx, 2) int16)"""
+    cell = 1 << shift
+    nx = -(-width // cell) + 1
+    ny = -(-height // cell) + 1
+    gu, gv = np.meshgrid(cell * np.arange(nx), cell * np.arange(ny))
+    uu, vv = undistort_pixels(gu, gv, K, dist)
+    q = np.rint(np.stack([uu - gu, vv - gv], axis=-1) * scale)
+    if np.abs(q).max() > 32767:
+        raise ValueError("offset out of int16 range, lower the scale")
+    return nx, ny, q.astype(np.int16)
+
+
+def to_bytes(shift, nx, ny, data, size, scale=OFFSET_SCALE):
+    """size 为标定图像尺寸 (宽, 高)，写进文件头，设备端加载时核对"""
+    head = struct.pack(HEADER, MAGIC, VERSION, shift, 0, 0, 0, 0, nx, ny, scale, size[0], size[1])
+    return head + data.astype('<i2').tobytes()
+
+
+def check(path, K, dist, width, height, samples=4000, seed=0):
+    """用设备端加载器读回表格，在随机亚像素坐标上与精确模型比较，返回 (最大误差, 最大校正量) 像素"""
+    import undistort
+    table = undistort.load(path, (width, height))
+    rng = np.random.default_rng(seed)
+    us = rng.uniform(0, width - 1, samples)
+    vs = rng.uniform(0, height - 1, samples)
+    eu, ev = undistort_pixels(us, vs, K, dist)
+    err = 0.0
+    for u, v, x, y in zip(us.tolist(), vs.tolist(), eu, ev):
+        px, py = table.point(u, v)
+        err = max(err, abs(px - x), abs(py - y))
+    corr = float(np.hypot(eu - us, ev - vs).max())
+    return err, corr
+
+
+def _size(text):
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="镜头畸变标定与去畸变表生成")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_fit = sub.add_parser("fit", help="从棋盘格照片标定")
+    p_fit.add_argument("images", nargs="+")
+    p_fit.add_argument("--pattern", type=_size, default=(9, 6), help="内角点数 列x行")
+    p_fit.add_argument("--square", type=float, default=25.0, help="格子边长 (mm)")
+    p_grid = sub.add_parser("grid", help="由已知系数生成表")
+    p_grid.add_argument("--size", type=_size, default=(480, 320), help="图像尺寸 宽x高")
+    p_grid.add_argument("--fx", type=float, default=500.0)
+    p_grid.add_argument("--fy", type=float)
+    p_grid.add_argument("--cx", type=float)
+    p_grid.add_argument("--cy", type=float)
+    for name in ("k1", "k2", "p1", "p2", "k3"):
+        p_grid.add_argument(f"--{name}", type=float, default=0.0)
+    for p in (p_fit, p_grid):
+        p.add_argument("--shift", type=int, default=4, help="网格间距 = 2^shift 像素")
+        p.add_argument("--out", required=True)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "fit":
+        K, dist, (width, height), rms, n = fit(args.images, args.pattern, args.square)
+        print(f"{n} images, RMS {rms:.3f}px")
+    else:
+        width, height = args.size
+        K = (args.fx, args.fy or args.fx,
+             width / 2 if args.cx is None else args.cx,
+             height / 2 if args.cy is None else args.cy)
+        dist = (args.k1, args.k2, args.p1, args.p2, args.k3)
+
+    nx, ny, data = build(K, dist, width, height, args.shift)
+    raw = to_bytes(args.shift, nx, ny, data, (width, height))
+    with open(args.out, "wb") as f:
+        f.write(raw)
+    err, corr = check(args.out, K, dist, width, height)
+    print(f"fx={K[0]:.1f} fy={K[1]:.1f} cx={K[2]:.1f} cy={K[3]:.1f}  "
+          f"k1={dist[0]:.5f} k2={dist[1]:.5f} p1={dist[2]:.5f} p2={dist[3]:.5f} k3={dist[4]:.5f}")
+    print(f"{args.out}: {nx}x{ny} grid, cell {1 << args.shift}, {len(raw)} bytes, "
+          f"max correction {corr:.2f}px, max table error {err:.3f}px")
+    print("把 fx/cx/cy 填入 FOCAL_LENGTH_PX / PRINCIPAL_POINT，LENS_K1/K2 保持 0")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,206 +1,370 @@
+"""
+激光扫描 UV 纸仿真
+
+    python circle.py                                   # 交互动画
+    python circle.py --headless --d 8 --radius 0.5 --steps 800 --out run.npz --csv run.csv --png strip.png
+
+批量评估参数时直接调用 simulate()，不经过任何绘图:
+    for dist in np.linspace(5, 15, 50):
+        result = simulate(dist=dist, r=0.6, steps=500)
+"""
+import argparse
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
-from matplotlib.animation import FuncAnimation
-from matplotlib.collections import LineCollection
+import matplotlib
+from exposure import DoseGrid, FULL_DOSE
+from geometry import d, xy_to_angles
 
-# 参数设置
-d = 10.0  # 平面距离 z = d
+# 参数设置（平面距离 d 见 geometry.py）
 X = 4.0   # 矩形宽
 Y = 3.0   # 矩形高
 spot_size = 0.2  # 激光光斑的直径（圆形）
 radius = 0.6  # 圆的半径（6cm = 0.6m）
-exposure_intensity = 0.05  # 每次激光照射的曝光强度（0-1）
+exposure_intensity = 0.12  # 每个扫描点在光斑中心沉积的剂量，每圈 500 点时线条区域约为 FULL_DOSE 的 1.2 倍
+frame_interval = 20  # 动画帧间隔(ms)，即每个扫描点的停留时间
+dwell_time = frame_interval / 1000.0
+exposure_rate = exposure_intensity / dwell_time  # 光斑中心剂量率（每秒）
 
 # 计算步进电机角度的最大值
 alpha_max = np.arctan(Y / (2 * d))  # YZ 平面角度（y 方向电机）
 beta_max = np.arctan(X / (2 * d))   # XZ 平面角度（x 方向电机）
 
 # 定义圆形扫描路径
-def get_circle_points(steps=10):
-    theta = np.linspace(0, 2 * np.pi, steps)
-    x = radius * np.cos(theta)
-    y = radius * np.sin(theta)
-    return np.array(list(zip(x, y)))
-
-# 将平面坐标 (x, y) 转换为步进电机角度 (alpha, beta)
-def xy_to_angles(x, y):
-    alpha = np.arctan(y / d)  # YZ 平面投影角度（y 方向电机）
-    beta = np.arctan(x / d)   # XZ 平面投影角度（x 方向电机）
-    return alpha, beta
-
-# 设置画布：包含 3D 和 2D 子图
-fig = plt.figure(figsize=(12, 6))
-
-# 3D 子图：显示激光束路径
-ax_3d = fig.add_subplot(121, projection='3d')
-ax_3d.set_xlim(-X/2 - 1, X/2 + 1)
-ax_3d.set_ylim(-Y/2 - 1, Y/2 + 1)
-ax_3d.set_zlim(0, d + 1)
-ax_3d.set_xlabel('X')
-ax_3d.set_ylabel('Y')
-ax_3d.set_zlabel('Z')
-ax_3d.set_title('3D Laser Beam Path')
-
-# 绘制目标平面（UV纸）
-x_plane = np.linspace(-X/2, X/2, 10)
-y_plane = np.linspace(-Y/2, Y/2, 10)
-X_plane, Y_plane = np.meshgrid(x_plane, y_plane)
-Z_plane = np.ones_like(X_plane) * d
-ax_3d.plot_surface(X_plane, Y_plane, Z_plane, alpha=0.2, color='blue')
-
-# 绘制矩形边界
-rect_x = [-X/2, X/2, X/2, -X/2, -X/2]
-rect_y = [-Y/2, -Y/2, Y/2, Y/2, -Y/2]
-rect_z = [d, d, d, d, d]
-ax_3d.plot(rect_x, rect_y, rect_z, color='blue', linewidth=2)
-
-# 初始化激光束路径和光斑
-laser_line, = ax_3d.plot([], [], [], 'r-', label='UV Laser Beam', linewidth=2)
-laser_point_3d, = ax_3d.plot([], [], [], 'ro', label='Laser Spot', markersize=8)
-ax_3d.legend()
-
-# 2D 子图：显示UV纸上的曝光效果
-ax_2d = fig.add_subplot(122)
-ax_2d.set_xlim(-X/2 - 0.5, X/2 + 0.5)
-ax_2d.set_ylim(-Y/2 - 0.5, Y/2 + 0.5)
-ax_2d.set_xlabel('X')
-ax_2d.set_ylabel('Y')
-ax_2d.set_title('UV Paper Exposure Effect')
-ax_2d.grid(False)
-ax_2d.set_aspect('equal')
-
-# 绘制UV纸背景（初始为白色）
-uv_paper = plt.Rectangle((-X/2, -Y/2), X, Y, fill=True, facecolor='white', edgecolor='blue', linewidth=2)
-ax_2d.add_patch(uv_paper)
-
-# 初始化激光光斑（紫色，表示UV激光）
-spot_circle = plt.Circle((0, 0), spot_size/2, color='purple', alpha=0.7, label='UV Laser Spot')
-ax_2d.add_patch(spot_circle)
-
-# 初始化曝光痕迹（使用LineCollection实现渐变效果）
-exposure_segments = []
-exposure_collection = LineCollection([], linewidths=spot_size*10, colors='black', alpha=0.1)
-ax_2d.add_collection(exposure_collection)
-
-# 添加步进电机角度显示文本
-alpha_text = ax_2d.text(0.05, 0.95, 'Y Motor (α): 0.00°', transform=ax_2d.transAxes, fontsize=10)
-beta_text = ax_2d.text(0.05, 0.90, 'X Motor (β): 0.00°', transform=ax_2d.transAxes, fontsize=10)
-
-# 获取圆形扫描点
-circle_points = get_circle_points(steps=500)  # 增加点数使动画更平滑
-frame_count = len(circle_points)
-
-# 存储扫描痕迹的坐标和曝光数据
-trace_x = []
-trace_y = []
-exposure_data = np.zeros((frame_count, 2))  # 存储每个点的曝光次数
-
-# 动画状态
-paused = False
-current_frame = 0
-
-# 动画初始化函数
-def init():
-    laser_line.set_data_3d([], [], [])
-    laser_point_3d.set_data_3d([], [], [])
-    spot_circle.center = (0, 0)
-    exposure_collection.set_segments([])
-    alpha_text.set_text('Y Motor (α): 0.00°')
-    beta_text.set_text('X Motor (β): 0.00°')
-    trace_x.clear()
-    trace_y.clear()
-    exposure_data.fill(0)
-    uv_paper.set_facecolor('white')
-    return laser_line, laser_point_3d, spot_circle, exposure_collection, alpha_text, beta_text, uv_paper
-
-# 动画更新函数
-def update(frame):
-    global current_frame, exposure_data
-    
-    if not paused:
-        current_frame = frame % frame_count
-        x, y = circle_points[current_frame]
-        alpha, beta = xy_to_angles(x, y)
-        
-        # 更新 3D 激光束路径和点
-        laser_x = [0, x]
-        laser_y = [0, y]
-        laser_z = [0, d]
-        laser_line.set_data_3d(laser_x, laser_y, laser_z)
-        laser_point_3d.set_data_3d([x], [y], [d])
-        
-        # 更新 2D 光斑（紫色）
-        spot_circle.center = (x, y)
-        
-        # 记录轨迹并更新曝光数据
-        trace_x.append(x)
-        trace_y.append(y)
-        exposure_data[current_frame, 0] = x
-        exposure_data[current_frame, 1] = y
-        
-        # 创建曝光线段（模拟UV激光照射效果）
-        if len(trace_x) > 1:
-            segments = []
-            for i in range(1, len(trace_x)):
-                segments.append([(trace_x[i-1], trace_y[i-1]), 
-                                (trace_x[i], trace_y[i])])
-            
+def get_circle_points(steps=10, r=None):
+    r = radius if r is None else r
+    # 不含终点：2pi 与 0 是同一个点，含终点时该处每圈被照射两次
+    theta = np.linspace(0, 2 * np.pi, steps, endpoint=False)
+    x = r * np.cos(theta)
+    y = r * np.sin(theta)
+    return np.stack([x, y], axis=1)
+
+# 曝光轨迹环形缓冲区：最多保留 capacity 段，超出后覆盖最旧的线段
+class TrailBuffer:
+    """
+    预分配的轨迹缓冲，线段和颜色逐帧 O(1) 追加，内存不随运行时间增长
+    环按 chunk 段分块，每块对应一个 LineCollection；每帧只把写入的那一块
+    交给 matplotlib，重绘代价与轨迹总长无关
+    """
+    def __init__(self, capacity, chunk=64):
+        self.chunk = chunk
+        self.blocks = (capacity + chunk - 1) // chunk
+        self.capacity = self.blocks * chunk
+        self.segments = np.zeros((self.capacity, 2, 2))
+        self.colors = np.zeros((self.capacity, 4))
+        self.collections = []
+        self.clear()
+
+    def clear(self):
+        self.head = 0      # 下一段写入位置
+        self.count = 0     # 有效线段数
+        self.total = 0     # 累计追加的线段数，决定新线段的深浅
+        self.last = None   # 上一个光斑位置
+        self._dirty = set(range(self.blocks))
+
+    def attach(self, ax, **kwargs):
+        """为每一块创建一个 LineCollection 并加入 ax，返回全部 collection"""
+        from matplotlib.collections import LineCollection
+        self.collections = [LineCollection([], **kwargs) for _ in range(self.blocks)]
+        for c in self.collections:
+            ax.add_collection(c)
+        self._dirty = set(range(self.blocks))
+        return self.collections
+
+    def append(self, x, y):
+        if self.last is not None:
+            i = self.head
+            self.segments[i, 0] = self.last
+            self.segments[i, 1] = (x, y)
             # 根据曝光次数调整透明度（模拟UV纸逐渐变暗）
-            exposure_collection.set_segments(segments)
-            exposure_collection.set_color([(0, 0, 0, min(0.1 + exposure_intensity * i/10, 0.8)) 
-                                          for i in range(len(segments))])
-        
-        # 更新步进电机角度显示（以度为单位）
-        alpha_deg = np.degrees(alpha)
-        beta_deg = np.degrees(beta)
-        alpha_text.set_text(f'Y Motor (α): {alpha_deg:.2f}°')
-        beta_text.set_text(f'X Motor (β): {beta_deg:.2f}°')
+            self.colors[i, 3] = min(0.1 + exposure_intensity * self.total / 10, 0.8)
+            self.head = (i + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+            self.total += 1
+            self._dirty.add(i // self.chunk)
+        self.last = (x, y)
+
+    def apply(self):
+        """只更新写入过的块（绘制顺序不影响效果，无需按时间重排）"""
+        for b in self._dirty:
+            if b < len(self.collections):
+                lo = b * self.chunk
+                hi = max(lo, min(lo + self.chunk, self.count))
+                self.collections[b].set_segments(self.segments[lo:hi])
+                self.collections[b].set_color(self.colors[lo:hi])
+        self._dirty.clear()
+
+# ================ 批量（无界面）模式 ================
+def simulate(dist=None, r=None, steps=500, spot=None, intensity=None, dwell=None, cell=0.02):
+    """
+    一次性向量化计算整条轨迹、电机角度和曝光剂量
+    返回: dict，含 points/alpha/beta（弧度）/in_range/dose/extent/coverage/params
+    """
+    dist = d if dist is None else dist
+    r = radius if r is None else r
+    spot = spot_size if spot is None else spot
+    intensity = exposure_intensity if intensity is None else intensity
+    dwell = dwell_time if dwell is None else dwell
+
+    points = get_circle_points(steps, r)
+    alpha, beta = xy_to_angles(points[:, 0], points[:, 1], dist)
+    in_range = (np.abs(alpha) <= np.arctan(Y / (2 * dist))) & (np.abs(beta) <= np.arctan(X / (2 * dist)))
+
+    grid = DoseGrid(X, Y, cell)
+    grid.deposit(points[:, 0], points[:, 1], dwell, intensity / dwell, spot)
+    # 线条区域按闭合路径计算，包括最后一点回到起点的一段
+    mask = grid.line_mask(np.append(points[:, 0], points[0, 0]), np.append(points[:, 1], points[0, 1]), spot / 2)
+    return {
+        "points": points,
+        "alpha": alpha,
+        "beta": beta,
+        "in_range": in_range,
+        "dose": grid.dose,
+        "extent": np.array(grid.extent),
+        "coverage": grid.coverage(mask),
+        "params": {"d": dist, "radius": r, "steps": steps, "spot_size": spot,
+                   "exposure_intensity": intensity, "dwell_time": dwell, "cell": cell},
+    }
+
+def dose_snapshots(result, count):
+    """按时间均分的 count 张累计剂量图（用于 PNG 条带 / MP4）"""
+    p = result["params"]
+    pts = result["points"]
+    grid = DoseGrid(X, Y, p["cell"])
+    bounds = np.linspace(0, len(pts), count + 1).astype(int)
+    shots = []
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        grid.deposit(pts[a:b, 0], pts[a:b, 1], p["dwell_time"],
+                     p["exposure_intensity"] / p["dwell_time"], p["spot_size"])
+        shots.append((b, grid.dose.copy()))
+    return shots
+
+def export_results(result, out=None, csv=None, png=None, mp4=None, panels=6):
+    """把 simulate() 的结果写成 .npz / CSV，并可选输出 PNG 条带或 MP4"""
+    if out:
+        np.savez_compressed(out, points=result["points"], alpha=result["alpha"], beta=result["beta"],
+                            in_range=result["in_range"], dose=result["dose"], extent=result["extent"],
+                            **{k: np.array(v) for k, v in result["params"].items()})
+    if csv:
+        table = np.column_stack([np.arange(len(result["points"])), result["points"],
+                                 np.degrees(result["alpha"]), np.degrees(result["beta"]),
+                                 result["in_range"]])
+        np.savetxt(csv, table, delimiter=",", fmt=["%d", "%.6f", "%.6f", "%.4f", "%.4f", "%d"],
+                   header="step,x,y,alpha_deg,beta_deg,in_range", comments="")
+    if png or mp4:
+        import matplotlib.pyplot as plt
+        extent = result["extent"]
+    if png:
+        shots = dose_snapshots(result, panels)
+        fig, axes = plt.subplots(1, panels, figsize=(3 * panels, 3))
+        for ax, (step, dose) in zip(np.atleast_1d(axes), shots):
+            ax.imshow(dose, extent=extent, origin='lower', cmap='Greys', vmin=0, vmax=FULL_DOSE)
+            ax.set_title(f'step {step}')
+            ax.set_xticks([])
+            ax.set_yticks([])
+        fig.tight_layout()
+        fig.savefig(png, dpi=100)
+        plt.close(fig)
+    if mp4:
+        from matplotlib.animation import FFMpegWriter
+        shots = dose_snapshots(result, min(len(result["points"]), 100))
+        fig, ax = plt.subplots(figsize=(6, 4.5))
+        image = ax.imshow(shots[0][1], extent=extent, origin='lower', cmap='Greys', vmin=0, vmax=FULL_DOSE)
+        writer = FFMpegWriter(fps=25)
+        with writer.saving(fig, mp4, dpi=100):
+            for step, dose in shots:
+                image.set_data(dose)
+                ax.set_title(f'step {step}')
+                writer.grab_frame()
+        plt.close(fig)
+
+# ================ 交互动画 ================
+def run_interactive(steps=500):
+    """交互式 3D/2D 动画，空格键暂停/继续"""
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d import Axes3D
+    from matplotlib.animation import FuncAnimation
+
+    # 设置画布：包含 3D 和 2D 子图
+    fig = plt.figure(figsize=(12, 6))
+
+    # 3D 子图：显示激光束路径
+    ax_3d = fig.add_subplot(121, projection='3d')
+    ax_3d.set_xlim(-X/2 - 1, X/2 + 1)
+    ax_3d.set_ylim(-Y/2 - 1, Y/2 + 1)
+    ax_3d.set_zlim(0, d + 1)
+    ax_3d.set_xlabel('X')
+    ax_3d.set_ylabel('Y')
+    ax_3d.set_zlabel('Z')
+    ax_3d.set_title('3D Laser Beam Path')
+
+    # 绘制目标平面（UV纸）
+    x_plane = np.linspace(-X/2, X/2, 10)
+    y_plane = np.linspace(-Y/2, Y/2, 10)
+    X_plane, Y_plane = np.meshgrid(x_plane, y_plane)
+    Z_plane = np.ones_like(X_plane) * d
+    ax_3d.plot_surface(X_plane, Y_plane, Z_plane, alpha=0.2, color='blue')
+
+    # 绘制矩形边界
+    rect_x = [-X/2, X/2, X/2, -X/2, -X/2]
+    rect_y = [-Y/2, -Y/2, Y/2, Y/2, -Y/2]
+    rect_z = [d, d, d, d, d]
+    ax_3d.plot(rect_x, rect_y, rect_z, color='blue', linewidth=2)
+
+    # 初始化激光束路径和光斑
+    laser_line, = ax_3d.plot([], [], [], 'r-', label='UV Laser Beam', linewidth=2)
+    laser_point_3d, = ax_3d.plot([], [], [], 'ro', label='Laser Spot', markersize=8)
+    ax_3d.legend()
+
+    # 2D 子图：显示UV纸上的曝光效果
+    ax_2d = fig.add_subplot(122)
+    ax_2d.set_xlim(-X/2 - 0.5, X/2 + 0.5)
+    ax_2d.set_ylim(-Y/2 - 0.5, Y/2 + 0.5)
+    ax_2d.set_xlabel('X')
+    ax_2d.set_ylabel('Y')
+    ax_2d.set_title('UV Paper Exposure Effect')
+    ax_2d.grid(False)
+    ax_2d.set_aspect('equal')
+
+    # 绘制UV纸边框
+    uv_paper = plt.Rectangle((-X/2, -Y/2), X, Y, fill=False, edgecolor='blue', linewidth=2)
+    ax_2d.add_patch(uv_paper)
+
+    # UV纸剂量栅格：每帧在光斑位置沉积一次高斯剂量，颜色深浅即显色程度（初始为白色）
+    dose_grid = DoseGrid(X, Y, cell=0.02)
+    dose_image = ax_2d.imshow(dose_grid.dose, extent=dose_grid.extent, origin='lower',
+                              cmap='Greys', vmin=0, vmax=FULL_DOSE, zorder=0)
+
+    # 初始化激光光斑（紫色，表示UV激光）
+    spot_circle = plt.Circle((0, 0), spot_size/2, color='purple', alpha=0.7, label='UV Laser Spot')
+    ax_2d.add_patch(spot_circle)
+
+    # 添加步进电机角度显示文本
+    alpha_text = ax_2d.text(0.05, 0.95, 'Y Motor (α): 0.00°', transform=ax_2d.transAxes, fontsize=10)
+    beta_text = ax_2d.text(0.05, 0.90, 'X Motor (β): 0.00°', transform=ax_2d.transAxes, fontsize=10)
+
+    # 获取圆形扫描点
+    circle_points = get_circle_points(steps=steps)  # 增加点数使动画更平滑
+    frame_count = len(circle_points)
+
+    # 曝光轨迹环形缓冲区：保留两圈，超出后覆盖最旧的线段（分块的LineCollection实现渐变效果）
+    trail = TrailBuffer(2 * frame_count)
+    trail_collections = trail.attach(ax_2d, linewidths=spot_size*10, colors='black', alpha=0.1)
+
+    # 动画状态
+    paused = False
+    current_frame = 0
+
+    # 动画初始化函数
+    def init():
+        laser_line.set_data_3d([], [], [])
+        laser_point_3d.set_data_3d([], [], [])
+        spot_circle.center = (0, 0)
+        alpha_text.set_text('Y Motor (α): 0.00°')
+        beta_text.set_text('X Motor (β): 0.00°')
+        trail.clear()
+        trail.apply()
+        dose_grid.clear()
+        dose_image.set_data(dose_grid.dose)
+        return (laser_line, laser_point_3d, spot_circle, *trail_collections, alpha_text, beta_text, dose_image)
+
+    # 动画更新函数
+    def update(frame):
+        nonlocal current_frame
         
-        # 模拟UV纸整体曝光效果（随着时间变暗）
-        if frame > frame_count//2:
-            darken = min(0.2 + frame/(frame_count*2), 0.6)
-            uv_paper.set_facecolor((1-darken, 1-darken, 1-darken))
-    
-    return laser_line, laser_point_3d, spot_circle, exposure_collection, alpha_text, beta_text, uv_paper
-
-# 键盘事件处理：按空格键暂停/继续
-def on_key_press(event):
-    global paused
-    if event.key == ' ':
-        paused = not paused
-        if paused:
-            print("Animation paused.")
-        else:
-            print("Animation resumed.")
-            # 强制重绘当前帧
+        if not paused:
+            current_frame = frame % frame_count
             x, y = circle_points[current_frame]
-            alpha, beta = xy_to_angles(x, y)
-            laser_line.set_data_3d([0, x], [0, y], [0, d])
+            alpha, beta = xy_to_angles(x, y, d)
+            
+            # 更新 3D 激光束路径和点
+            laser_x = [0, x]
+            laser_y = [0, y]
+            laser_z = [0, d]
+            laser_line.set_data_3d(laser_x, laser_y, laser_z)
             laser_point_3d.set_data_3d([x], [y], [d])
+            
+            # 更新 2D 光斑（紫色）
             spot_circle.center = (x, y)
             
-            # 更新曝光痕迹
-            if len(trace_x) > 1:
-                segments = []
-                for i in range(1, len(trace_x)):
-                    segments.append([(trace_x[i-1], trace_y[i-1]), 
-                                    (trace_x[i], trace_y[i])])
-                exposure_collection.set_segments(segments)
+            # 记录轨迹并更新曝光数据
+            trail.append(x, y)
             
+            # 创建曝光线段（模拟UV激光照射效果）
+            trail.apply()
+            
+            # 更新步进电机角度显示（以度为单位）
             alpha_deg = np.degrees(alpha)
             beta_deg = np.degrees(beta)
             alpha_text.set_text(f'Y Motor (α): {alpha_deg:.2f}°')
             beta_text.set_text(f'X Motor (β): {beta_deg:.2f}°')
-            fig.canvas.draw_idle()
+            
+            # UV纸曝光：在当前光斑位置累积剂量
+            dose_grid.deposit(x, y, dwell_time, exposure_rate, spot_size)
+            dose_image.set_data(dose_grid.dose)
+        
+        return (laser_line, laser_point_3d, spot_circle, *trail_collections, alpha_text, beta_text, dose_image)
+
+    # 键盘事件处理：按空格键暂停/继续
+    def on_key_press(event):
+        nonlocal paused
+        if event.key == ' ':
+            paused = not paused
+            if paused:
+                print("Animation paused.")
+            else:
+                print("Animation resumed.")
+                # 强制重绘当前帧
+                x, y = circle_points[current_frame]
+                alpha, beta = xy_to_angles(x, y, d)
+                laser_line.set_data_3d([0, x], [0, y], [0, d])
+                laser_point_3d.set_data_3d([x], [y], [d])
+                spot_circle.center = (x, y)
+                
+                # 更新曝光痕迹
+                trail.apply()
+                
+                alpha_deg = np.degrees(alpha)
+                beta_deg = np.degrees(beta)
+                alpha_text.set_text(f'Y Motor (α): {alpha_deg:.2f}°')
+                beta_text.set_text(f'X Motor (β): {beta_deg:.2f}°')
+                fig.canvas.draw_idle()
+
+    # 绑定键盘事件
+    fig.canvas.mpl_connect('key_press_event', on_key_press)
+
+    # 创建动画，禁用 blit 以确保渲染完整
+    ani = FuncAnimation(fig, update, frames=np.arange(0, frame_count), 
+                       init_func=init, blit=False, interval=frame_interval)
+
+    # 显示动画
+    plt.tight_layout()
+    plt.show()
+
+def main():
+    global d, radius
+    parser = argparse.ArgumentParser(description="激光扫描 UV 纸仿真")
+    parser.add_argument("--headless", action="store_true", help="不显示动画，只计算并导出结果")
+    parser.add_argument("--d", type=float, default=d, help="平面距离")
+    parser.add_argument("--radius", type=float, default=radius, help="圆半径")
+    parser.add_argument("--steps", type=int, default=500, help="每圈扫描点数")
+    parser.add_argument("--out", help="结果 .npz")
+    parser.add_argument("--csv", help="逐点角度 CSV")
+    parser.add_argument("--png", help="累计剂量 PNG 条带")
+    parser.add_argument("--panels", type=int, default=6, help="PNG 条带的分格数")
+    parser.add_argument("--mp4", help="剂量演变 MP4（需要 ffmpeg）")
+    args = parser.parse_args()
 
-# 绑定键盘事件
-fig.canvas.mpl_connect('key_press_event', on_key_press)
+    if args.headless:
+        matplotlib.use("Agg")
+        result = simulate(dist=args.d, r=args.radius, steps=args.steps)
+        export_results(result, args.out, args.csv, args.png, args.mp4, args.panels)
+        print(f"d={args.d} radius={args.radius} steps={args.steps} "
+              f"coverage={result['coverage'] * 100:.1f}% "
+              f"max alpha={np.degrees(np.abs(result['alpha']).max()):.3f}° "
+              f"max beta={np.degrees(np.abs(result['beta']).max()):.3f}°")
+        return
 
-# 创建动画，禁用 blit 以确保渲染完整
-ani = FuncAnimation(fig, update, frames=np.arange(0, frame_count), 
-                   init_func=init, blit=False, interval=20)
+    d, radius = args.d, args.radius
+    run_interactive(args.steps)
 
-# 显示动画
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,17 @@
 import gc
 import time
 import math
-import struct
 from machine import UART, FPIOA, Pin
 from media.sensor import *
 from media.display import *
 import media
+from frame_ctx import FrameContext
+from tracker import Tracker
+import pyramid
+from motor import MotorWriter
+from pid import PID, load_gains
+from profiles import ProfileStore
+from autothresh import AutoThreshold
 
 # ======================================================
 # 系统初始化
@@ -41,40 +47,66 @@ sensor.run()
 # ======================================================
 # 电机控制协议（自定义简化版）
 # ======================================================
-def send_motor_command(yaw_angle, pitch_angle):
-    """通过串口发送二维电机控制指令"""
-    # 角度转脉冲数
-    yaw_pulses = int(yaw_angle * STEPS_PER_DEGREE)
-    pitch_pulses = int(pitch_angle * STEPS_PER_DEGREE)
-
-    # 构造指令帧（AA 55 [ID] [YAW_PULSES] [PITCH_PULSES] [CHECKSUM]）
-    cmd = bytearray()
-    cmd.extend(b'\xAA\x55')                     # 帧头
-    cmd.append(MOTOR_ID)                        # 电机ID
-    cmd.extend(struct.pack('>ii', yaw_pulses, pitch_pulses))  # 两个轴的目标位置
-    cmd.append(sum(cmd[2:]) & 0xFF)             # 校验和
+# 指令帧（AA 55 [ID] [YAW_PULSES] [PITCH_PULSES] [CHECKSUM]）写入预分配缓冲区，
+# 只保留最新目标，按时间戳保证指令间隔，不再sleep阻塞视觉循环
+MOTOR_GAP_MS = 5         # 指令最小间隔
+motor = MotorWriter(motor_uart, MOTOR_ID, STEPS_PER_DEGREE, MOTOR_GAP_MS)
 
-    motor_uart.write(cmd)
-    time.sleep_ms(5)  # 指令间隔
+def send_motor_command(yaw_angle, pitch_angle):
+    """提交二维电机目标角度，间隔已到则立即发送，否则留给下一次poll"""
+    motor.set(yaw_angle, pitch_angle)
+    motor.poll()
 
 # ======================================================
 # PID控制器（保持原有逻辑）
 # ======================================================
-BASE_KP = 0.005
-BASE_KI = 0.0005
-BASE_KD = 0.0001
-MAX_INTEGRAL = 20000
+# 增益和调度表见 pid.py，主机上用 gimbal_sim.py 离线整定
 MAX_ANGLE = 40
 
-last_error_x = 0
-last_error_y = 0
-integral_x = 0
-integral_y = 0
+# 逆运动学查找表（iklut.py image 生成），加载失败时退回线性映射
+IK_TABLE_PATH = "/sdcard/ik_image.ikl"
+try:
+    import ik_table
+    ik = ik_table.load(IK_TABLE_PATH, (WIDTH, HEIGHT))
+    if ik.kind != ik_table.KIND_IMAGE:
+        raise ValueError("not an image table")
+    # PID增益是按线性映射（画面边缘 = MAX_ANGLE）整定的，查表前先把输出缩放到
+    # 画面中心处的斜率与线性映射相同，表只补上非线性部分，环路增益不变
+    cx, cy = WIDTH // 2, HEIGHT // 2
+    IK_GAIN_X = (MAX_ANGLE / cx) * 32 / (ik.angles(cx + 16, cy)[0] - ik.angles(cx - 16, cy)[0])
+    IK_GAIN_Y = (MAX_ANGLE / cy) * 32 / (ik.angles(cx, cy + 16)[1] - ik.angles(cx, cy - 16)[1])
+    print(f"IK查找表已加载: {ik.nx}x{ik.ny}, 增益修正 {IK_GAIN_X:.3f}/{IK_GAIN_Y:.3f}")
+except (ImportError, OSError, ValueError, ZeroDivisionError) as e:
+    ik = None
+    print(f"IK查找表不可用，使用线性映射: {e}")
+
+# pid_tune.py 整定出的增益表，不存在时使用 pid.py 中的默认增益
+PID_GAINS_PATH = "/sdcard/pid_gains.json"
+try:
+    pid = PID(**load_gains(PID_GAINS_PATH))
+    print("PID增益表已加载")
+except (OSError, ValueError, KeyError) as e:
+    pid = PID()
+    print(f"PID增益表不可用，使用默认增益: {e}")
+
+# 镜头去畸变表（calib_lens.py 生成），只校正送入PID的两个点
+LENS_TABLE_PATH = f"/sdcard/lens_{WIDTH}x{HEIGHT}.udt"   # 每个分辨率各标定一张
+try:
+    import undistort
+    lens = undistort.load(LENS_TABLE_PATH, (WIDTH, HEIGHT))
+    print(f"去畸变表已加载: {lens.nx}x{lens.ny}")
+except (ImportError, OSError, ValueError) as e:
+    lens = None
+    print(f"去畸变表不可用，使用原始坐标: {e}")
+
+def undistort_point(x, y):
+    return lens.point(x, y) if lens else (x, y)
+
 last_time = time.ticks_ms()
 
 def pid_controller(target_x, target_y, current_x, current_y):
     """优化后的高速PID控制器"""
-    global last_error_x, last_error_y, integral_x, integral_y, last_time
+    global last_time
 
     current_time = time.ticks_ms()
     dt = time.ticks_diff(current_time, last_time) / 1000.0
@@ -83,80 +115,166 @@ def pid_controller(target_x, target_y, current_x, current_y):
 
     error_x = target_x - current_x
     error_y = target_y - current_y
+    output_x, output_y = pid.update(error_x, error_y, dt)
 
-    abs_error = max(abs(error_x), abs(error_y))
-    if abs_error > 100:
-        KP = BASE_KP * 2.0
-        KI = BASE_KI * 0.5
-        KD = BASE_KD * 0.8
-    elif abs_error > 30:
-        KP = BASE_KP * 1.5
-        KI = BASE_KI * 1.0
-        KD = BASE_KD * 1.0
+    if ik is not None:
+        # PID输出按中心斜率换算成相对画面中心的像素偏移，查表得到角度
+        angle_yaw, angle_pitch = ik.angles(WIDTH//2 + output_x * IK_GAIN_X, HEIGHT//2 + output_y * IK_GAIN_Y)
     else:
-        KP = BASE_KP * 0.8
-        KI = BASE_KI * 1.5
-        KD = BASE_KD * 1.2
-
-    P_x = KP * error_x
-    P_y = KP * error_y
-
-    integral_x += error_x * dt
-    integral_y += error_y * dt
-    integral_x = max(min(integral_x, MAX_INTEGRAL), -MAX_INTEGRAL)
-    integral_y = max(min(integral_y, MAX_INTEGRAL), -MAX_INTEGRAL)
-    I_x = KI * integral_x
-    I_y = KI * integral_y
-
-    D_x = KD * (error_x - last_error_x) / dt
-    D_y = KD * (error_y - last_error_y) / dt
-
-    last_error_x = error_x
-    last_error_y = error_y
-
-    output_x = P_x + I_x + D_x
-    output_y = P_y + I_y + D_y
-
-    angle_yaw = output_x * (MAX_ANGLE / (WIDTH//2))
-    angle_pitch = output_y * (MAX_ANGLE / (HEIGHT//2))
+        angle_yaw = output_x * (MAX_ANGLE / (WIDTH//2))
+        angle_pitch = output_y * (MAX_ANGLE / (HEIGHT//2))
 
     return angle_yaw, angle_pitch, error_x, error_y
 
 # ======================================================
 # 视觉处理函数（完全保持原样）
 # ======================================================
-last_laser_point = None
-def get_red_blobs(img):
+frame = FrameContext()   # 每帧的灰度/二值等中间结果，主循环每帧reset
+
+# 窗口搜索：在上一帧光斑位置（按速度外推）附近开窗，丢失时回到全帧重新捕获
+LASER_THRESHOLDS = [(27, 100, 39, 127, -51, 127)]
+# 800x480 下光斑约 7x7 像素、40~50 个像素；取一半，远处或偏暗的光斑仍能检出，
+# 零散噪点在生成blob之前就被丢掉（固件缺省均为 10）
+LASER_PIXELS_MIN = 20    # 像素数低于此值的噪点不生成blob
+LASER_AREA_MIN = 20      # 外接矩形面积低于此值的噪点不生成blob
+LASER_WIN_MIN = 40       # 搜索窗口最小半宽（像素）
+LASER_WIN_GAIN = 3       # 窗口半宽 = LASER_WIN_MIN + |本帧预计位移(像素)| * LASER_WIN_GAIN
+
+# 光斑与矩形中心用匀速卡尔曼跟踪，并外推到电机指令实际执行的时刻
+PREDICT_LEAD_MS = 40     # 摄像头曝光+处理+串口的总延迟
+laser_tracker = Tracker()
+rect_tracker = Tracker(max_coast_ms=500)
+
+last_laser_point = None  # 跟踪器外推后的光斑位置
+
+def laser_window(now):
+    """返回光斑搜索窗口 (x, y, w, h)，窗口中心和大小取自跟踪器的位置和速度；未跟踪时返回None"""
+    if not laser_tracker.valid:
+        return None
+    dt = time.ticks_diff(now, laser_tracker.t)
+    cx, cy = laser_tracker.predict(dt)
+    vx, vy = laser_tracker.velocity()
+    hw = LASER_WIN_MIN + abs(vx) * dt / 1000 * LASER_WIN_GAIN
+    hh = LASER_WIN_MIN + abs(vy) * dt / 1000 * LASER_WIN_GAIN
+    x0 = max(int(cx - hw), 0)
+    y0 = max(int(cy - hh), 0)
+    x1 = min(int(cx + hw), WIDTH)
+    y1 = min(int(cy + hh), HEIGHT)
+    if x1 - x0 < 2 or y1 - y0 < 2:
+        return None
+    return (x0, y0, x1 - x0, y1 - y0)
+
+def find_laser_blobs(img, roi=None):
+    if roi:
+        return img.find_blobs(LASER_THRESHOLDS, roi=roi, merge=True,
+                              pixels_threshold=LASER_PIXELS_MIN, area_threshold=LASER_AREA_MIN)
+    return img.find_blobs(LASER_THRESHOLDS, merge=True,
+                          pixels_threshold=LASER_PIXELS_MIN, area_threshold=LASER_AREA_MIN)
+
+def get_red_blobs(img, now=None):
     global last_laser_point
-    thresholds = [(27, 100, 39, 127, -51, 127)]
-    blobs = img.find_blobs(thresholds, merge=True)
+    now = time.ticks_ms() if now is None else now
+    roi = laser_window(now)
+    blobs = find_laser_blobs(img, roi) if roi else None
     if not blobs:
-        return last_laser_point
-    largest_blob = max(blobs, key=lambda b: b.area())
-    if largest_blob:
+        blobs = find_laser_blobs(img)   # 窗口内没有，全帧重新捕获
+    new_point = None
+    if blobs:
+        largest_blob = max(blobs, key=lambda b: b.area())
         new_point = (largest_blob.cx(), largest_blob.cy())
-        last_laser_point = new_point if not last_laser_point else (
-            int(last_laser_point[0]*0.3 + new_point[0]*0.7),
-            int(last_laser_point[1]*0.3 + new_point[1]*0.7)
-        )
+    # 丢失时跟踪器短时外推，超时后返回None
+    laser_tracker.update(new_point, now)
+    last_laser_point = laser_tracker.predict(PREDICT_LEAD_MS)
     return last_laser_point
 
+# 跟踪模式：已知上一帧矩形时只处理其外扩后的ROI，连续丢失后回到全帧搜索
+TRACK_PAD = 40           # ROI在上一帧矩形四周外扩的像素
+TRACK_MAX_MISSES = 5     # ROI内连续丢失次数达到后回到全帧搜索
+PYRAMID_FACTOR = 2       # 全帧搜索时先在 1/2 池化图上找候选，1 为直接整图搜索
+BLACK_BINARY_THRESHOLD = (55, 255)   # 找靶面的二值化灰度范围（均衡化图上）
+BINARY_RECT_THRESHOLD = 8000         # 二值图 find_rects 阈值
+# 跟踪ROI内的二值化下限改用ROI原始灰度直方图的 Otsu 分割点，不再对ROI做 histeq；
+# 只从找到靶面的ROI学习，全帧搜索和 False 时用上面的固定范围。方案里的 AUTO_BINARY=1 可单独打开
+AUTO_BINARY = False
+AUTO_BINARY_INITIAL = 128   # 原始灰度上的初值（上面的 55 是均衡化图上的值，不能直接用）
+AUTO_BINARY_WINDOW = 48     # 学习值限制在第一次测得的分割点 ± 这个范围内
+binary_thresh = AutoThreshold(initial=AUTO_BINARY_INITIAL, window=AUTO_BINARY_WINDOW)
+track_misses = TRACK_MAX_MISSES
+
 last_rect_point = None
 last_corners = None
+
+# 阈值方案（调参程序保存的同一文件），开机加载，文件被改写后主循环里重新加载
+THRESHOLD_PROFILE_PATH = "/sdcard/thresholds.prf"
+THRESHOLD_PROFILE_POLL_MS = 1000
+profile_store = ProfileStore(THRESHOLD_PROFILE_PATH, poll_ms=THRESHOLD_PROFILE_POLL_MS)
+
+def apply_profile():
+    """方案中的激光LAB阈值和靶面二值化参数写入全局，返回方案名"""
+    global LASER_THRESHOLDS, BLACK_BINARY_THRESHOLD, BINARY_RECT_THRESHOLD, AUTO_BINARY, AUTO_BINARY_INITIAL
+    values = profile_store.get()
+    if values is None:
+        return None
+    if "LASER_THRESHOLDS" in values:
+        LASER_THRESHOLDS = [tuple(values["LASER_THRESHOLDS"])]
+    if "BLACK_BINARY_THRESHOLD" in values:
+        BLACK_BINARY_THRESHOLD = tuple(values["BLACK_BINARY_THRESHOLD"])
+    BINARY_RECT_THRESHOLD = values.get("BINARY_RECT_THRESHOLD", BINARY_RECT_THRESHOLD)
+    if "AUTO_BINARY" in values:
+        AUTO_BINARY = bool(values["AUTO_BINARY"])
+    AUTO_BINARY_INITIAL = values.get("AUTO_BINARY_INITIAL", AUTO_BINARY_INITIAL)
+    binary_thresh.reset(AUTO_BINARY_INITIAL)
+    return profile_store.active
+
+try:
+    if profile_store.load() and apply_profile():
+        print(f"阈值方案已加载: {profile_store.active}")
+    else:
+        print("阈值方案不可用，使用默认阈值")
+except ValueError as e:
+    print(f"阈值方案不可用，使用默认阈值: {e}")
+
+def track_roi():
+    """返回跟踪ROI (x, y, w, h)，需要全帧搜索时返回None"""
+    if last_rect_point is None or track_misses >= TRACK_MAX_MISSES:
+        return None
+    x, y, w, h = last_rect_point
+    rx = max(x - TRACK_PAD, 0)
+    ry = max(y - TRACK_PAD, 0)
+    rw = min(x + w + TRACK_PAD, WIDTH) - rx
+    rh = min(y + h + TRACK_PAD, HEIGHT) - ry
+    if rw >= WIDTH * 3 // 4 and rh >= HEIGHT * 3 // 4:
+        return None   # 目标几乎占满画面，直接全帧处理
+    return (rx, ry, rw, rh)
+
 def get_black_rect(img):
-    global last_rect_point, last_corners
-    gray_img = img.to_grayscale()
-    gray_img.histeq()
-    binary_img = gray_img.binary([(55, 255)], invert=False)
-    binary_img.erode(2)
-    rects = binary_img.find_rects(threshold=8000)
-    if not rects:
-        return binary_img, None, None
-    largest_rect = max(rects, key=lambda r: r[2]*r[3])
-    if largest_rect.magnitude() < 100000:
+    global last_rect_point, last_corners, track_misses
+    roi = track_roi()
+    auto = AUTO_BINARY and roi is not None
+    if auto:
+        binary_img = frame.binary([(binary_thresh.value, 255)], erode=2, equalize=False, roi=roi)
+    else:
+        binary_img = frame.binary([BLACK_BINARY_THRESHOLD], erode=2, roi=roi)
+    if roi is None:
+        rects = pyramid.find_rects(binary_img, BINARY_RECT_THRESHOLD, factor=PYRAMID_FACTOR, pool=frame.pooled)
+    else:
+        rects = binary_img.find_rects(threshold=BINARY_RECT_THRESHOLD)
+    largest_rect = max(rects, key=lambda r: r[2]*r[3]) if rects else None
+    if largest_rect is None or largest_rect.magnitude() < 100000:
+        track_misses += 1
         return binary_img, None, None
     x, y, w, h = largest_rect[0:4]
     corners = largest_rect.corners()
+    if roi:
+        # ROI坐标换算回全帧坐标
+        ox, oy = roi[0], roi[1]
+        x += ox
+        y += oy
+        corners = [(cx + ox, cy + oy) for cx, cy in corners]
+    if auto:
+        # 用本帧的阈值找到了靶面，才用这块ROI学习，新阈值下一帧生效
+        binary_thresh.update(frame.gray(roi))
+    track_misses = 0
     last_rect_point = (x, y, w, h)
     last_corners = corners
     return binary_img, last_rect_point, last_corners
@@ -171,13 +289,21 @@ def main():
             if img is None:
                 time.sleep_ms(10)
                 continue
+            frame.reset(img)
+            now = time.ticks_ms()
+            if profile_store.poll(now) and apply_profile():
+                print(f"阈值方案已重新加载: {profile_store.active}")
 
-            laser_pos = get_red_blobs(img)
+            laser_pos = get_red_blobs(img, now)
             rect_img, rect_data, corners = get_black_rect(img)
 
+            center = None
             if corners:
-                target_x = sum(c[0] for c in corners) // 4
-                target_y = sum(c[1] for c in corners) // 4
+                center = (sum(c[0] for c in corners) // 4, sum(c[1] for c in corners) // 4)
+            rect_tracker.update(center, now)
+            target = rect_tracker.predict(PREDICT_LEAD_MS)
+            if target:
+                target_x, target_y = target
 
             if laser_pos:
                 current_x, current_y = laser_pos
@@ -190,6 +316,7 @@ def main():
             if corners:
                 img.draw_rectangle(rect_data[0], rect_data[1], rect_data[2], rect_data[3],
                                  color=(255, 0, 0), thickness=5)
+            if target:
                 img.draw_cross(target_x, target_y, color=(0, 0, 255), size=20)
 
                 if laser_pos:
@@ -199,9 +326,11 @@ def main():
                     img.draw_string(WIDTH//2, 20, f"Distance: {distance:.1f}px",
                                   scale=2, color=(255, 255, 0))
 
-            if laser_pos and corners:
-                angle_yaw, angle_pitch, x_error, y_error = pid_controller(
-                    target_x, target_y, current_x, current_y)
+            if laser_pos and target:
+                # 画面显示用原始坐标，PID误差用去畸变坐标
+                ux, uy = undistort_point(target_x, target_y)
+                lx, ly = undistort_point(current_x, current_y)
+                angle_yaw, angle_pitch, x_error, y_error = pid_controller(ux, uy, lx, ly)
 
                 # 通过串口控制二维电机（Yaw轴反向）
                 send_motor_command(-angle_yaw, angle_pitch)
@@ -215,10 +344,10 @@ def main():
 
             Display.show_image(img, layer=Display.LAYER_OSD0)
             if rect_img:
-                img2 = rect_img.mean_pool(4, 4)
+                img2 = frame.pooled(rect_img, 4, 4)
                 Display.show_image(img2, layer=Display.LAYER_OSD1)
 
-            time.sleep_ms(10)
+            motor.poll()   # 补发因间隔未到而挂起的目标
 
     except KeyboardInterrupt:
         print("程序被用户中断")
@@ -0,0 +1,119 @@
+"""
+仿真帧来源：录制帧语料与合成场景
+
+语料格式（.npz）:
+    frames: (N, H, W, 3) uint8 RGB
+    rects:  (N, 4) int   目标外框 (x, y, w, h)，无目标为 -1（可选）
+    lasers: (N, 2) int   激光点 (x, y)，无激光为 -1（可选）
+也可以是一个目录，内含按文件名排序的 (H, W, 3) uint8 .npy 帧（无真值）。
+"""
+import os
+import numpy as np
+
+# ================ 光照条件 ================
+LIGHTING = {
+    "normal": {"gain": 1.0, "gradient": 0.1, "noise": 3.0},
+    "dim": {"gain": 0.45, "gradient": 0.15, "noise": 6.0},
+    "glare": {"gain": 1.25, "gradient": 0.6, "noise": 4.0},
+    "uneven": {"gain": 0.8, "gradient": 0.9, "noise": 8.0},
+}
+
+
+def synthetic_frame(width, height, rng, lighting="normal", target=True, laser=True):
+    """
+    合成一帧：灰色背景上一张带黑色边框的白纸，以及一个红色激光点
+    返回: (frame, truth)，truth 含 rect/corners/laser，缺失项为 None
+    """
+    light = LIGHTING[lighting]
+    yy, xx = np.mgrid[0:height, 0:width].astype(np.float32)
+
+    # 背景 + 光照梯度（模拟侧光）
+    angle = rng.uniform(0, 2 * np.pi)
+    ramp = (np.cos(angle) * (xx / width - 0.5) + np.sin(angle) * (yy / height - 0.5))
+    shade = 1.0 + light["gradient"] * ramp
+    base = np.full((height, width), 120.0, np.float32)
+
+    truth = {"rect": None, "corners": None, "laser": None}
+    if target:
+        rw = int(rng.uniform(0.35, 0.6) * width)
+        rh = int(rw / rng.uniform(1.2, 1.6))
+        rh = min(rh, int(height * 0.8))
+        rx = int(rng.uniform(0.05, 0.95) * (width - rw))
+        ry = int(rng.uniform(0.05, 0.95) * (height - rh))
+        border = max(3, int(min(rw, rh) * 0.06))
+        base[ry:ry + rh, rx:rx + rw] = 25.0
+        base[ry + border:ry + rh - border, rx + border:rx + rw - border] = 225.0
+        truth["rect"] = (rx, ry, rw, rh)
+        truth["corners"] = [(rx, ry), (rx + rw - 1, ry), (rx + rw - 1, ry + rh - 1), (rx, ry + rh - 1)]
+
+    gray = base * shade * light["gain"]
+    gray += rng.normal(0, light["noise"], gray.shape).astype(np.float32)
+    frame = np.repeat(np.clip(gray, 0, 255)[..., None], 3, axis=2)
+
+    if laser:
+        if truth["rect"] is not None and rng.uniform() < 0.8:
+            rx, ry, rw, rh = truth["rect"]
+            lx = int(rng.uniform(rx, rx + rw))
+            ly = int(rng.uniform(ry, ry + rh))
+        else:
+            lx = int(rng.uniform(0, width))
+            ly = int(rng.uniform(0, height))
+        d2 = (xx - lx) ** 2 + (yy - ly) ** 2
+        glow = np.exp(-d2 / (2 * 3.0 ** 2))[..., None]
+        frame = frame * (1 - glow) + np.array([255.0, 40.0, 40.0]) * glow
+        truth["laser"] = (lx, ly)
+
+    return np.clip(frame, 0, 255).astype(np.uint8), truth
+
+
+def synthetic_corpus(count, width, height, seed=0, lightings=None):
+    """生成一组混合光照的合成帧，约 10% 无目标"""
+    rng = np.random.default_rng(seed)
+    lightings = lightings or list(LIGHTING)
+    frames, truths = [], []
+    for i in range(count):
+        frame, truth = synthetic_frame(width, height, rng,
+                                       lighting=lightings[i % len(lightings)],
+                                       target=rng.uniform() > 0.1)
+        truth["lighting"] = lightings[i % len(lightings)]
+        frames.append(frame)
+        truths.append(truth)
+    return frames, truths
+
+
+def save_corpus(path, frames, truths=None):
+    """保存为 .npz 语料"""
+    data = {"frames": np.stack(frames)}
+    if truths is not None:
+        data["rects"] = np.array([t["rect"] or (-1, -1, -1, -1) for t in truths], np.int32)
+        data["lasers"] = np.array([t["laser"] or (-1, -1) for t in truths], np.int32)
+    np.savez_compressed(path, **data)
+
+
+def load_corpus(path):
+    """读取 .npz 语料或 .npy 帧目录，返回 (frames, truths)，无真值时 truths 为 None"""
+    if os.path.isdir(path):
+        names = sorted(n for n in os.listdir(path) if n.endswith(".npy"))
+        return [np.load(os.path.join(path, n)) for n in names], None
+    data = np.load(path)
+    frames = list(data["frames"])
+    if "rects" not in data:
+        return frames, None
+    lasers = data["lasers"] if "lasers" in data else np.full((len(frames), 2), -1)
+    truths = []
+    for rect, laser in zip(data["rects"], lasers):
+        truths.append({
+            "rect": None if rect[0] < 0 else tuple(int(v) for v in rect),
+            "laser": None if laser[0] < 0 else tuple(int(v) for v in laser),
+        })
+    return frames, truths
+
+
+def fit_frame(frame, width, height):
+    """最近邻缩放到传感器分辨率"""
+    h, w = frame.shape[:2]
+    if (w, h) == (width, height):
+        return frame
+    ys = np.arange(height) * h // height
+    xs = np.arange(width) * w // width
+    return frame[ys][:, xs]
@@ -0,0 +1,167 @@
+"""
+仿真板级状态：帧来源、触摸脚本、显示输出和 MicroPython 运行时补丁
+
+media.* / machine 仿真模块共享这里的状态，run.py 负责配置。
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import frames as _frames
+
+# ================ 仿真配置 ================
+HEAP_SIZE = 4 * 1024 * 1024   # gc.mem_free 的模拟堆大小
+
+config = {
+    "corpus": None,         # 语料路径，None 表示合成帧
+    "max_frames": None,     # 达到帧数后 snapshot 抛出 KeyboardInterrupt
+    "seed": 0,
+    "lighting": None,       # 合成帧光照，None 表示轮换
+    "uart_realtime": False, # 按波特率模拟 UART 写阻塞
+}
+
+# ================ 运行状态 ================
+stats = {
+    "snapshots": 0,
+    "shown": 0,
+    "uart_bytes": 0,
+    "start": None,
+}
+touch_script = []   # [{"frame": n, "x": x, "y": y, "event": "down"}, ...]
+displayed = {}      # layer -> 最近一次显示的 Image
+
+_corpus = None
+_truths = None
+_rng = None
+
+
+def configure(**kwargs):
+    """更新仿真配置并重置帧来源"""
+    global _corpus, _truths, _rng
+    config.update(kwargs)
+    _corpus = None
+    _truths = None
+    _rng = np.random.default_rng(config["seed"])
+    stats.update(snapshots=0, shown=0, uart_bytes=0, start=None)
+    displayed.clear()
+
+
+def set_corpus(frames, truths=None):
+    """直接指定内存中的帧序列（回放/基准测试用）"""
+    global _corpus, _truths
+    _corpus = list(frames)
+    _truths = truths
+
+
+def current_truth():
+    """当前帧的真值（合成帧或带标注的语料），没有则返回 None"""
+    if not _truths or stats["snapshots"] == 0:
+        return None
+    return _truths[(stats["snapshots"] - 1) % len(_truths)]
+
+
+def next_frame(width, height):
+    """返回下一帧 (H, W, 3) uint8；超过 max_frames 时抛出 KeyboardInterrupt"""
+    global _corpus, _truths, _rng
+    limit = config["max_frames"]
+    if limit is not None and stats["snapshots"] >= limit:
+        raise KeyboardInterrupt("emu: max_frames reached")
+    if stats["start"] is None:
+        stats["start"] = time.perf_counter()
+    if _corpus is None and config["corpus"]:
+        _corpus, _truths = _frames.load_corpus(config["corpus"])
+    if _rng is None:
+        _rng = np.random.default_rng(config["seed"])
+
+    n = stats["snapshots"]
+    stats["snapshots"] += 1
+    if _corpus:
+        return _frames.fit_frame(_corpus[n % len(_corpus)], width, height)
+
+    names = list(_frames.LIGHTING)
+    lighting = config["lighting"] or names[n % len(names)]
+    frame, truth = _frames.synthetic_frame(width, height, _rng, lighting=lighting)
+    _truths = [truth]
+    return frame
+
+
+def touches(count):
+    """当前帧的脚本化触摸点"""
+    n = max(stats["snapshots"] - 1, 0)
+    return [t for t in touch_script if t.get("frame", 0) == n][:count]
+
+
+def show(img, layer):
+    displayed[layer] = img
+    stats["shown"] += 1
+
+
+def uart_written(nbytes, baudrate):
+    stats["uart_bytes"] += nbytes
+    if config["uart_realtime"]:
+        time.sleep(nbytes * 10.0 / baudrate)
+
+
+# ================ MicroPython 运行时补丁 ================
+class _Clock:
+    """time.clock() 的仿真：tick() + fps()"""
+
+    def __init__(self):
+        self._last = None
+        self._fps = 0.0
+
+    def tick(self):
+        now = time.perf_counter()
+        if self._last is not None and now > self._last:
+            self._fps = 1.0 / (now - self._last)
+        self._last = now
+
+    def fps(self):
+        return self._fps
+
+
+def _mem_alloc():
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0]
+    return 0
+
+
+def install():
+    """给 CPython 的 time/os/gc 补上 K230 MicroPython 的接口"""
+    t0 = time.perf_counter_ns()
+    time.ticks_ms = lambda: ((time.perf_counter_ns() - t0) // 1000000) & 0x3FFFFFFF
+    time.ticks_us = lambda: ((time.perf_counter_ns() - t0) // 1000) & 0x3FFFFFFF
+    time.ticks_cpu = time.ticks_us
+    time.ticks_diff = lambda a, b: ((a - b + 0x20000000) & 0x3FFFFFFF) - 0x20000000
+    time.ticks_add = lambda a, b: (a + b) & 0x3FFFFFFF
+    time.sleep_ms = lambda ms: time.sleep(ms / 1000.0)
+    time.sleep_us = lambda us: time.sleep(us / 1000000.0)
+    time.clock = _Clock
+
+    os.EXITPOINT_ENABLE = 1
+    os.EXITPOINT_ENABLE_SLEEP = 2
+    os.exitpoint = lambda *args: None
+
+    gc.mem_alloc = _mem_alloc
+    gc.mem_free = lambda: HEAP_SIZE - _mem_alloc()
+
+    emu_dir = os.path.dirname(os.path.abspath(__file__))
+    if emu_dir not in sys.path:
+        sys.path.insert(0, emu_dir)
+
+
+def summary():
+    """运行结束后的简要统计"""
+    elapsed = time.perf_counter() - stats["start"] if stats["start"] else 0.0
+    n = stats["snapshots"]
+    return {
+        "frames": n,
+        "shown": stats["shown"],
+        "seconds": elapsed,
+        "ms_per_frame": 1000.0 * elapsed / n if n else 0.0,
+        "uart_bytes": stats["uart_bytes"],
+    }
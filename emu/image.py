@@ -0,0 +1,733 @@
+"""
+主机端 image 模块仿真（numpy 实现）
+
+只实现各脚本实际用到的子集：to_grayscale / find_rects / find_blobs /
+get_statistics / get_histogram / binary / erode / histeq / mean_pool / draw_*。
+算法与 K230 固件不完全一致，结果用于回放、对比和计时，而不是逐像素复现。
+"""
+import numpy as np
+
+__all__ = ["Image", "RGB565", "RGB888", "GRAYSCALE", "BINARY", "ARGB8888", "AREA", "BILINEAR", "BICUBIC",
+           "ALLOC_MPGC", "ALLOC_HEAP", "ALLOC_REF"]
+
+# ================ 像素格式 ================
+BINARY = 1
+GRAYSCALE = 2
+RGB565 = 3
+RGB888 = 4
+ARGB8888 = 5
+
+_CHANNELS = {BINARY: 1, GRAYSCALE: 1, RGB565: 3, RGB888: 3, ARGB8888: 4}
+
+# ================ 内存分配方式（Image 的 alloc 参数） ================
+ALLOC_MPGC = 0
+ALLOC_HEAP = 1
+ALLOC_REF = 5   # 不分配像素内存，引用 data 给出的缓冲区
+
+# ================ 缩放方式（draw_image 的 hint） ================
+AREA = 1        # 区域平均，整数倍缩小时等同于 mean_pooled
+BILINEAR = 2    # 仿真中按最近邻处理
+BICUBIC = 4
+
+
+# ================ 工具函数 ================
+def _clip_roi(roi, width, height):
+    """把 roi 裁剪到图像范围内，返回 (x, y, w, h)；roi 为空时返回全图"""
+    if roi is None:
+        return 0, 0, width, height
+    x, y, w, h = [int(v) for v in roi[:4]]
+    x0, y0 = max(0, x), max(0, y)
+    x1, y1 = min(width, x + w), min(height, y + h)
+    return x0, y0, max(0, x1 - x0), max(0, y1 - y0)
+
+
+def _rgb_to_gray(rgb):
+    """与固件一致的整数亮度公式 (38R + 75G + 15B) >> 7"""
+    rgb = rgb.astype(np.uint16)
+    return ((rgb[..., 0] * 38 + rgb[..., 1] * 75 + rgb[..., 2] * 15) >> 7).astype(np.uint8)
+
+
+def _lab_formula(rgb):
+    """sRGB -> CIE LAB，返回 float32 的 (L, A, B)"""
+    c = rgb.astype(np.float32) / 255.0
+    c = np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+    x = (c[..., 0] * 0.4124 + c[..., 1] * 0.3576 + c[..., 2] * 0.1805) / 0.95047
+    y = c[..., 0] * 0.2126 + c[..., 1] * 0.7152 + c[..., 2] * 0.0722
+    z = (c[..., 0] * 0.0193 + c[..., 1] * 0.1192 + c[..., 2] * 0.9505) / 1.08883
+
+    def f(t):
+        return np.where(t > 0.008856, np.cbrt(t), 7.787 * t + 16.0 / 116.0)
+
+    fx, fy, fz = f(x), f(y), f(z)
+    return 116.0 * fy - 16.0, 500.0 * (fx - fy), 200.0 * (fy - fz)
+
+
+_LAB_LUT = None
+
+
+def _rgb_to_lab(rgb):
+    """与固件相同，先量化到 RGB565 再查 65536 项的 LAB 表，返回 int8 的 (L, A, B)"""
+    global _LAB_LUT
+    if _LAB_LUT is None:
+        idx = np.arange(65536)
+        r = ((idx >> 11) & 0x1F) * 255 // 31
+        g = ((idx >> 5) & 0x3F) * 255 // 63
+        b = (idx & 0x1F) * 255 // 31
+        lab = _lab_formula(np.stack([r, g, b], axis=1))
+        _LAB_LUT = np.clip(np.rint(np.stack(lab)), -128, 127).astype(np.int8)
+    rgb = rgb.astype(np.uint16)
+    idx = ((rgb[..., 0] >> 3) << 11) | ((rgb[..., 1] >> 2) << 5) | (rgb[..., 2] >> 3)
+    return _LAB_LUT[0][idx], _LAB_LUT[1][idx], _LAB_LUT[2][idx]
+
+
+def _otsu(values):
+    """对 uint8 数组求 Otsu 阈值"""
+    hist = np.bincount(values.ravel(), minlength=256).astype(np.float64)
+    total = hist.sum()
+    if total == 0:
+        return 128
+    levels = np.arange(256)
+    w0 = np.cumsum(hist)
+    m0 = np.cumsum(hist * levels)
+    w1 = total - w0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (m0[-1] * w0 / total - m0) ** 2 / (w0 * w1)
+    between[~np.isfinite(between)] = 0
+    return int(np.argmax(between))
+
+
+def _box_count(mask, size):
+    """统计每个像素 (2size+1)^2 邻域内的置位像素数（积分图实现）"""
+    k = 2 * size + 1
+    padded = np.pad(mask.astype(np.int32), size)
+    s = np.pad(padded.cumsum(0).cumsum(1), ((1, 0), (1, 0)))
+    h, w = mask.shape
+    return s[k:k + h, k:k + w] - s[:h, k:k + w] - s[k:k + h, :w] + s[:h, :w]
+
+
+def _label_runs(mask):
+    """
+    基于行程的 8 连通标记
+    返回: (rows, starts, ends, labels)，ends 为开区间，labels 已压缩到 0..n-1
+    """
+    h, w = mask.shape
+    edge = np.zeros((h, w + 2), np.int8)
+    edge[:, 1:-1] = mask
+    d = np.diff(edge, axis=1)
+    rows, starts = np.nonzero(d == 1)
+    _, ends = np.nonzero(d == -1)
+    n = len(rows)
+    if n == 0:
+        return rows, starts, ends, np.zeros(0, np.int64)
+
+    # 相邻行中列区间重叠（含对角）的行程对
+    stride = w + 2
+    start_keys = rows * stride + starts
+    end_keys = rows * stride + ends
+    lo = np.searchsorted(end_keys, (rows + 1) * stride + starts, "left")
+    hi = np.searchsorted(start_keys, (rows + 1) * stride + ends, "right")
+    lo = np.maximum(lo, np.searchsorted(rows, rows + 1, "left"))
+    hi = np.minimum(hi, np.searchsorted(rows, rows + 1, "right"))
+    counts = np.maximum(hi - lo, 0)
+    a = np.repeat(np.arange(n), counts)
+    offsets = np.arange(len(a)) - np.repeat(np.cumsum(counts) - counts, counts)
+    b = np.repeat(lo, counts) + offsets
+
+    # 并查集：把较大的根挂到较小的根上，再做指针跳跃，直到所有边两端同根
+    labels = np.arange(n)
+    while len(a):
+        ra, rb = labels[a], labels[b]
+        diff = ra != rb
+        if not diff.any():
+            break
+        np.minimum.at(labels, np.maximum(ra, rb)[diff], np.minimum(ra, rb)[diff])
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+    _, labels = np.unique(labels, return_inverse=True)
+    return rows, starts, ends, labels
+
+
+def _components(mask, ox=0, oy=0, min_pixels=1):
+    """连通域统计：像素数、包围盒、质心以及对角方向的极值点（跳过像素数不足的连通域）"""
+    rows, starts, ends, labels = _label_runs(mask)
+    if len(labels) == 0:
+        return []
+    length = ends - starts
+    pixels = np.bincount(labels, length)
+    keep = pixels >= min_pixels
+    if not keep.any():
+        return []
+    # 只保留足够大的连通域的行程，再重新编号
+    sel = keep[labels]
+    rows, starts, ends, length = rows[sel], starts[sel], ends[sel], length[sel].astype(np.float64)
+    _, labels = np.unique(labels[sel], return_inverse=True)
+    n = labels.max() + 1
+    pixels = pixels[keep]
+    sum_x = np.bincount(labels, (starts + ends - 1) * length / 2.0, n)
+    sum_y = np.bincount(labels, rows * length, n)
+
+    x_min = np.full(n, 1 << 30)
+    y_min = np.full(n, 1 << 30)
+    x_max = np.full(n, -1)
+    y_max = np.full(n, -1)
+    np.minimum.at(x_min, labels, starts)
+    np.maximum.at(x_max, labels, ends - 1)
+    np.minimum.at(y_min, labels, rows)
+    np.maximum.at(y_max, labels, rows)
+
+    def extreme(values, xs, take_max):
+        order = np.lexsort((values if take_max else -values, labels))
+        last = np.r_[np.nonzero(np.diff(labels[order]))[0], len(order) - 1]
+        idx = order[last]
+        return xs[idx], rows[idx]
+
+    tl = extreme(starts + rows, starts, False)
+    br = extreme(ends - 1 + rows, ends - 1, True)
+    tr = extreme(ends - 1 - rows, ends - 1, True)
+    bl = extreme(starts - rows, starts, False)
+
+    comps = []
+    for i in range(n):
+        comps.append({
+            "pixels": int(pixels[i]),
+            "rect": (int(x_min[i]) + ox, int(y_min[i]) + oy,
+                     int(x_max[i] - x_min[i] + 1), int(y_max[i] - y_min[i] + 1)),
+            "cx": sum_x[i] / pixels[i] + ox,
+            "cy": sum_y[i] / pixels[i] + oy,
+            "corners": [(int(tl[0][i]) + ox, int(tl[1][i]) + oy),
+                        (int(tr[0][i]) + ox, int(tr[1][i]) + oy),
+                        (int(br[0][i]) + ox, int(br[1][i]) + oy),
+                        (int(bl[0][i]) + ox, int(bl[1][i]) + oy)],
+        })
+    return comps
+
+
+# ================ 结果对象 ================
+class Statistics:
+    """get_statistics 的返回值，灰度图取灰度，彩色图取 L 通道；各项按需计算"""
+
+    def __init__(self, values, lab=None):
+        self._v = values.ravel()
+        if self._v.size == 0:
+            self._v = np.zeros(1, np.uint8)
+        self._lab = lab
+
+    def mean(self): return int(round(float(self._v.mean())))
+    def median(self): return int(np.median(self._v))
+    def mode(self): return int(np.bincount(self._v.astype(np.int64)).argmax())
+    def stdev(self): return int(round(float(self._v.std())))
+    def min(self): return int(self._v.min())
+    def max(self): return int(self._v.max())
+    def lq(self): return int(np.percentile(self._v, 25))
+    def uq(self): return int(np.percentile(self._v, 75))
+
+    def l_mean(self): return self.mean()
+    def a_mean(self): return 0 if self._lab is None else int(round(float(self._lab[1].mean())))
+    def b_mean(self): return 0 if self._lab is None else int(round(float(self._lab[2].mean())))
+
+    def __getitem__(self, i):
+        return (self.mean, self.median, self.mode, self.stdev, self.min, self.max, self.lq, self.uq)[i]()
+
+
+class Rect:
+    """find_rects 的返回值：rect()/corners()/magnitude()，可按 (x, y, w, h, magnitude) 下标访问"""
+
+    def __init__(self, rect, corners, magnitude):
+        self._t = tuple(rect) + (int(magnitude),)
+        self._corners = [tuple(c) for c in corners]
+
+    def rect(self): return self._t[:4]
+    def corners(self): return list(self._corners)
+    def magnitude(self): return self._t[4]
+    def x(self): return self._t[0]
+    def y(self): return self._t[1]
+    def w(self): return self._t[2]
+    def h(self): return self._t[3]
+
+    def __getitem__(self, i):
+        return self._t[i]
+
+    def __len__(self):
+        return len(self._t)
+
+    def __repr__(self):
+        return "{\"x\":%d, \"y\":%d, \"w\":%d, \"h\":%d, \"magnitude\":%d}" % self._t
+
+
+class Histogram:
+    """get_histogram 的返回值：归一化的各 bin 占比，灰度图统计灰度，彩色图统计 L 通道"""
+
+    def __init__(self, values, bins, vmax):
+        v = values.ravel().astype(np.int64)
+        self._vmax = vmax
+        idx = (v * (bins - 1) + vmax // 2) // vmax
+        counts = np.bincount(idx, minlength=bins)[:bins].astype(np.float64)
+        total = counts.sum()
+        self._p = counts / total if total else counts
+        self._v = values
+
+    def _value(self, i):
+        """bin 序号 -> 像素值，与固件相同按 floor(i * vmax / (bins - 1)) 换算"""
+        return int(i * self._vmax // (len(self._p) - 1))
+
+    def bins(self): return self._p.tolist()
+    def l_bins(self): return self.bins()
+
+    def get_percentile(self, percentile):
+        cdf = np.cumsum(self._p)
+        i = int(np.searchsorted(cdf, percentile - 1e-9))
+        return Percentile(self._value(min(i, len(self._p) - 1)))
+
+    def get_threshold(self):
+        """Otsu：类间方差最大的 bin"""
+        p = self._p
+        levels = np.arange(len(p))
+        w0 = np.cumsum(p)
+        m0 = np.cumsum(p * levels)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            between = (m0[-1] * w0 - m0) ** 2 / (w0 * (1 - w0))
+        between[~np.isfinite(between)] = 0
+        return Percentile(self._value(int(np.argmax(between))))
+
+    def get_statistics(self):
+        return Statistics(self._v)
+
+
+class Percentile:
+    """get_percentile / get_threshold 的返回值"""
+
+    def __init__(self, value):
+        self._value = value
+
+    def value(self): return self._value
+    def l_value(self): return self._value
+    def a_value(self): return 0
+    def b_value(self): return 0
+
+    def __getitem__(self, i):
+        return (self._value, 0, 0)[i]
+
+
+class Blob:
+    """find_blobs 的返回值，下标顺序同固件 (x, y, w, h, pixels, cx, cy)"""
+
+    def __init__(self, rect, pixels, cx, cy):
+        self._t = tuple(rect) + (int(pixels), int(round(cx)), int(round(cy)))
+        self._cxf = cx
+        self._cyf = cy
+
+    def rect(self): return self._t[:4]
+    def x(self): return self._t[0]
+    def y(self): return self._t[1]
+    def w(self): return self._t[2]
+    def h(self): return self._t[3]
+    def pixels(self): return self._t[4]
+    def cx(self): return self._t[5]
+    def cy(self): return self._t[6]
+    def cxf(self): return self._cxf
+    def cyf(self): return self._cyf
+    def area(self): return self._t[2] * self._t[3]
+
+    def __getitem__(self, i):
+        return self._t[i]
+
+    def __len__(self):
+        return len(self._t)
+
+
+# ================ 图像对象 ================
+class Image:
+    """
+    Image(width, height, format) 或 Image.from_array(ndarray)
+    彩色图以 (H, W, 3) uint8 存储，灰度/二值图以 (H, W) uint8 存储（二值取 0/255）
+    alloc=ALLOC_REF 时不分配内存，像素放在 data（bytearray 等）的开头
+    """
+
+    def __init__(self, width, height, fmt=RGB565, alloc=ALLOC_MPGC, data=None, **kwargs):
+        ch = _CHANNELS[fmt]
+        shape = (height, width) if ch == 1 else (height, width, ch)
+        if alloc == ALLOC_REF:
+            self._a = np.frombuffer(data, np.uint8, count=width * height * ch).reshape(shape)   # 共享 data 的内存
+        else:
+            self._a = np.zeros(shape, np.uint8)
+        self._fmt = fmt
+
+    @classmethod
+    def from_array(cls, array, fmt=None):
+        img = cls.__new__(cls)
+        img._a = np.ascontiguousarray(array, dtype=np.uint8)
+        if fmt is None:
+            fmt = GRAYSCALE if img._a.ndim == 2 else (ARGB8888 if img._a.shape[2] == 4 else RGB565)
+        img._fmt = fmt
+        return img
+
+    # ---------- 基本属性 ----------
+    def width(self): return self._a.shape[1]
+    def height(self): return self._a.shape[0]
+    def format(self): return self._fmt
+    def size(self): return self._a.nbytes
+    def to_numpy_ref(self): return self._a
+
+    def bytearray(self):
+        """像素内存的可写视图（不拷贝），可作为另一张图的 data"""
+        return memoryview(self._a).cast("B")
+
+    def _is_color(self):
+        return self._a.ndim == 3
+
+    def _gray(self):
+        return _rgb_to_gray(self._a[..., :3]) if self._is_color() else self._a
+
+    def _color(self, color):
+        """把 (r, g, b) 或整数颜色转换成本图格式的像素值"""
+        if color is None:
+            color = (255, 255, 255)
+        if self._is_color():
+            if isinstance(color, int) and self._a.shape[2] == 4:
+                # ARGB8888 上的整数颜色按像素值 0xAARRGGBB 处理（0 为全透明）
+                return np.array([(color >> 16) & 255, (color >> 8) & 255, color & 255,
+                                 (color >> 24) & 255], np.uint8)
+            if isinstance(color, int):
+                color = (color, color, color)
+            c = list(color[:3])
+            if self._a.shape[2] == 4:
+                c = c + [255]
+            return np.array(c, np.uint8)
+        if isinstance(color, int):
+            return np.uint8(color)
+        return _rgb_to_gray(np.array(color[:3], np.uint8))
+
+    def _output(self, array, fmt, copy):
+        """copy=True 返回新图，copy=False 原地替换，copy 为 Image 时写入该缓冲区"""
+        if copy is True:
+            return Image.from_array(array, fmt)
+        target = self if copy is False else copy
+        if target._a.shape == array.shape:
+            target._a[...] = array
+        else:
+            target._a = np.ascontiguousarray(array)
+        target._fmt = fmt
+        return target
+
+    # ---------- 格式转换 / 拷贝 ----------
+    def copy(self, roi=None, copy_to=None):
+        x, y, w, h = _clip_roi(roi, self.width(), self.height())
+        return self._output(self._a[y:y + h, x:x + w].copy(), self._fmt, copy_to or True)
+
+    def crop(self, roi=None, copy=False):
+        x, y, w, h = _clip_roi(roi, self.width(), self.height())
+        return self._output(self._a[y:y + h, x:x + w].copy(), self._fmt, copy)
+
+    def to_grayscale(self, copy=True, roi=None):
+        x, y, w, h = _clip_roi(roi, self.width(), self.height())
+        src = self._a[y:y + h, x:x + w]
+        gray = _rgb_to_gray(src[..., :3]) if src.ndim == 3 else src.copy()
+        return self._output(gray, GRAYSCALE, copy)
+
+    def to_rgb565(self, copy=True):
+        rgb = self._a[..., :3] if self._is_color() else np.repeat(self._a[..., None], 3, axis=2)
+        return self._output(rgb.copy(), RGB565, copy)
+
+    def clear(self):
+        self._a[...] = 0
+        return self
+
+    # ---------- 像素处理 ----------
+    def histeq(self, adaptive=False, clip_limit=-1, mask=None):
+        gray = self._gray()
+        hist = np.bincount(gray.ravel(), minlength=256)
+        cdf = np.cumsum(hist)
+        nz = cdf[cdf > 0]
+        lo = nz[0] if len(nz) else 0
+        lut = np.clip(np.round((cdf - lo) * 255.0 / max(cdf[-1] - lo, 1)), 0, 255).astype(np.uint8)
+        if self._is_color():
+            scale = (lut[gray].astype(np.float32) + 1) / (gray.astype(np.float32) + 1)
+            rgb = np.clip(self._a[..., :3] * scale[..., None], 0, 255)
+            self._a[..., :3] = rgb.astype(np.uint8)
+        else:
+            self._a[...] = lut[gray]
+        return self
+
+    def _threshold_mask(self, thresholds, invert=False):
+        if self._is_color():
+            lab = _rgb_to_lab(self._a[..., :3])
+            mask = np.zeros(self._a.shape[:2], bool)
+            for t in thresholds:
+                lo_l, hi_l, lo_a, hi_a, lo_b, hi_b = t
+                mask |= ((lab[0] >= lo_l) & (lab[0] <= hi_l) & (lab[1] >= lo_a) &
+                         (lab[1] <= hi_a) & (lab[2] >= lo_b) & (lab[2] <= hi_b))
+        else:
+            mask = np.zeros(self._a.shape, bool)
+            for t in thresholds:
+                mask |= (self._a >= t[0]) & (self._a <= t[1])
+        return ~mask if invert else mask
+
+    def binary(self, thresholds, invert=False, zero=False, mask=None, copy=False):
+        m = self._threshold_mask(thresholds, invert)
+        if zero:
+            out = self._a.copy()
+            out[m] = 0
+        else:
+            out = np.where(m, 255, 0).astype(np.uint8)
+            if self._is_color():
+                out = np.repeat(out[..., None], self._a.shape[2], axis=2)
+        return self._output(out, self._fmt, copy)
+
+    def erode(self, size, threshold=None, mask=None):
+        k = 2 * size + 1
+        if threshold is None:
+            threshold = k * k - 2
+        on = self._gray() > 0
+        keep = on & (_box_count(on, size) - 1 > threshold)
+        self._set_binary(keep)
+        return self
+
+    def dilate(self, size, threshold=0, mask=None):
+        on = self._gray() > 0
+        grow = on | (_box_count(on, size) - on > threshold)
+        self._set_binary(grow)
+        return self
+
+    def _set_binary(self, m):
+        if self._is_color():
+            self._a[...] = np.where(m[..., None], 255, 0).astype(np.uint8)
+        else:
+            self._a[...] = np.where(m, 255, 0).astype(np.uint8)
+
+    def mean_pooled(self, x_div, y_div):
+        h = self.height() // y_div * y_div
+        w = self.width() // x_div * x_div
+        a = self._a[:h, :w].astype(np.uint16)
+        a = a.reshape(h // y_div, y_div, w // x_div, x_div, *a.shape[2:]).mean(axis=(1, 3))
+        return Image.from_array(a.astype(np.uint8), self._fmt)
+
+    def mean_pool(self, x_div, y_div):
+        pooled = self.mean_pooled(x_div, y_div)
+        self._a = pooled._a
+        return self
+
+    # ---------- 统计 ----------
+    def get_statistics(self, roi=None, thresholds=None, invert=False):
+        x, y, w, h = _clip_roi(roi, self.width(), self.height())
+        src = self._a[y:y + h, x:x + w]
+        if src.ndim == 3:
+            lab = _rgb_to_lab(src[..., :3])
+            return Statistics(np.clip(lab[0], 0, 100).astype(np.uint8), lab)
+        return Statistics(src)
+
+    def get_histogram(self, thresholds=None, invert=False, roi=None, bins=256, l_bins=101, **kwargs):
+        x, y, w, h = _clip_roi(roi, self.width(), self.height())
+        src = self._a[y:y + h, x:x + w]
+        if src.ndim == 3:
+            lab = _rgb_to_lab(src[..., :3])
+            return Histogram(np.clip(lab[0], 0, 100).astype(np.uint8), max(2, l_bins), 100)
+        return Histogram(src, max(2, bins), 255)
+
+    # ---------- 特征检测 ----------
+    def find_rects(self, roi=None, threshold=10000):
+        """
+        以 Otsu 分割出的暗区连通域近似固件的四边形检测：
+        角点取对角方向极值点，magnitude 为四边外侧与内侧的灰度差之和
+        """
+        x0, y0, w, h = _clip_roi(roi, self.width(), self.height())
+        if w < 8 or h < 8:
+            return []
+        gray = self._gray()
+        sub = gray[y0:y0 + h, x0:x0 + w]
+        # 固件按边缘检测四边形；这里用两级 Otsu 分割，取暗区（黑框）和
+        # 亮区（被黑框包围的纸面）的连通域作为候选，边框内外沿都能检出
+        first = _otsu(sub)
+        low = sub[sub <= first]
+        levels = sorted({first, _otsu(low) if low.size else first})
+        min_pixels = 2 * (w + h) // 20
+        rects = []
+        seen = set()
+        for level in levels:
+            for dark in (True, False):
+                mask = sub <= level if dark else sub > level
+                for c in _components(mask, x0, y0, min_pixels):
+                    rx, ry, rw, rh = c["rect"]
+                    if rw < 8 or rh < 8 or c["rect"] in seen:
+                        continue
+                    seen.add(c["rect"])
+                    mag, hit = self._edge_strength(gray, level, dark, c["corners"], c["cx"], c["cy"])
+                    if hit < 0.8 or mag < threshold:
+                        continue
+                    rects.append(Rect(c["rect"], c["corners"], mag))
+        return rects
+
+    def _edge_strength(self, gray, level, dark, corners, cx, cy):
+        """沿四边采样：返回 (边界内外灰度差之和, 边界内侧落在本连通域一侧的比例)"""
+        hgt, wid = gray.shape
+        pts = []
+        for i in range(4):
+            (ax, ay), (bx, by) = corners[i], corners[(i + 1) % 4]
+            n = max(int(max(abs(bx - ax), abs(by - ay))), 1)
+            t = np.arange(n) / n
+            pts.append(np.stack([ax + (bx - ax) * t, ay + (by - ay) * t], axis=1))
+        pts = np.concatenate(pts)
+        d = pts - np.array([cx, cy])
+        d /= np.maximum(np.hypot(d[:, 0], d[:, 1]), 1e-6)[:, None]
+
+        def sample(offset):
+            p = np.rint(pts + d * offset).astype(np.int64)
+            inside = (p[:, 0] >= 0) & (p[:, 0] < wid) & (p[:, 1] >= 0) & (p[:, 1] < hgt)
+            v = np.zeros(len(p), np.int32)
+            v[inside] = gray[p[inside, 1], p[inside, 0]]
+            return v, inside
+
+        outer, ok_out = sample(3.0)
+        inner, ok_in = sample(-1.0)
+        diff = np.where(ok_out & ok_in, outer - inner, 0)
+        if not dark:
+            diff = -diff
+        hit = float(np.mean(inner <= level if dark else inner > level))
+        return int(np.clip(diff, 0, None).sum()), hit
+
+    def find_blobs(self, thresholds, invert=False, roi=None, x_stride=2, y_stride=1,
+                   area_threshold=10, pixels_threshold=10, merge=False, margin=0, **kwargs):
+        x0, y0, w, h = _clip_roi(roi, self.width(), self.height())
+        if w == 0 or h == 0:
+            return []
+        sub = Image.from_array(self._a[y0:y0 + h, x0:x0 + w], self._fmt)
+        mask = sub._threshold_mask(thresholds, invert)
+        blobs = []
+        for c in _components(mask, x0, y0, pixels_threshold):
+            rx, ry, rw, rh = c["rect"]
+            if rw * rh < area_threshold:
+                continue
+            blobs.append([list(c["rect"]), c["pixels"], c["cx"], c["cy"]])
+        if merge:
+            blobs = _merge_blobs(blobs, margin)
+        return [Blob(*b) for b in blobs]
+
+    # ---------- 绘制 ----------
+    def _blend(self, ys, xs, color, alpha=None):
+        c = self._color(color)
+        if alpha is None:
+            self._a[ys, xs] = c
+        else:
+            a = alpha / 255.0
+            region = self._a[ys, xs].astype(np.float32)
+            self._a[ys, xs] = (region * (1 - a) + c.astype(np.float32) * a).astype(np.uint8)
+
+    def draw_rectangle(self, x, y=None, w=None, h=None, color=None, thickness=1, fill=False, alpha=None, **kwargs):
+        if y is None:
+            x, y, w, h = x[:4]
+        x0, y0, cw, ch = _clip_roi((x, y, w, h), self.width(), self.height())
+        if cw == 0 or ch == 0:
+            return self
+        if fill:
+            self._blend(slice(y0, y0 + ch), slice(x0, x0 + cw), color, alpha)
+            return self
+        t = max(int(thickness), 1)
+        for ys, xs in ((slice(y0, y0 + t), slice(x0, x0 + cw)),
+                       (slice(y0 + ch - t, y0 + ch), slice(x0, x0 + cw)),
+                       (slice(y0, y0 + ch), slice(x0, x0 + t)),
+                       (slice(y0, y0 + ch), slice(x0 + cw - t, x0 + cw))):
+            self._blend(ys, xs, color, alpha)
+        return self
+
+    def draw_circle(self, x, y, radius=None, color=None, thickness=1, fill=False, **kwargs):
+        r = int(radius)
+        x0, y0, cw, ch = _clip_roi((x - r, y - r, 2 * r + 1, 2 * r + 1), self.width(), self.height())
+        if cw == 0 or ch == 0:
+            return self
+        yy, xx = np.ogrid[y0:y0 + ch, x0:x0 + cw]
+        d2 = (xx - x) ** 2 + (yy - y) ** 2
+        m = d2 <= r * r
+        if not fill:
+            m &= d2 >= (r - max(int(thickness), 1)) ** 2
+        self._a[y0:y0 + ch, x0:x0 + cw][m] = self._color(color)
+        return self
+
+    def draw_line(self, x0, y0=None, x1=None, y1=None, color=None, thickness=1, **kwargs):
+        if y0 is None:
+            x0, y0, x1, y1 = x0[:4]
+        n = int(max(abs(x1 - x0), abs(y1 - y0))) + 1
+        xs = np.rint(np.linspace(x0, x1, n)).astype(np.int64)
+        ys = np.rint(np.linspace(y0, y1, n)).astype(np.int64)
+        t = max(int(thickness), 1)
+        for dy in range(-(t // 2), t - t // 2):
+            for dx in range(-(t // 2), t - t // 2):
+                px, py = xs + dx, ys + dy
+                ok = (px >= 0) & (px < self.width()) & (py >= 0) & (py < self.height())
+                self._a[py[ok], px[ok]] = self._color(color)
+        return self
+
+    def draw_cross(self, x, y, color=None, size=5, thickness=1, **kwargs):
+        self.draw_line(x - size, y, x + size, y, color=color, thickness=thickness)
+        self.draw_line(x, y - size, x, y + size, color=color, thickness=thickness)
+        return self
+
+    def draw_string(self, x, y, text, color=None, scale=1, **kwargs):
+        """不做字形光栅化，只画出文字占位框的下划线，用于保持绘制开销与可见性"""
+        w = int(len(str(text)) * 8 * scale)
+        h = int(10 * scale)
+        return self.draw_line(x, y + h, x + w, y + h, color=color)
+
+    def draw_string_advanced(self, x, y, char_size, text, color=None, **kwargs):
+        return self.draw_string(x, y, text, color=color, scale=char_size / 10.0)
+
+    def _scaled(self, x_scale, y_scale, hint):
+        """按比例缩放后的图：AREA 且为整数倍缩小时取块均值，否则最近邻"""
+        w = max(1, int(self.width() * x_scale))
+        h = max(1, int(self.height() * y_scale))
+        xd, yd = self.width() / w, self.height() / h
+        if hint & AREA and xd == int(xd) and yd == int(yd) and xd >= 1 and yd >= 1:
+            return self.mean_pooled(int(xd), int(yd))
+        ys = (np.arange(h) * self.height() // h)
+        xs = (np.arange(w) * self.width() // w)
+        return Image.from_array(self._a[ys][:, xs], self._fmt)
+
+    def draw_image(self, img, x, y, x_scale=1.0, y_scale=1.0, hint=0, **kwargs):
+        """把 img（按 x_scale/y_scale 缩放后）贴到 (x, y)；ARGB 源图按 alpha 通道混合"""
+        if x_scale != 1.0 or y_scale != 1.0:
+            img = img._scaled(x_scale, y_scale, hint)
+        x0, y0, w, h = _clip_roi((x, y, img.width(), img.height()), self.width(), self.height())
+        if w == 0 or h == 0:
+            return self
+        src = img._a[y0 - y:y0 - y + h, x0 - x:x0 - x + w]
+        dst = self._a[y0:y0 + h, x0:x0 + w]
+        if src.ndim == 2:
+            src = src[..., None].repeat(3, axis=2)
+        if src.shape[2] == 4:
+            a = src[..., 3:4].astype(np.float32) / 255.0
+            src = src[..., :3]
+        else:
+            a = None
+        if dst.ndim == 2:
+            src = _rgb_to_gray(src)
+            a = None if a is None else a[..., 0]
+        else:
+            dst = dst[..., :3]
+        dst[...] = src if a is None else (dst * (1 - a) + src * a).astype(np.uint8)
+        return self
+
+
+def _merge_blobs(blobs, margin):
+    """合并包围盒（外扩 margin 后）相交的色块"""
+    merged = True
+    while merged:
+        merged = False
+        out = []
+        for b in blobs:
+            for o in out:
+                (ax, ay, aw, ah), (bx, by, bw, bh) = o[0], b[0]
+                if (ax - margin < bx + bw and bx - margin < ax + aw and
+                        ay - margin < by + bh and by - margin < ay + ah):
+                    x, y = min(ax, bx), min(ay, by)
+                    o[0] = [x, y, max(ax + aw, bx + bw) - x, max(ay + ah, by + bh) - y]
+                    total = o[1] + b[1]
+                    o[2] = (o[2] * o[1] + b[2] * b[1]) / total
+                    o[3] = (o[3] * o[1] + b[3] * b[1]) / total
+                    o[1] = total
+                    merged = True
+                    break
+            else:
+                out.append(b)
+        blobs = out
+    return blobs
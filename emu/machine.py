@@ -0,0 +1,123 @@
+"""machine 仿真：回环 UART、FPIOA、Pin 和脚本化 TOUCH"""
+import hostboard
+
+__all__ = ["UART", "FPIOA", "Pin", "TOUCH"]
+
+
+class UART:
+    UART1 = 1
+    UART2 = 2
+    UART3 = 3
+    UART4 = 4
+    FIVEBITS = 5
+    SIXBITS = 6
+    SEVENBITS = 7
+    EIGHTBITS = 8
+    PARITY_NONE = 0
+    PARITY_ODD = 1
+    PARITY_EVEN = 2
+    STOPBITS_ONE = 1
+    STOPBITS_TWO = 2
+
+    def __init__(self, id, baudrate=115200, bits=8, parity=0, stop=1, timeout=0, **kwargs):
+        self.id = id
+        self.baudrate = baudrate
+        self._rx = bytearray()
+        self.tx_log = []
+
+    def init(self, baudrate=None, **kwargs):
+        if baudrate:
+            self.baudrate = baudrate
+
+    def deinit(self):
+        self._rx = bytearray()
+
+    def write(self, buf):
+        data = bytes(buf)
+        self.tx_log.append(data)
+        del self.tx_log[:-256]
+        self._rx.extend(data)          # 回环：写出的数据可以被读回
+        hostboard.uart_written(len(data), self.baudrate)
+        return len(data)
+
+    def any(self):
+        return len(self._rx)
+
+    def read(self, nbytes=None):
+        if not self._rx:
+            return None
+        n = len(self._rx) if nbytes is None else nbytes
+        data = bytes(self._rx[:n])
+        del self._rx[:n]
+        return data
+
+    def readline(self):
+        i = self._rx.find(b"\n")
+        return self.read(None if i < 0 else i + 1)
+
+
+class FPIOA:
+    def __init__(self):
+        self.functions = {}
+
+    def set_function(self, pin, func, **kwargs):
+        self.functions[pin] = func
+
+    def help(self, *args):
+        pass
+
+
+for _n in range(1, 5):
+    setattr(FPIOA, f"UART{_n}_TXD", 100 + _n * 2)
+    setattr(FPIOA, f"UART{_n}_RXD", 101 + _n * 2)
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_NONE = 0
+    PULL_UP = 1
+    PULL_DOWN = 2
+
+    def __init__(self, id, mode=IN, pull=PULL_NONE, value=0, **kwargs):
+        self._value = value
+
+    def value(self, v=None):
+        if v is None:
+            return self._value
+        self._value = v
+
+    def on(self):
+        self._value = 1
+
+    def off(self):
+        self._value = 0
+
+
+class _TouchInfo:
+    def __init__(self, x, y, event, track_id=0):
+        self.x = x
+        self.y = y
+        self.event = event
+        self.track_id = track_id
+        self.width = 1
+        self.timestamp = 0
+
+
+class TOUCH:
+    EVENT_NONE = 0
+    EVENT_UP = 1
+    EVENT_DOWN = 2
+    EVENT_MOVE = 3
+
+    _EVENTS = {"none": EVENT_NONE, "up": EVENT_UP, "down": EVENT_DOWN, "move": EVENT_MOVE}
+
+    def __init__(self, dev=0, **kwargs):
+        pass
+
+    def read(self, count=0):
+        return tuple(_TouchInfo(t["x"], t["y"], self._EVENTS[t.get("event", "down")], t.get("id", 0))
+                     for t in hostboard.touches(count or 5))
+
+    def deinit(self):
+        pass
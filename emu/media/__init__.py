@@ -0,0 +1 @@
+"""K230 media 包的主机端仿真：sensor / display / media"""
@@ -0,0 +1,38 @@
+"""media.display 仿真：show_image 只记录最近一帧和计数"""
+import hostboard
+from media.media import MediaManager, ALIGN_UP
+
+# 固件里 media.display 会连带导出 MediaManager，dianji.py 依赖这一点
+__all__ = ["Display", "MediaManager", "ALIGN_UP"]
+
+
+class Display:
+    ST7701 = 1
+    LT9611 = 2
+    HX8377 = 3
+    VIRT = 4
+
+    LAYER_VIDEO1 = 1
+    LAYER_VIDEO2 = 2
+    LAYER_OSD0 = 3
+    LAYER_OSD1 = 4
+    LAYER_OSD2 = 5
+    LAYER_OSD3 = 6
+
+    FLAG_ROTATION_0 = 0
+
+    width = 0
+    height = 0
+
+    @staticmethod
+    def init(type=None, width=800, height=480, osd_num=1, to_ide=False, fps=None, quality=90, **kwargs):
+        Display.width = width
+        Display.height = height
+
+    @staticmethod
+    def show_image(img, x=0, y=0, layer=None, alpha=255, **kwargs):
+        hostboard.show(img, Display.LAYER_OSD0 if layer is None else layer)
+
+    @staticmethod
+    def deinit():
+        pass
@@ -0,0 +1,19 @@
+"""media.media 仿真：MediaManager 与 ALIGN_UP"""
+
+__all__ = ["MediaManager", "ALIGN_UP"]
+
+
+def ALIGN_UP(value, align):
+    return (value + align - 1) // align * align
+
+
+class MediaManager:
+    _inited = False
+
+    @staticmethod
+    def init():
+        MediaManager._inited = True
+
+    @staticmethod
+    def deinit():
+        MediaManager._inited = False
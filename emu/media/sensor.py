@@ -0,0 +1,56 @@
+"""media.sensor 仿真：snapshot() 从录制语料或合成场景取帧"""
+import hostboard
+from image import Image, RGB565, GRAYSCALE
+
+__all__ = ["Sensor", "CAM_CHN_ID_0", "CAM_CHN_ID_1", "CAM_CHN_ID_2", "CAM_CHN_ID_MAX"]
+
+CAM_CHN_ID_0 = 0
+CAM_CHN_ID_1 = 1
+CAM_CHN_ID_2 = 2
+CAM_CHN_ID_MAX = 3
+
+
+class Sensor:
+    RGB565 = RGB565
+    RGB888 = RGB565
+    GRAYSCALE = GRAYSCALE
+    YUV420SP = RGB565
+
+    def __init__(self, id=2, width=640, height=480, fps=60):
+        self._size = {CAM_CHN_ID_0: (width, height)}
+        self._fmt = {CAM_CHN_ID_0: RGB565}
+        self._running = False
+
+    def reset(self):
+        self._running = False
+
+    def set_framesize(self, framesize=None, width=640, height=480, chn=CAM_CHN_ID_0, **kwargs):
+        self._size[chn] = (width, height)
+
+    def set_pixformat(self, pix_format, chn=CAM_CHN_ID_0):
+        self._fmt[chn] = pix_format
+
+    def set_hmirror(self, enable):
+        pass
+
+    def set_vflip(self, enable):
+        pass
+
+    def run(self):
+        self._running = True
+
+    def stop(self):
+        self._running = False
+
+    def width(self, chn=CAM_CHN_ID_0):
+        return self._size.get(chn, self._size[CAM_CHN_ID_0])[0]
+
+    def height(self, chn=CAM_CHN_ID_0):
+        return self._size.get(chn, self._size[CAM_CHN_ID_0])[1]
+
+    def snapshot(self, chn=CAM_CHN_ID_0):
+        width, height = self._size.get(chn, self._size[CAM_CHN_ID_0])
+        img = Image.from_array(hostboard.next_frame(width, height), RGB565)
+        if self._fmt.get(chn) == GRAYSCALE:
+            return img.to_grayscale()
+        return img
@@ -0,0 +1,53 @@
+"""
+在主机上运行设备脚本
+
+    python emu/run.py [--corpus frames.npz] [--max-frames 300] [--touch touch.json] serial2.py
+
+emu/ 目录被加入 sys.path 最前面，使脚本里的 media.* / machine / image
+解析到这里的仿真模块；time/os/gc 会补上 ticks_ms、exitpoint、mem_free 等接口。
+达到 --max-frames 后 snapshot() 抛出 KeyboardInterrupt，各脚本按原有路径退出。
+"""
+import argparse
+import json
+import os
+import runpy
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import hostboard  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="在主机上仿真运行 K230 脚本")
+    parser.add_argument("script", help="设备脚本路径，例如 serial2.py")
+    parser.add_argument("--corpus", help="录制帧语料（.npz 或 .npy 目录），缺省使用合成帧")
+    parser.add_argument("--max-frames", type=int, default=300, help="运行帧数，0 表示不限")
+    parser.add_argument("--lighting", help="合成帧光照: normal/dim/glare/uneven")
+    parser.add_argument("--touch", help="触摸脚本 JSON: [{\"frame\": 3, \"x\": 650, \"y\": 120}]")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--uart-realtime", action="store_true", help="按波特率模拟 UART 写耗时")
+    args = parser.parse_args(argv)
+
+    hostboard.install()
+    hostboard.configure(corpus=args.corpus, max_frames=args.max_frames or None,
+                        seed=args.seed, lighting=args.lighting,
+                        uart_realtime=args.uart_realtime)
+    if args.touch:
+        with open(args.touch) as f:
+            hostboard.touch_script[:] = json.load(f)
+
+    script = os.path.abspath(args.script)
+    sys.path.insert(1, os.path.dirname(script))
+    sys.argv = [script]
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except KeyboardInterrupt:
+        pass
+    s = hostboard.summary()
+    print(f"[emu] {s['frames']} frames, {s['shown']} shown, {s['ms_per_frame']:.2f} ms/frame, "
+          f"UART {s['uart_bytes']} bytes", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+UV 纸曝光剂量模型
+
+把目标平面划分成二维网格，每个激光位置按高斯光斑沉积剂量：
+    dose += rate * dwell * exp(-r^2 / (2 sigma^2)),  sigma = spot_size / 4
+（spot_size 取 1/e^2 直径）。整条轨迹一次性批量计算，
+用来在毫秒级评估某个扫描速度能否把线条完全曝光。
+
+    python exposure.py --radius 0.6 --speeds 0.1 0.2 0.5 1
+"""
+import argparse
+import numpy as np
+
+FULL_DOSE = 1.0   # 认为 UV 纸完全显色所需的剂量
+
+
+class DoseGrid:
+    """覆盖 width x height 平面（中心在原点）的剂量栅格"""
+
+    def __init__(self, width, height, cell=0.01):
+        self.width = width
+        self.height = height
+        self.cell = cell
+        self.nx = int(np.ceil(width / cell))
+        self.ny = int(np.ceil(height / cell))
+        self.x0 = -width / 2
+        self.y0 = -height / 2
+        self.dose = np.zeros((self.ny, self.nx))
+
+    @property
+    def extent(self):
+        """imshow 用的 (left, right, bottom, top)"""
+        return (self.x0, self.x0 + self.nx * self.cell, self.y0, self.y0 + self.ny * self.cell)
+
+    def clear(self):
+        self.dose.fill(0)
+
+    def deposit(self, xs, ys, dwell, rate, spot_size, chunk=4096):
+        """
+        批量沉积剂量
+        参数:
+            xs, ys: 光斑中心坐标数组
+            dwell: 每个位置的停留时间(s)，标量或与 xs 等长的数组
+            rate: 光斑中心的剂量率（每秒）
+            spot_size: 光斑 1/e^2 直径
+        """
+        xs = np.atleast_1d(np.asarray(xs, np.float64))
+        ys = np.atleast_1d(np.asarray(ys, np.float64))
+        amp = rate * np.broadcast_to(np.asarray(dwell, np.float64), xs.shape)
+        sigma = spot_size / 4.0
+        r = int(np.ceil(3 * sigma / self.cell))
+        offs = np.arange(-r, r + 1)
+        flat = self.dose.reshape(-1)
+
+        for s in range(0, len(xs), chunk):
+            x, y, a = xs[s:s + chunk], ys[s:s + chunk], amp[s:s + chunk]
+            ci = np.floor((x - self.x0) / self.cell).astype(np.int64)
+            cj = np.floor((y - self.y0) / self.cell).astype(np.int64)
+            cols = ci[:, None] + offs                      # (n, k)
+            rows = cj[:, None] + offs
+            # 高斯核可分离：先分别算 x、y 方向的权重，再做外积
+            gx = np.exp(-((self.x0 + (cols + 0.5) * self.cell - x[:, None]) ** 2) / (2 * sigma ** 2))
+            gy = np.exp(-((self.y0 + (rows + 0.5) * self.cell - y[:, None]) ** 2) / (2 * sigma ** 2))
+            gx *= (cols >= 0) & (cols < self.nx)
+            gy *= (rows >= 0) & (rows < self.ny)
+            w = gy[:, :, None] * gx[:, None, :] * a[:, None, None]
+            idx = (np.clip(rows, 0, self.ny - 1)[:, :, None] * self.nx +
+                   np.clip(cols, 0, self.nx - 1)[:, None, :])
+            flat += np.bincount(idx.ravel(), w.ravel(), flat.size)
+        return self
+
+    def line_mask(self, xs, ys, width):
+        """轨迹两侧 width/2 以内的格子（需要曝光的线条区域）"""
+        gx = self.x0 + (np.arange(self.nx) + 0.5) * self.cell
+        gy = self.y0 + (np.arange(self.ny) + 0.5) * self.cell
+        mask = np.zeros(self.dose.shape, bool)
+        pts = densify(xs, ys, self.cell)
+        r = int(np.ceil(width / 2 / self.cell))
+        for x, y in zip(*pts):
+            i = int((x - self.x0) / self.cell)
+            j = int((y - self.y0) / self.cell)
+            i0, i1 = max(i - r, 0), min(i + r + 1, self.nx)
+            j0, j1 = max(j - r, 0), min(j + r + 1, self.ny)
+            if i0 >= i1 or j0 >= j1:
+                continue
+            d2 = (gx[None, i0:i1] - x) ** 2 + (gy[j0:j1, None] - y) ** 2
+            mask[j0:j1, i0:i1] |= d2 <= (width / 2) ** 2
+        return mask
+
+    def coverage(self, mask, threshold=FULL_DOSE):
+        """线条区域中剂量达到阈值的比例"""
+        if not mask.any():
+            return 0.0
+        return float(np.mean(self.dose[mask] >= threshold))
+
+
+def densify(xs, ys, max_step):
+    """在折线上插点，使相邻点间距不超过 max_step"""
+    xs = np.asarray(xs, np.float64)
+    ys = np.asarray(ys, np.float64)
+    if len(xs) < 2:
+        return xs, ys
+    seg = np.hypot(np.diff(xs), np.diff(ys))
+    n = np.maximum(np.ceil(seg / max_step).astype(np.int64), 1)
+    idx = np.repeat(np.arange(len(n)), n)
+    t = (np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)) / np.repeat(n, n)
+    x = np.append(xs[idx] + t * np.diff(xs)[idx], xs[-1])
+    y = np.append(ys[idx] + t * np.diff(ys)[idx], ys[-1])
+    return x, y
+
+
+def scan_dose(grid, xs, ys, speed, rate, spot_size, passes=1):
+    """以恒定速度 speed 沿轨迹扫描 passes 遍后的剂量（先按 sigma/2 加密采样）"""
+    dx, dy = densify(xs, ys, spot_size / 8.0)
+    step = np.hypot(np.diff(dx), np.diff(dy))
+    dwell = np.append(step, 0.0) / speed
+    grid.clear()
+    grid.deposit(dx, dy, dwell * passes, rate, spot_size)
+    return grid
+
+
+def fastest_scan(xs, ys, speeds, rate, spot_size, width, height,
+                 cell=0.01, threshold=FULL_DOSE, required=0.99, passes=1):
+    """
+    评估一组扫描速度，返回 (最快的达标速度或 None, [(speed, coverage, 最低剂量), ...])
+    """
+    grid = DoseGrid(width, height, cell)
+    mask = grid.line_mask(xs, ys, spot_size / 2.0)
+    results = []
+    best = None
+    for speed in sorted(speeds):
+        scan_dose(grid, xs, ys, speed, rate, spot_size, passes)
+        cov = grid.coverage(mask, threshold)
+        results.append((speed, cov, float(grid.dose[mask].min()) if mask.any() else 0.0))
+        if cov >= required:
+            best = speed
+    return best, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="圆形扫描的曝光剂量评估")
+    parser.add_argument("--radius", type=float, default=0.6)
+    parser.add_argument("--width", type=float, default=4.0, help="平面宽 X")
+    parser.add_argument("--height", type=float, default=3.0, help="平面高 Y")
+    parser.add_argument("--spot", type=float, default=0.2, help="光斑直径")
+    parser.add_argument("--rate", type=float, default=2.5, help="光斑中心剂量率（每秒）")
+    parser.add_argument("--cell", type=float, default=0.01)
+    parser.add_argument("--passes", type=int, default=1)
+    parser.add_argument("--speeds", type=float, nargs="+", default=[0.05, 0.1, 0.15, 0.2, 0.3, 0.5, 1, 2])
+    args = parser.parse_args(argv)
+
+    theta = np.linspace(0, 2 * np.pi, 721)
+    xs, ys = args.radius * np.cos(theta), args.radius * np.sin(theta)
+    best, results = fastest_scan(xs, ys, args.speeds, args.rate, args.spot,
+                                 args.width, args.height, args.cell, passes=args.passes)
+    for speed, cov, low in results:
+        print(f"speed {speed:6.2f}/s  coverage {cov * 100:6.2f}%  min dose {low:.3f}")
+    print(f"fastest full exposure: {best if best is not None else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+单帧中间结果缓存
+
+每帧 snapshot 之后调用 reset(img)，各检测函数和调试叠加层通过同一个
+FrameContext 取灰度/均衡化/二值/池化图，每种结果每帧只计算一次。
+每种结果第一次用到时按整帧大小分配一块内存，之后一直复用；ROI 结果是这块
+内存开头部分的视图（alloc=image.ALLOC_REF），跟踪 ROI 随目标逐帧改变尺寸
+也不会重新分配像素内存，尺寸变化时只新建一个很小的图像头。
+
+    frame = FrameContext()
+    while True:
+        img = sensor.snapshot()
+        frame.reset(img)
+        gray = frame.gray()
+        binary_img = frame.binary([(55, 255)], erode=2)
+
+返回的图像由缓存持有，调用方不要原地修改（要修改请先 copy()）。
+同一种结果只有一块内存：同一帧里两个 ROI 会先后写进同一块，后算的结果覆盖
+前一个，前一个从缓存中去掉、下次取时重新计算，所以不要跨调用持有旧的返回值。
+整帧结果和 ROI 结果各用一块，互不覆盖。
+"""
+import time
+
+import image
+
+
+class FrameContext:
+    def __init__(self):
+        self.img = None
+        self.frame = 0       # 已处理帧数
+        self.t_ms = 0        # 本帧采集时刻 ticks_ms
+        self.allocs = 0      # 累计分配的像素内存块数，调试/测试用
+        self._memo = {}      # 本帧结果，reset 时清空
+        self._blocks = {}    # 名称 -> (整块图像, 其像素内存, 可容纳的像素数)
+        self._views = {}     # 名称 -> 当前尺寸的视图
+        self._owner = {}     # 名称 -> 当前内容对应的 _memo 键
+
+    def reset(self, img):
+        """切换到新的一帧"""
+        self.img = img
+        self.frame += 1
+        self.t_ms = time.ticks_ms()
+        self._memo.clear()
+        return self
+
+    def _buffer(self, key, name, w, h, fmt, cap=None):
+        """
+        取名为 name 的 w x h 缓冲区存放 key 的结果，缓冲区里原来的结果从本帧缓存中去掉
+        cap 为这种结果的最大尺寸 (宽, 高)，缺省为整帧大小
+        """
+        block = self._blocks.get(name)
+        if block is None or block[2] < w * h:
+            cw, ch = cap or (self.img.width(), self.img.height())
+            cw, ch = max(cw, w), max(ch, h)
+            img = image.Image(cw, ch, fmt)
+            block = (img, img.bytearray(), cw * ch)
+            self._blocks[name] = block
+            self._views.pop(name, None)
+            self.allocs += 1
+        buf = self._views.get(name)
+        if buf is None or buf.width() != w or buf.height() != h or buf.format() != fmt:
+            buf = image.Image(w, h, fmt, alloc=image.ALLOC_REF, data=block[1])
+            self._views[name] = buf
+        old = self._owner.get(name)
+        if old is not None and old != key:
+            self._memo.pop(old, None)
+        self._owner[name] = key
+        return buf
+
+    def source(self, roi=None):
+        """原图或其ROI拷贝"""
+        if roi is None:
+            return self.img
+        key = ("src", roi)
+        out = self._memo.get(key)
+        if out is None:
+            buf = self._buffer(key, "src", roi[2], roi[3], self.img.format())
+            out = self.img.copy(roi=roi, copy_to=buf)
+            self._memo[key] = out
+        return out
+
+    def gray(self, roi=None):
+        key = ("gray", roi)
+        out = self._memo.get(key)
+        if out is None:
+            src = self.source(roi)
+            buf = self._buffer(key, ("gray", roi is None), src.width(), src.height(), image.GRAYSCALE)
+            out = src.to_grayscale(copy=buf)
+            self._memo[key] = out
+        return out
+
+    def equalized(self, roi=None):
+        """直方图均衡化后的灰度图"""
+        key = ("eq", roi)
+        out = self._memo.get(key)
+        if out is None:
+            gray = self.gray(roi)
+            buf = self._buffer(key, ("eq", roi is None), gray.width(), gray.height(), image.GRAYSCALE)
+            out = gray.copy(copy_to=buf).histeq()
+            self._memo[key] = out
+        return out
+
+    def binary(self, thresholds, erode=0, equalize=True, roi=None):
+        """灰度阈值二值化，可选腐蚀；equalize=True 时以均衡化图为输入"""
+        key = ("bin", tuple(thresholds), erode, equalize, roi)
+        out = self._memo.get(key)
+        if out is None:
+            src = self.equalized(roi) if equalize else self.gray(roi)
+            # 缓冲区不按阈值区分：自动阈值逐帧变化时不会每个阈值各占一块内存，
+            # 同一帧内换阈值时旧阈值的结果由 _buffer 从缓存中去掉
+            name = ("bin", erode, equalize, roi is None)
+            buf = self._buffer(key, name, src.width(), src.height(), image.GRAYSCALE)
+            out = src.binary(thresholds, copy=buf)
+            if erode:
+                out.erode(erode)
+            self._memo[key] = out
+        return out
+
+    def _key_of(self, img):
+        """img 在本帧缓存中的键；不是缓存结果时用 id"""
+        if img is self.img:
+            return "img"
+        for k, v in self._memo.items():
+            if v is img:
+                return k
+        return id(img)
+
+    def pooled(self, src, x_div, y_div):
+        """src（本帧的原图或缓存中的图）的均值池化结果，同样写进复用的缓冲区"""
+        key = ("pool", self._key_of(src), x_div, y_div)
+        out = self._memo.get(key)
+        if out is None:
+            cap = (self.img.width() // x_div, self.img.height() // y_div)
+            buf = self._buffer(key, ("pool", x_div, y_div, src.format()),
+                               src.width() // x_div, src.height() // y_div, src.format(), cap)
+            # 按 AREA 缩小即均值池化；mean_pooled 每次都会新建一张图
+            out = buf.draw_image(src, 0, 0, x_scale=1 / x_div, y_scale=1 / y_div, hint=image.AREA)
+            self._memo[key] = out
+        return out
@@ -0,0 +1,90 @@
+"""
+自适应垃圾回收，替代每帧无条件 gc.collect()
+
+每帧末尾调用 poll()，按以下顺序判断是否回收:
+    low     gc.mem_free() 低于 min_free，立即回收
+    forced  上次回收后新分配超过 max_step，立即回收
+    idle    新分配超过 idle_step，且本帧用时 + 预计回收耗时 不超过帧预算
+            （回收发生在等待下一帧 snapshot 的空闲时间里，不拖慢帧率）
+都不满足就跳过，本帧只花两次 mem_alloc/mem_free 查询。
+
+    gcp = GCPolicy(frame_budget_ms=33)
+    while True:
+        img = sensor.snapshot()
+        ...
+        Display.show_image(img)
+        gcp.poll()
+    gcp.dump()
+"""
+import gc
+import time
+
+REASONS = ("low", "forced", "idle")
+LOW = 0
+FORCED = 1
+IDLE = 2
+
+
+class GCPolicy:
+    def __init__(self, min_free=512 * 1024, idle_step=32 * 1024, max_step=256 * 1024,
+                 frame_budget_ms=33):
+        self.min_free = min_free
+        self.idle_step = idle_step
+        self.max_step = max_step
+        self.budget_us = frame_budget_ms * 1000
+        self.pause_est = 5000            # 回收耗时估计 (us)，按实测平滑更新
+        self.counts = [0, 0, 0]          # 各原因的回收次数，顺序同 REASONS
+        self.polls = 0
+        self.total_us = 0                # 回收总耗时
+        self.last_us = 0
+        self.max_us = 0
+        self.mem_free = gc.mem_free()    # 最近一次回收后的剩余内存
+        self._base = gc.mem_alloc()      # 最近一次回收后的已分配量
+        self._t = time.ticks_us()
+
+    def poll(self):
+        """每帧调用一次，返回回收原因（LOW/FORCED/IDLE），未回收返回 -1"""
+        elapsed = time.ticks_diff(time.ticks_us(), self._t)
+        self.polls += 1
+        alloc = gc.mem_alloc()
+        grown = alloc - self._base
+        if grown < 0:                    # 期间发生过自动回收
+            self._base = alloc
+            grown = 0
+
+        if gc.mem_free() < self.min_free:
+            reason = LOW
+        elif grown >= self.max_step:
+            reason = FORCED
+        elif grown >= self.idle_step and elapsed + self.pause_est <= self.budget_us:
+            reason = IDLE
+        else:
+            reason = -1
+        if reason >= 0:
+            self.collect(reason)
+        self._t = time.ticks_us()
+        return reason
+
+    def collect(self, reason=FORCED):
+        """立即回收并记录耗时"""
+        t0 = time.ticks_us()
+        gc.collect()
+        dt = time.ticks_diff(time.ticks_us(), t0)
+        self.counts[reason] += 1
+        self.total_us += dt
+        self.last_us = dt
+        if dt > self.max_us:
+            self.max_us = dt
+        self.pause_est += (dt - self.pause_est) // 4
+        self.mem_free = gc.mem_free()
+        self._base = gc.mem_alloc()
+
+    def report(self):
+        n = sum(self.counts)
+        avg = self.total_us / n / 1000 if n else 0
+        return (f"gc: {n}/{self.polls} frames (low {self.counts[LOW]}, forced {self.counts[FORCED]}, "
+                f"idle {self.counts[IDLE]}), pause avg {avg:.2f}ms max {self.max_us / 1000:.2f}ms, "
+                f"free {self.mem_free // 1024}KB")
+
+    def dump(self):
+        print(self.report())
@@ -0,0 +1,23 @@
+"""
+云台几何：平面坐标与步进电机角度的换算
+
+激光器在原点，目标平面在 z = d 处；y 方向电机在 YZ 平面内偏转 alpha，
+x 方向电机在 XZ 平面内偏转 beta。只依赖 numpy，x/y 可以是数组。
+"""
+import numpy as np
+
+d = 10.0  # 平面距离 z = d
+
+
+def xy_to_angles(x, y, dist=None):
+    """平面坐标 (x, y) -> 步进电机角度 (alpha, beta)，单位弧度"""
+    dist = d if dist is None else dist
+    alpha = np.arctan(y / dist)  # YZ 平面投影角度（y 方向电机）
+    beta = np.arctan(x / dist)   # XZ 平面投影角度（x 方向电机）
+    return alpha, beta
+
+
+def angles_to_xy(alpha, beta, dist=None):
+    """xy_to_angles 的逆变换"""
+    dist = d if dist is None else dist
+    return dist * np.tan(beta), dist * np.tan(alpha)
@@ -0,0 +1,272 @@
+"""
+双轴步进云台 + 摄像头闭环离线仿真（主机端）
+
+按 pid.py 的增益调度 PID 公式，用 NumPy 同时仿真成百上千组增益：
+    - 电机: STEPS_PER_DEGREE 脉冲量化，MAX_SPEED / ACCELERATION 梯形加减速
+    - 摄像头: 固定帧率，画面相对真实位置滞后 delay_ms，检测噪声和丢帧
+    - 控制: 指令在帧时刻 + proc_ms 后生效，角度映射与 dianji.py 的线性映射一致，
+      偏航指令与 dianji.py 一样取反后发送
+_VectorPID 是 pid.PID 的另一份实现，check_pid() 在同一误差序列上逐帧对比两者，
+每次运行先做这项检查，公式不一致时直接退出。
+
+    python gimbal_sim.py                    # 评估 pid.py 中的默认增益
+    python gimbal_sim.py --random 2000      # 在默认增益附近随机搜索
+    python gimbal_sim.py --motor-sign 1 1   # 云台偏航方向装反时的响应（发散）
+"""
+import argparse
+import time
+
+import numpy as np
+
+import pid
+
+# ================ 云台/摄像头参数（与 dianji.py 一致） ================
+WIDTH = 800
+HEIGHT = 480
+MAX_ANGLE = 40
+STEPS_PER_DEGREE = 100
+MAX_SPEED = 1000         # 脉冲/秒
+ACCELERATION = 5000      # 脉冲/秒²
+HFOV = 80.0              # 摄像头水平视场角（度）
+# dianji.py 发送 send_motor_command(-angle_yaw, angle_pitch)：偏航指令取反。
+# 云台偏航正转时光斑在画面中向左移动，两个符号相乘后闭环才是负反馈
+COMMAND_SIGN = (-1.0, 1.0)   # 发给电机的角度 = COMMAND_SIGN * PID 映射出的角度
+MOTOR_SIGN = (-1.0, 1.0)     # 光斑像素位移 = MOTOR_SIGN * 云台转角 * px_per_degree
+
+DEFAULT_OFFSETS = ((-120, 60), (90, -45), (30, 20), (-60, -90))  # 初始 激光 - 目标（像素）
+
+
+def px_per_degree(hfov=HFOV, width=WIDTH):
+    """云台转 1 度时光斑在画面中心附近移动的像素数（摄像头与云台共轴）"""
+    f = (width / 2.0) / np.tan(np.radians(hfov) / 2.0)
+    return f * np.pi / 180.0
+
+
+# ================ 增益集合 ================
+def default_gains(n=1):
+    """pid.py 中的增益复制 n 份"""
+    sched = np.array(pid.GAIN_SCHEDULE, np.float64)
+    return {
+        "kp": np.full(n, pid.BASE_KP),
+        "ki": np.full(n, pid.BASE_KI),
+        "kd": np.full(n, pid.BASE_KD),
+        "max_integral": np.full(n, float(pid.MAX_INTEGRAL)),
+        "limits": np.tile(sched[:-1, 0], (n, 1)),     # (n, 2) 档位下限
+        "mult": np.tile(sched[:, 1:], (n, 1, 1)),      # (n, 3, 3) 各档 KP/KI/KD 倍率
+    }
+
+
+def random_gains(n, rng, spread=10.0, base=None):
+    """在 base（缺省为默认增益）附近按对数均匀分布随机采样"""
+    g = base or default_gains(1)
+    out = {}
+    for key in ("kp", "ki", "kd", "max_integral"):
+        out[key] = g[key][0] * np.exp(rng.uniform(-np.log(spread), np.log(spread), n))
+    hi = rng.uniform(40, 250, n)
+    out["limits"] = np.stack([hi, hi * rng.uniform(0.1, 0.7, n)], axis=1)
+    out["mult"] = g["mult"][0] * np.exp(rng.uniform(-np.log(3), np.log(3), (n, 3, 3)))
+    return out
+
+
+def to_schedule(gains, i):
+    """第 i 组增益转换成 pid.PID 的构造参数"""
+    lim = list(gains["limits"][i]) + [-1]
+    sched = tuple((float(l),) + tuple(float(v) for v in m) for l, m in zip(lim, gains["mult"][i]))
+    return dict(kp=float(gains["kp"][i]), ki=float(gains["ki"][i]), kd=float(gains["kd"][i]),
+                max_integral=float(gains["max_integral"][i]), schedule=sched)
+
+
+# ================ 仿真 ================
+class _VectorPID:
+    """pid.PID 的向量化版本，公式逐项一致"""
+
+    def __init__(self, gains):
+        self.g = gains
+        n = len(gains["kp"])
+        self.integral = np.zeros((n, 2))
+        self.last_error = np.zeros((n, 2))
+
+    def update(self, error, dt, active):
+        g = self.g
+        abs_err = np.abs(error).max(axis=1)
+        band = np.where(abs_err > g["limits"][:, 0], 0, np.where(abs_err > g["limits"][:, 1], 1, 2))
+        m = g["mult"][np.arange(len(band)), band]               # (n, 3)
+        kp = (g["kp"] * m[:, 0])[:, None]
+        ki = (g["ki"] * m[:, 1])[:, None]
+        kd = (g["kd"] * m[:, 2])[:, None]
+        lim = g["max_integral"][:, None]
+
+        act = active[:, None]
+        integral = np.clip(self.integral + error * dt, -lim, lim)
+        out = kp * error + ki * integral + kd * (error - self.last_error) / dt
+        self.integral = np.where(act, integral, self.integral)
+        self.last_error = np.where(act, error, self.last_error)
+        return out
+
+
+def check_pid(gains, frames=200, dropout=0.1, seed=0):
+    """
+    在同一组随机误差序列上逐帧运行 pid.PID 和 _VectorPID，返回两者输出的最大差值
+    丢帧时 pid.PID 不调用 update（与 dianji.py 检测不到时一致），_VectorPID 保持状态
+    """
+    rng = np.random.default_rng(seed)
+    n = len(gains["kp"])
+    # 误差覆盖三个增益档位，也会撞到积分限幅
+    errors = rng.normal(0.0, 1.0, (frames, n, 2)) * rng.choice([5.0, 50.0, 300.0], (frames, n, 1))
+    dts = rng.uniform(0.01, 0.06, frames)
+    active = rng.random((frames, n)) >= dropout
+    scalar = [pid.PID(**to_schedule(gains, i)) for i in range(n)]
+    vector = _VectorPID(gains)
+    worst = 0.0
+    for k in range(frames):
+        out = vector.update(errors[k], dts[k], active[k])
+        for i in range(n):
+            if active[k, i]:
+                ref = scalar[i].update(float(errors[k, i, 0]), float(errors[k, i, 1]), float(dts[k]))
+                worst = max(worst, abs(ref[0] - out[i, 0]), abs(ref[1] - out[i, 1]))
+    return worst
+
+
+def simulate(gains, offsets=DEFAULT_OFFSETS, duration=4.0, fps=30, delay_ms=30, proc_ms=10,
+             noise_px=1.5, dropout=0.02, hfov=HFOV, seed=0, tol_px=5.0, relative=False,
+             command_sign=COMMAND_SIGN, motor_sign=MOTOR_SIGN):
+    """
+    仿真每组增益在每个初始偏差下的阶跃响应
+    relative: 电机把指令脉冲当作相对当前目标的增量（缺省按绝对位置处理）
+    command_sign/motor_sign: 见 COMMAND_SIGN / MOTOR_SIGN
+    返回 dict:
+        settle   (n,) 最差情况下的稳定时间(s)，始终未稳定为 inf
+        overshoot(n,) 最大超调(像素)
+        final    (n,) 结束时的最大误差(像素)
+        iae      (n,) 平均绝对误差积分(像素*s)
+        error    (n, s, frames) 每帧真实误差
+    """
+    rng = np.random.default_rng(seed)
+    n = len(gains["kp"])
+    offs = np.asarray(offsets, np.float64)
+    s = len(offs)
+    batch = {k: np.repeat(v, s, axis=0) for k, v in gains.items()}
+    m = n * s
+    laser0 = np.tile(offs, (n, 1))                 # 相对目标的初始光斑位置
+    ppd = px_per_degree(hfov)
+    scale = np.array([MAX_ANGLE / (WIDTH // 2), MAX_ANGLE / (HEIGHT // 2)])
+    cmd_sign = np.asarray(command_sign, np.float64)
+    ppd_axis = ppd * np.asarray(motor_sign, np.float64)
+
+    h = 0.001                                      # 电机子步长 1ms
+    total = int(duration * 1000)
+    frame_ms = int(round(1000.0 / fps))
+    frames = total // frame_ms
+    ring = delay_ms + 1
+    hist = np.zeros((ring, m, 2))                  # 电机位置历史（脉冲）
+
+    pos = np.zeros((m, 2))
+    vel = np.zeros((m, 2))
+    cmd = np.zeros((m, 2))
+    pending = []                                   # [(生效时刻ms, 指令)]
+    ctrl = _VectorPID(batch)
+    err_log = np.zeros((m, frames))
+    proj_log = np.zeros((m, frames))
+    e0 = -laser0 / np.maximum(np.linalg.norm(laser0, axis=1, keepdims=True), 1e-9)
+    dt = max(frame_ms / 1000.0, 0.001)
+
+    for t in range(total):
+        if t % frame_ms == 0 and t // frame_ms < frames:
+            k = t // frame_ms
+            seen = hist[(t - delay_ms) % ring] if t >= delay_ms else np.zeros((m, 2))
+            laser = laser0 + ppd_axis * np.round(seen) / STEPS_PER_DEGREE
+            meas = laser + rng.normal(0.0, noise_px, (m, 2))
+            active = rng.random(m) >= dropout
+            out = ctrl.update(-meas, dt, active)   # 目标在原点，误差 = 0 - 激光
+            angle = cmd_sign * out * scale
+            pulses = np.trunc(angle * STEPS_PER_DEGREE)   # MotorWriter 用 int() 截断
+            pending.append((t + proc_ms, np.where(active[:, None], pulses, np.nan)))
+
+            true = laser0 + ppd_axis * np.round(pos) / STEPS_PER_DEGREE
+            err_log[:, k] = np.abs(true).max(axis=1)
+            proj_log[:, k] = (true * e0).sum(axis=1)
+
+        while pending and pending[0][0] <= t:
+            new = pending.pop(0)[1]
+            if relative:
+                new = new + cmd
+            cmd = np.where(np.isnan(new), cmd, new)
+
+        # 梯形加减速：按剩余距离限制速度，再按加速度逼近
+        e = cmd - pos
+        v_des = np.sign(e) * np.minimum(MAX_SPEED, np.sqrt(2 * ACCELERATION * np.abs(e)))
+        vel += np.clip(v_des - vel, -ACCELERATION * h, ACCELERATION * h)
+        pos += vel * h
+        hist[t % ring] = pos
+
+    ft = np.arange(frames) * frame_ms / 1000.0
+    over = err_log > tol_px
+    last_bad = np.where(over.any(axis=1), frames - 1 - np.argmax(over[:, ::-1], axis=1), -1)
+    settle = np.where(last_bad >= frames - 1, np.inf, ft[np.minimum(last_bad + 1, frames - 1)])
+    overshoot = np.maximum(proj_log.max(axis=1), 0.0)
+    iae = err_log.sum(axis=1) * frame_ms / 1000.0
+
+    worst = lambda a: a.reshape(n, s).max(axis=1)
+    return {
+        "settle": worst(settle),
+        "overshoot": worst(overshoot),
+        "final": worst(err_log[:, -1]),
+        "iae": iae.reshape(n, s).mean(axis=1),
+        "error": err_log.reshape(n, s, frames),
+    }
+
+
+def rank(result):
+    """按 (稳定时间, 误差积分) 排序的索引"""
+    return np.lexsort((result["iae"], result["settle"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="云台闭环 PID 离线仿真")
+    parser.add_argument("--random", type=int, default=0, help="随机采样的增益组数")
+    parser.add_argument("--spread", type=float, default=1000.0, help="随机采样范围：默认增益的 1/spread ~ spread 倍")
+    parser.add_argument("--relative", action="store_true", help="电机指令按相对增量处理")
+    parser.add_argument("--duration", type=float, default=4.0)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--delay-ms", type=int, default=30, help="摄像头画面滞后")
+    parser.add_argument("--proc-ms", type=int, default=10, help="处理+串口延迟")
+    parser.add_argument("--noise", type=float, default=1.5, help="检测噪声标准差(像素)")
+    parser.add_argument("--dropout", type=float, default=0.02, help="丢帧概率")
+    parser.add_argument("--hfov", type=float, default=HFOV)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--motor-sign", type=float, nargs=2, default=MOTOR_SIGN,
+                        help="云台转角到光斑位移的方向（偏航 俯仰）")
+    args = parser.parse_args(argv)
+
+    gains = default_gains(1)
+    if args.random:
+        cand = random_gains(args.random, np.random.default_rng(args.seed), args.spread)
+        gains = {k: np.concatenate([gains[k], cand[k]]) for k in gains}
+
+    diff = check_pid(gains)
+    if diff > 1e-9:
+        raise SystemExit(f"_VectorPID 与 pid.PID 不一致: 最大差值 {diff:.3g}")
+
+    t0 = time.perf_counter()
+    res = simulate(gains, duration=args.duration, fps=args.fps, delay_ms=args.delay_ms,
+                   proc_ms=args.proc_ms, noise_px=args.noise, dropout=args.dropout,
+                   hfov=args.hfov, seed=args.seed, relative=args.relative,
+                   motor_sign=args.motor_sign)
+    elapsed = time.perf_counter() - t0
+    print(f"{len(gains['kp'])} gain sets x {len(DEFAULT_OFFSETS)} steps in {elapsed:.2f}s")
+
+    def show(i, label):
+        print(f"{label:<8} settle {res['settle'][i]:6.2f}s  overshoot {res['overshoot'][i]:6.1f}px  "
+              f"final {res['final'][i]:6.1f}px  iae {res['iae'][i]:7.1f}")
+        if label != "default":
+            print(f"         {to_schedule(gains, i)}")
+
+    show(0, "default")
+    if args.random:
+        for r, i in enumerate(rank(res)[:args.top]):
+            show(i, f"#{r + 1}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+规则网格查找表（设备端公共部分）
+
+ik_table.py（云台角度）和 undistort.py（镜头偏移）都是在规则网格上存放两个
+int16 分量、用同一种文件头的表，这里是两者共用的读取和插值，各表只定义
+magic 和头部保留字节的含义。
+
+查询做定点双线性插值：输入坐标按 FRAC_BITS 位小数转成定点数，小数输入不会被
+截断成整数；网格范围内的整数输入结果与不带小数时逐位相同（超出网格钳位到
+边界时，定点版本多走了不到 1/16 单位）。每次只有几次数组读取和整数乘加。
+
+文件格式（小端）:
+    头部 28 字节 '<4sBBBBiiHHiHH'
+        magic   b'IKLT' / b'UDST' ...
+        version 2
+        3 字节  含义由各表决定，其中一个是 shift（网格间距 = 1 << shift）
+        x0, y0  网格原点
+        nx, ny  网格点数
+        scale   量化: 每单位对应的 LSB 数
+        width, height  生成表时的图像尺寸（像素），0 表示与图像尺寸无关（平面表）
+    数据 nx*ny*2 个 int16，按行存放两个分量交错
+
+按像素坐标查询的表只对生成时的分辨率有效，加载时传入当前图像尺寸，
+不一致时 read 抛出 ValueError，不会静默地用错表。
+"""
+import struct
+from array import array
+
+HEADER = '<4sBBBBiiHHiHH'
+HEADER_SIZE = 28
+FRAC_BITS = 4       # 输入坐标保留的小数位，1/16 单位
+
+
+class GridTable:
+    def __init__(self, shift, x0, y0, nx, ny, scale, data, size=(0, 0)):
+        self.shift = shift
+        self.x0 = x0
+        self.y0 = y0
+        self.nx = nx
+        self.ny = ny
+        self.scale = scale
+        self.data = data
+        self.size = size     # 生成表时的图像尺寸 (宽, 高)
+        # 以下都在定点坐标下：1 单位 = 1 << FRAC_BITS
+        self._one = 1 << FRAC_BITS
+        self._shift = shift + FRAC_BITS
+        self._cell = 1 << self._shift
+        self._mask = self._cell - 1
+        self._half = 1 << (2 * self._shift - 1)
+        # 最后一个格子内的最大偏移，超出网格的输入被钳位到边界
+        self._max_x = ((nx - 1) << self._shift) - 1
+        self._max_y = ((ny - 1) << self._shift) - 1
+
+    def lookup(self, x, y):
+        """定点双线性插值，返回两个分量，单位 1/scale"""
+        fx = int((x - self.x0) * self._one + 0.5)
+        fy = int((y - self.y0) * self._one + 0.5)
+        if fx < 0:
+            fx = 0
+        elif fx > self._max_x:
+            fx = self._max_x
+        if fy < 0:
+            fy = 0
+        elif fy > self._max_y:
+            fy = self._max_y
+
+        shift = self._shift
+        u = fx & self._mask
+        v = fy & self._mask
+        iu = self._cell - u
+        iv = self._cell - v
+        i = ((fy >> shift) * self.nx + (fx >> shift)) << 1
+        j = i + (self.nx << 1)
+        t = self.data
+
+        a = (t[i] * iu + t[i + 2] * u) * iv + (t[j] * iu + t[j + 2] * u) * v
+        b = (t[i + 1] * iu + t[i + 3] * u) * iv + (t[j + 1] * iu + t[j + 3] * u) * v
+        return (a + self._half) >> (2 * shift), (b + self._half) >> (2 * shift)
+
+
+def read(path, magic, version, what, size=None):
+    """
+    读取表文件，返回 (头部 3 字节, (width, height), x0, y0, nx, ny, scale, data)
+    what 是错误信息里的表名；size 为当前图像尺寸 (宽, 高)，给出时表必须是按
+    这个尺寸生成的；格式或尺寸不对时抛出 ValueError
+    """
+    with open(path, 'rb') as f:
+        head = f.read(HEADER_SIZE)
+        if len(head) != HEADER_SIZE:
+            raise ValueError(f"{what} header too short")
+        m, v, b0, b1, b2, x0, y0, nx, ny, scale, width, height = struct.unpack(HEADER, head)
+        if m != magic or v != version:
+            raise ValueError(f"not a valid {what}")
+        if nx < 2 or ny < 2 or scale <= 0:
+            raise ValueError(f"{what} grid too small")
+        if size is not None and (width, height) != tuple(size):
+            raise ValueError(f"{what} is for {width}x{height} images, not {size[0]}x{size[1]}")
+        data = array('h', bytes(nx * ny * 4))
+        if f.readinto(data) != nx * ny * 4:
+            raise ValueError(f"{what} truncated")
+    return (b0, b1, b2), (width, height), x0, y0, nx, ny, scale, data
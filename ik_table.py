@@ -0,0 +1,38 @@
+"""
+逆运动学查找表（设备端加载器）
+
+由主机上的 iklut.py 生成的二进制表：在规则网格上存放 (yaw, pitch) 角度，
+查询时做定点双线性插值（grid_table.py），不做三角函数运算。小数输入
+（PID 输出）不会被截断成整数，也就没有单侧死区和整像素的台阶。
+
+文件格式见 grid_table.py，头部 3 个保留字节依次为:
+    kind    0=平面(单位 mm)  1=图像(单位 像素)
+    shift   网格间距 = 1 << shift
+    保留
+magic 为 b'IKLT'，scale 为每度对应的 LSB 数，数据按 (yaw, pitch) 交错。
+图像表的 width/height 为生成时的画面尺寸，平面表为 0。
+"""
+from grid_table import FRAC_BITS, HEADER, HEADER_SIZE, GridTable, read
+
+MAGIC = b'IKLT'
+VERSION = 2
+
+KIND_PLANE = 0
+KIND_IMAGE = 1
+
+
+class IKTable(GridTable):
+    def __init__(self, kind, shift, x0, y0, nx, ny, scale, data, size=(0, 0)):
+        GridTable.__init__(self, shift, x0, y0, nx, ny, scale, data, size)
+        self.kind = kind
+
+    def angles(self, x, y):
+        """返回 (yaw, pitch)，单位度"""
+        yaw, pitch = self.lookup(x, y)
+        return yaw / self.scale, pitch / self.scale
+
+
+def load(path, size=None):
+    """读取查找表文件，格式不对或不是按 size=(宽, 高) 生成的表时抛出 ValueError"""
+    (kind, shift, _), wh, x0, y0, nx, ny, scale, data = read(path, MAGIC, VERSION, "IK table", size)
+    return IKTable(kind, shift, x0, y0, nx, ny, scale, data, wh)
@@ -0,0 +1,202 @@
+"""
+逆运动学查找表生成器（主机端）
+
+在目标平面（单位 mm）或摄像头图像（单位像素）的规则网格上精确计算云台角度，
+量化为 int16 写成 ik_table.py 能直接加载的二进制表；设备端只做整数双线性插值。
+
+    python iklut.py plane --d 10 --width 4 --height 3 --out ik_plane.ikl
+    python iklut.py image --hfov 80 --out ik_image.ikl
+
+几何模型:
+    separable  alpha/beta 各自只取决于 y/x，与 circle.py 的 xy_to_angles 一致
+    gimbal     先偏航后俯仰的双轴云台: yaw = atan(x/d), pitch = atan(y/sqrt(x^2+d^2))
+"""
+import argparse
+import struct
+
+import numpy as np
+
+from ik_table import FRAC_BITS, HEADER, KIND_IMAGE, KIND_PLANE, MAGIC, VERSION
+
+ANGLE_SCALE = 100   # 0.01 度；dianji.py 中 STEPS_PER_DEGREE = 100，即 1 LSB = 1 脉冲
+
+
+# ================ 几何模型 ================
+def plane_to_angles(x, y, dist, model="separable"):
+    """平面坐标 -> (yaw, pitch)，单位度；x/y 与 dist 同单位"""
+    x = np.asarray(x, np.float64)
+    y = np.asarray(y, np.float64)
+    yaw = np.arctan2(x, dist)
+    if model == "gimbal":
+        pitch = np.arctan2(y, np.hypot(x, dist))
+    elif model == "separable":
+        pitch = np.arctan2(y, dist)
+    else:
+        raise ValueError(f"unknown model: {model}")
+    return np.degrees(yaw), np.degrees(pitch)
+
+
+def pixel_to_plane(u, v, width, height, hfov, dist, offset=(0.0, 0.0)):
+    """
+    针孔摄像头（光轴垂直于平面）像素 -> 平面坐标
+    offset: 摄像头光心相对激光转轴的平移，平面单位；为 0 时结果与距离无关
+    """
+    f = (width / 2.0) / np.tan(np.radians(hfov) / 2.0)
+    x = (np.asarray(u, np.float64) - width / 2.0) / f * dist + offset[0]
+    y = (np.asarray(v, np.float64) - height / 2.0) / f * dist + offset[1]
+    return x, y
+
+
+# ================ 表格 ================
+class Table:
+    """与设备端文件一一对应的表：data 为 (ny, nx, 2) int16"""
+
+    def __init__(self, kind, shift, x0, y0, data, scale=ANGLE_SCALE, size=(0, 0)):
+        self.kind = kind
+        self.shift = shift
+        self.x0 = int(x0)
+        self.y0 = int(y0)
+        self.data = np.ascontiguousarray(data, np.int16)
+        self.scale = scale
+        self.size = tuple(size)   # 图像表对应的画面尺寸，平面表为 (0, 0)
+
+    @property
+    def nx(self):
+        return self.data.shape[1]
+
+    @property
+    def ny(self):
+        return self.data.shape[0]
+
+    def to_bytes(self):
+        head = struct.pack(HEADER, MAGIC, VERSION, self.kind, self.shift, 0,
+                           self.x0, self.y0, self.nx, self.ny, self.scale, *self.size)
+        return head + self.data.astype('<i2').tobytes()
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    def lookup(self, x, y):
+        """与 ik_table.IKTable.lookup 逐位一致的向量化定点插值，返回 int 数组 (yaw, pitch)"""
+        shift = self.shift + FRAC_BITS
+        cell = 1 << shift
+        one = 1 << FRAC_BITS
+        fx = np.floor((np.asarray(x, np.float64) - self.x0) * one + 0.5).astype(np.int64)
+        fy = np.floor((np.asarray(y, np.float64) - self.y0) * one + 0.5).astype(np.int64)
+        fx = np.clip(fx, 0, ((self.nx - 1) << shift) - 1)
+        fy = np.clip(fy, 0, ((self.ny - 1) << shift) - 1)
+        u, v = fx & (cell - 1), fy & (cell - 1)
+        i, j = fx >> shift, fy >> shift
+        t = self.data.astype(np.int64)
+        top = t[j, i] * (cell - u)[..., None] + t[j, i + 1] * u[..., None]
+        bottom = t[j + 1, i] * (cell - u)[..., None] + t[j + 1, i + 1] * u[..., None]
+        acc = top * (cell - v)[..., None] + bottom * v[..., None]
+        out = (acc + (1 << (2 * shift - 1))) >> (2 * shift)
+        return out[..., 0], out[..., 1]
+
+    def angles(self, x, y):
+        yaw, pitch = self.lookup(x, y)
+        return yaw / self.scale, pitch / self.scale
+
+
+def load(path):
+    with open(path, "rb") as f:
+        raw = f.read()
+    size = struct.calcsize(HEADER)
+    magic, version, kind, shift, _, x0, y0, nx, ny, scale, w, h = struct.unpack(HEADER, raw[:size])
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not an IK table")
+    data = np.frombuffer(raw[size:], '<i2', count=nx * ny * 2).reshape(ny, nx, 2)
+    return Table(kind, shift, x0, y0, data, scale, (w, h))
+
+
+def _grid(lo, hi, shift):
+    """覆盖 [lo, hi] 的网格原点和网格点坐标（整数单位）"""
+    cell = 1 << shift
+    x0 = int(np.floor(lo))
+    n = int(np.ceil((hi - x0) / cell)) + 1
+    return x0, x0 + cell * np.arange(max(n, 2))
+
+
+def _quantize(yaw, pitch, scale):
+    q = np.rint(np.stack([yaw, pitch], axis=-1) * scale)
+    if np.abs(q).max() > 32767:
+        raise ValueError("angle out of int16 range, lower the scale")
+    return q.astype(np.int16)
+
+
+def build_plane(width, height, dist, shift=5, model="separable", scale=ANGLE_SCALE):
+    """
+    覆盖 width x height 平面（中心在原点）的表
+    width/height/dist 单位 m，表内坐标单位 mm
+    """
+    x0, gx = _grid(-width * 500.0, width * 500.0, shift)
+    y0, gy = _grid(-height * 500.0, height * 500.0, shift)
+    xx, yy = np.meshgrid(gx / 1000.0, gy / 1000.0)
+    yaw, pitch = plane_to_angles(xx, yy, dist, model)
+    return Table(KIND_PLANE, shift, x0, y0, _quantize(yaw, pitch, scale), scale)
+
+
+def build_image(width, height, hfov, dist, offset=(0.0, 0.0), shift=4,
+                model="separable", scale=ANGLE_SCALE, margin=0):
+    """
+    覆盖摄像头画面的表，表内坐标单位像素
+    margin: 画面外额外覆盖的像素（PID 输出可能超出画面）
+    """
+    x0, gu = _grid(-margin, width + margin, shift)
+    y0, gv = _grid(-margin, height + margin, shift)
+    uu, vv = np.meshgrid(gu, gv)
+    x, y = pixel_to_plane(uu, vv, width, height, hfov, dist, offset)
+    yaw, pitch = plane_to_angles(x, y, dist, model)
+    return Table(KIND_IMAGE, shift, x0, y0, _quantize(yaw, pitch, scale), scale, (width, height))
+
+
+def max_error(table, exact, xs, ys):
+    """在给定采样点上与精确模型比较，返回最大误差（度）"""
+    xx, yy = np.meshgrid(xs, ys)
+    yaw, pitch = table.angles(xx, yy)
+    ey, ep = exact(xx, yy)
+    return float(max(np.abs(yaw - ey).max(), np.abs(pitch - ep).max()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成云台逆运动学查找表")
+    parser.add_argument("kind", choices=["plane", "image"])
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--d", type=float, default=10.0, help="平面距离 (m)")
+    parser.add_argument("--model", choices=["separable", "gimbal"], default="separable")
+    parser.add_argument("--shift", type=int, help="网格间距 = 2^shift（mm 或像素）")
+    parser.add_argument("--width", type=float, help="平面宽 (m) 或图像宽 (px)")
+    parser.add_argument("--height", type=float, help="平面高 (m) 或图像高 (px)")
+    parser.add_argument("--hfov", type=float, default=80.0,
+                        help="摄像头水平视场角（度）；缺省 80 对应 dianji.py 中画面边缘 = MAX_ANGLE")
+    parser.add_argument("--offset", type=float, nargs=2, default=(0.0, 0.0), help="摄像头相对转轴的平移 (m)")
+    parser.add_argument("--margin", type=int, default=160, help="图像表在画面外的覆盖范围 (px)")
+    args = parser.parse_args(argv)
+
+    if args.kind == "plane":
+        w, h = args.width or 4.0, args.height or 3.0
+        shift = 5 if args.shift is None else args.shift
+        table = build_plane(w, h, args.d, shift, args.model)
+        xs = np.linspace(-w * 500, w * 500, 397)
+        ys = np.linspace(-h * 500, h * 500, 301)
+        err = max_error(table, lambda x, y: plane_to_angles(x / 1000.0, y / 1000.0, args.d, args.model), xs, ys)
+    else:
+        w, h = int(args.width or 800), int(args.height or 480)
+        shift = 4 if args.shift is None else args.shift
+        table = build_image(w, h, args.hfov, args.d, args.offset, shift, args.model, margin=args.margin)
+        xs, ys = np.arange(0, w), np.arange(0, h)
+
+        def exact(u, v):
+            return plane_to_angles(*pixel_to_plane(u, v, w, h, args.hfov, args.d, args.offset), args.d, args.model)
+
+        err = max_error(table, exact, xs, ys)
+
+    table.save(args.out)
+    print(f"{args.out}: {table.nx}x{table.ny} grid, cell {1 << table.shift}, "
+          f"{len(table.to_bytes())} bytes, max error {err:.4f} deg")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+二维电机指令输出（不阻塞视觉循环）
+
+    motor = MotorWriter(motor_uart, MOTOR_ID, STEPS_PER_DEGREE)
+    motor.set(yaw, pitch)   # 只记录最新目标，旧的未发送目标被覆盖
+    motor.poll()            # 距上一帧已超过 min_gap_ms 才真正写串口
+
+帧格式与原 send_motor_command 相同:
+    AA 55 [ID] [YAW_PULSES(int32 BE)] [PITCH_PULSES(int32 BE)] [CHECKSUM]
+校验和为 ID 到 PITCH 各字节之和的低 8 位。12 字节一帧，能一次放进 UART 发送 FIFO。
+"""
+import struct
+import time
+
+FRAME_SIZE = 12
+MIN_GAP_MS = 5   # 两帧指令之间的最小间隔（原实现里的 sleep_ms(5)）
+
+
+class MotorWriter:
+    def __init__(self, uart, motor_id=0x01, steps_per_degree=100, min_gap_ms=MIN_GAP_MS):
+        self.uart = uart
+        self.steps_per_degree = steps_per_degree
+        self.min_gap_ms = min_gap_ms
+        self.buf = bytearray(FRAME_SIZE)
+        self.buf[0] = 0xAA
+        self.buf[1] = 0x55
+        self.buf[2] = motor_id
+        self.pending = None        # 待发送的 (yaw_pulses, pitch_pulses)
+        self.last_sent = None
+        self.last_send_ms = None
+        self.sent = 0              # 实际写出的帧数
+        self.coalesced = 0         # 被更新目标覆盖掉的帧数
+        self.unchanged = 0         # 与上次发送相同而省略的帧数
+
+    def set(self, yaw_angle, pitch_angle):
+        """提交新的目标角度（度），覆盖尚未发送的旧目标"""
+        target = (int(yaw_angle * self.steps_per_degree), int(pitch_angle * self.steps_per_degree))
+        if self.pending is not None:
+            self.coalesced += 1
+        if target == self.last_sent:
+            self.pending = None
+            self.unchanged += 1
+            return
+        self.pending = target
+
+    def ready(self, now=None):
+        if self.last_send_ms is None:
+            return True
+        now = time.ticks_ms() if now is None else now
+        return time.ticks_diff(now, self.last_send_ms) >= self.min_gap_ms
+
+    def poll(self, now=None):
+        """间隔已到且有待发送目标时写出一帧，返回是否发送"""
+        if self.pending is None:
+            return False
+        now = time.ticks_ms() if now is None else now
+        if not self.ready(now):
+            return False
+        yaw, pitch = self.pending
+        buf = self.buf
+        struct.pack_into('>ii', buf, 3, yaw, pitch)
+        s = 0
+        for i in range(2, FRAME_SIZE - 1):
+            s += buf[i]
+        buf[FRAME_SIZE - 1] = s & 0xFF
+        self.uart.write(buf)
+        self.last_sent = self.pending
+        self.last_send_ms = now
+        self.pending = None
+        self.sent += 1
+        return True
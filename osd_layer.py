@@ -0,0 +1,97 @@
+"""
+静态界面图层
+
+滑块面板、按钮等不随帧变化的界面画在独立的 ARGB OSD 图层上，叠在摄像头
+图层之上；只有部件被标记为脏（阈值变化、模式切换）时才重画并重新提交，
+其余帧只在摄像头图像上画检测结果、帧率等动态内容。
+
+    ui = OSDLayer(800, 480)
+    ui.add("sliders", draw_threshold_sliders, mode="adjust", rect=(50, 50, 500, 400))
+    ui.add("back", draw_back_button, mode="detect", rect=(620, 400, 150, 60))
+    ui.set_mode("adjust")
+    while True:
+        ...
+        ui.invalidate("sliders")     # 值变化时
+        ui.render()                  # 没有脏部件时直接返回
+
+每个部件声明自己的绘制区域 rect；重画时只把脏部件的区域清成透明再重画，
+与这些区域重叠的部件（例如滑块下面的半透明背景）连同它们的区域一起重画，
+其余部件的像素保持不动。没有给出区域的部件按整层处理。
+隐藏模式下的部件保留脏标记，切换到它所在的模式时整层重画。
+"""
+import image
+from media.display import Display
+
+TRANSPARENT = 0     # ARGB8888 像素值，alpha = 0
+
+
+class OSDLayer:
+    def __init__(self, width, height, layer=Display.LAYER_OSD1):
+        self.img = image.Image(width, height, image.ARGB8888)
+        self.layer = layer
+        self.mode = None
+        self.redraws = 0
+        self._parts = []       # (名称, 绘制函数, 所属模式, 绘制区域)，按添加顺序绘制
+        self._dirty = {}
+        self._force = True     # 模式切换后即使没有可见部件也要清空图层
+
+    def add(self, name, draw, mode=None, rect=None):
+        """
+        注册部件；draw(img) 把部件画到图层上，mode 为 None 时所有模式都显示
+        rect 为 draw 会画到的区域 (x, y, w, h)，None 时视为整层
+        """
+        if rect is None:
+            rect = (0, 0, self.img.width(), self.img.height())
+        self._parts.append((name, draw, mode, rect))
+        self._dirty[name] = True
+
+    def invalidate(self, name=None):
+        """标记部件需要重画，name 为 None 时标记全部"""
+        if name is None:
+            for key in self._dirty:
+                self._dirty[key] = True
+        else:
+            self._dirty[name] = True
+
+    def set_mode(self, mode):
+        if mode != self.mode:
+            self.mode = mode
+            self._force = True
+
+    def _visible(self, part_mode):
+        return part_mode is None or part_mode == self.mode
+
+    def render(self):
+        """有可见的脏部件时重画它们的区域并提交显示，返回是否重画"""
+        if self._force:
+            # 模式切换：整层清空，重画当前模式的全部部件
+            self._force = False
+            self.img.clear()
+            redraw = [p for p in self._parts if self._visible(p[2])]
+        else:
+            redraw = [p for p in self._parts if self._dirty[p[0]] and self._visible(p[2])]
+            if not redraw:
+                return False
+            # 重画的部件会画满自己的区域，与这些区域重叠的可见部件也要一起重画
+            grown = True
+            while grown:
+                grown = False
+                for p in self._parts:
+                    if p not in redraw and self._visible(p[2]) and \
+                            any(_overlap(p[3], q[3]) for q in redraw):
+                        redraw.append(p)
+                        grown = True
+            for p in redraw:
+                x, y, w, h = p[3]
+                self.img.draw_rectangle(x, y, w, h, color=TRANSPARENT, fill=True)
+        for p in self._parts:       # 按添加顺序画，保持上下层次
+            if p in redraw:
+                p[1](self.img)
+                self._dirty[p[0]] = False
+        Display.show_image(self.img, layer=self.layer)
+        self.redraws += 1
+        return True
+
+
+def _overlap(a, b):
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
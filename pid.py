@@ -0,0 +1,79 @@
+"""
+带增益调度的双轴 PID（dianji.py 的 pid_controller 使用）
+
+误差越大比例越强、积分越弱；GAIN_SCHEDULE 按顺序匹配第一个
+max(|ex|, |ey|) > 下限 的档位。主机上的 gimbal_sim.py 以同样的公式
+向量化仿真；pid_tune.py 搜索出的增益表用 load_gains() 读取。
+"""
+import json
+
+# ================ 默认增益 ================
+BASE_KP = 0.005
+BASE_KI = 0.0005
+BASE_KD = 0.0001
+MAX_INTEGRAL = 20000
+
+# (误差下限(像素), KP倍率, KI倍率, KD倍率)
+GAIN_SCHEDULE = (
+    (100, 2.0, 0.5, 0.8),
+    (30, 1.5, 1.0, 1.0),
+    (-1, 0.8, 1.5, 1.2),
+)
+
+
+class PID:
+    def __init__(self, kp=BASE_KP, ki=BASE_KI, kd=BASE_KD,
+                 max_integral=MAX_INTEGRAL, schedule=GAIN_SCHEDULE):
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.max_integral = max_integral
+        self.schedule = schedule
+        self.reset()
+
+    def reset(self):
+        self.integral_x = 0
+        self.integral_y = 0
+        self.last_error_x = 0
+        self.last_error_y = 0
+
+    def gains(self, abs_error):
+        """返回当前误差对应的 (KP, KI, KD)"""
+        for limit, p, i, d in self.schedule:
+            if abs_error > limit:
+                return self.kp * p, self.ki * i, self.kd * d
+        _, p, i, d = self.schedule[-1]
+        return self.kp * p, self.ki * i, self.kd * d
+
+    def update(self, error_x, error_y, dt):
+        """输入像素误差和时间间隔(s)，返回 (output_x, output_y)"""
+        KP, KI, KD = self.gains(max(abs(error_x), abs(error_y)))
+        lim = self.max_integral
+
+        self.integral_x += error_x * dt
+        self.integral_y += error_y * dt
+        self.integral_x = max(min(self.integral_x, lim), -lim)
+        self.integral_y = max(min(self.integral_y, lim), -lim)
+
+        output_x = KP * error_x + KI * self.integral_x + KD * (error_x - self.last_error_x) / dt
+        output_y = KP * error_y + KI * self.integral_y + KD * (error_y - self.last_error_y) / dt
+
+        self.last_error_x = error_x
+        self.last_error_y = error_y
+        return output_x, output_y
+
+
+def load_gains(path):
+    """读取 pid_tune.py 生成的 JSON 增益表，返回 PID 的构造参数"""
+    with open(path) as f:
+        table = json.load(f)
+    schedule = tuple(tuple(band) for band in table["schedule"])
+    if len(schedule) == 0 or len(schedule[0]) != 4:
+        raise ValueError("bad gain schedule")
+    return {
+        "kp": table["kp"],
+        "ki": table["ki"],
+        "kd": table["kd"],
+        "max_integral": table["max_integral"],
+        "schedule": schedule,
+    }
@@ -0,0 +1,191 @@
+"""
+PID 增益调度自动整定（主机端）
+
+在 gimbal_sim.py 的云台模型上搜索完整的增益调度：基础 KP/KI/KD、积分限幅、
+两个档位阈值和 3x3 倍率。先在对数空间随机采样，再用对角高斯的交叉熵/CMA 式
+进化策略细化；每批候选按进程池切块，各进程内部仍是向量化仿真。
+
+报告 (稳定时间, 超调, 稳态误差) 的 Pareto 前沿，并把按权重选出的一组写成
+pid.py 可加载的 JSON 增益表：
+
+    python pid_tune.py --random 4000 --generations 20 --out pid_gains.json
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import gimbal_sim
+
+# ================ 参数空间 ================
+# 向量布局: log(kp, ki, kd, max_integral), 阈值高档, 低档/高档比例, log(3x3 倍率)
+DIM = 4 + 2 + 9
+LOWER = np.array([np.log(1e-4), np.log(1e-4), np.log(1e-6), np.log(10.0), 40.0, 0.1] + [np.log(0.1)] * 9)
+UPPER = np.array([np.log(10.0), np.log(10.0), np.log(0.1), np.log(1e6), 300.0, 0.8] + [np.log(10.0)] * 9)
+
+WEIGHTS = (1.0, 0.02, 0.1)   # 综合目标 = 稳定时间(s) + w1*超调(px) + w2*稳态误差(px)
+
+
+def decode(vecs):
+    """(n, DIM) 参数向量 -> gimbal_sim 增益字典"""
+    v = np.clip(np.atleast_2d(vecs), LOWER, UPPER)
+    hi = v[:, 4]
+    return {
+        "kp": np.exp(v[:, 0]),
+        "ki": np.exp(v[:, 1]),
+        "kd": np.exp(v[:, 2]),
+        "max_integral": np.exp(v[:, 3]),
+        "limits": np.stack([hi, hi * v[:, 5]], axis=1),
+        "mult": np.exp(v[:, 6:]).reshape(-1, 3, 3),
+    }
+
+
+def encode(gains):
+    """增益字典 -> 参数向量"""
+    lim = gains["limits"]
+    return np.column_stack([
+        np.log(gains["kp"]), np.log(gains["ki"]), np.log(gains["kd"]), np.log(gains["max_integral"]),
+        lim[:, 0], lim[:, 1] / lim[:, 0], np.log(gains["mult"].reshape(-1, 9)),
+    ])
+
+
+def _evaluate_chunk(args):
+    vecs, sim_kwargs = args
+    res = gimbal_sim.simulate(decode(vecs), **sim_kwargs)
+    return np.column_stack([res["settle"], res["overshoot"], res["final"], res["iae"]])
+
+
+def evaluate(pool, vecs, sim_kwargs, chunk=256):
+    """并行评估，返回 (n, 4): settle, overshoot, final, iae"""
+    parts = [(vecs[i:i + chunk], sim_kwargs) for i in range(0, len(vecs), chunk)]
+    if pool is None:
+        return np.vstack([_evaluate_chunk(p) for p in parts])
+    return np.vstack(list(pool.map(_evaluate_chunk, parts)))
+
+
+def score(metrics, duration, weights=WEIGHTS):
+    settle = np.where(np.isfinite(metrics[:, 0]), metrics[:, 0], 2 * duration)
+    return weights[0] * settle + weights[1] * metrics[:, 1] + weights[2] * metrics[:, 2]
+
+
+def pareto_front(metrics):
+    """(稳定时间, 超调, 稳态误差) 三目标的非支配解索引，按稳定时间排序"""
+    ok = np.flatnonzero(np.isfinite(metrics[:, 0]))
+    obj = metrics[ok, :3]
+    keep = []
+    for i in np.argsort(obj[:, 0], kind="stable"):
+        dominated = np.all(obj <= obj[i], axis=1) & np.any(obj < obj[i], axis=1)
+        if not dominated.any():
+            keep.append(ok[i])
+    return np.array(keep, np.int64)
+
+
+# ================ 搜索 ================
+def search(random_n=4000, generations=20, population=512, elite=0.1, workers=None,
+           seed=0, sim_kwargs=None, weights=WEIGHTS, log=print):
+    """随机采样 + 交叉熵进化，返回所有评估过的 (vecs, metrics)"""
+    sim_kwargs = dict(sim_kwargs or {})
+    duration = sim_kwargs.get("duration", 4.0)
+    rng = np.random.default_rng(seed)
+    start = encode(gimbal_sim.default_gains(1))
+
+    all_vecs = [start]
+    pool = ProcessPoolExecutor(workers) if (workers or os.cpu_count() or 1) > 1 else None
+    try:
+        all_m = [evaluate(pool, start, sim_kwargs)]
+        if random_n:
+            vecs = rng.uniform(LOWER, UPPER, (random_n, DIM))
+            all_vecs.append(vecs)
+            all_m.append(evaluate(pool, vecs, sim_kwargs))
+        vecs = np.vstack(all_vecs)
+        metrics = np.vstack(all_m)
+        log(f"random: {len(vecs)} evaluated, best score {score(metrics, duration, weights).min():.3f}")
+
+        n_elite = max(2, int(population * elite))
+        s = score(metrics, duration, weights)
+        top = vecs[np.argsort(s)[:n_elite]]
+        mean = top.mean(axis=0)
+        std = np.maximum(top.std(axis=0), (UPPER - LOWER) * 0.02)
+        for g in range(generations):
+            cand = np.clip(mean + std * rng.standard_normal((population, DIM)), LOWER, UPPER)
+            m = evaluate(pool, cand, sim_kwargs)
+            vecs = np.vstack([vecs, cand])
+            metrics = np.vstack([metrics, m])
+            s = score(metrics, duration, weights)
+            # 精英取自历史全部候选，均值/方差平滑更新，方差设下限避免过早收敛
+            top = vecs[np.argsort(s)[:n_elite]]
+            mean = 0.3 * mean + 0.7 * top.mean(axis=0)
+            std = np.maximum(0.5 * std + 0.5 * top.std(axis=0), (UPPER - LOWER) * 0.005)
+            log(f"gen {g + 1:>3}: best score {s.min():.3f}, settle {metrics[np.argmin(s), 0]:.2f}s")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return vecs, metrics
+
+
+def gain_table(vec):
+    """单组参数向量 -> pid.py 可加载的增益表"""
+    g = gimbal_sim.to_schedule(decode(vec), 0)
+    return {
+        "kp": g["kp"],
+        "ki": g["ki"],
+        "kd": g["kd"],
+        "max_integral": g["max_integral"],
+        "schedule": [list(band) for band in g["schedule"]],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PID 增益调度自动整定")
+    parser.add_argument("--random", type=int, default=4000, help="随机采样数")
+    parser.add_argument("--generations", type=int, default=20)
+    parser.add_argument("--population", type=int, default=512)
+    parser.add_argument("--workers", type=int, help="进程数，缺省为 CPU 核数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--weights", type=float, nargs=3, default=WEIGHTS,
+                        help="选出最终增益时 稳定时间/超调/稳态误差 的权重")
+    parser.add_argument("--duration", type=float, default=4.0)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--delay-ms", type=int, default=30)
+    parser.add_argument("--proc-ms", type=int, default=10)
+    parser.add_argument("--noise", type=float, default=1.5)
+    parser.add_argument("--relative", action="store_true", help="电机指令按相对增量处理")
+    parser.add_argument("--out", help="把选出的增益表写成 JSON")
+    parser.add_argument("--front", type=int, default=10, help="打印的 Pareto 前沿条数")
+    args = parser.parse_args(argv)
+
+    sim_kwargs = dict(duration=args.duration, fps=args.fps, delay_ms=args.delay_ms,
+                      proc_ms=args.proc_ms, noise_px=args.noise, seed=args.seed,
+                      relative=args.relative)
+    t0 = time.perf_counter()
+    vecs, metrics = search(args.random, args.generations, args.population, workers=args.workers,
+                           seed=args.seed, sim_kwargs=sim_kwargs, weights=args.weights)
+    print(f"{len(vecs)} gain sets evaluated in {time.perf_counter() - t0:.1f}s")
+
+    front = pareto_front(metrics)
+    print(f"\nPareto front ({len(front)} sets)")
+    print(f"{'settle s':>9}{'overshoot':>11}{'final px':>10}{'iae':>8}")
+    step = max(1, len(front) // args.front)
+    for i in front[::step][:args.front]:
+        settle, over, final, iae = metrics[i]
+        print(f"{settle:>9.2f}{over:>11.1f}{final:>10.1f}{iae:>8.1f}")
+
+    s = score(metrics, args.duration, args.weights)
+    best = int(np.argmin(s))
+    settle, over, final, _ = metrics[best]
+    print(f"\nselected: settle {settle:.2f}s, overshoot {over:.1f}px, final {final:.1f}px")
+    print(f"default:  settle {metrics[0, 0]:.2f}s, overshoot {metrics[0, 1]:.1f}px, final {metrics[0, 2]:.1f}px")
+    table = gain_table(vecs[best])
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(table, f, indent=2)
+        print(f"gain table written to {args.out}")
+    else:
+        print(json.dumps(table))
+
+
+if __name__ == "__main__":
+    main()
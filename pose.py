@@ -0,0 +1,155 @@
+"""
+矩形靶面位姿解算（四点单应，闭式解）
+
+用 find_rects 给出的四个角点和标定过的相机模型，解出靶面相对相机的位置：
+    1. 角点按 左上/右上/右下/左下 排序，去畸变并归一化到 (u, v) = ((x-cx)/fx, (y-cy)/fy)
+    2. Heckbert 闭式解求单位正方形到四边形的单应，再右乘靶面(mm)到单位
+       正方形的缩放平移矩阵，得到 H = [r1 r2 t] * s
+    3. s 取 r1、r2 两列模长的平均，t 为靶面中心在相机坐标系下的位置(mm)
+    4. 光轴与靶面的交点由 H 的前两行解 2x2 方程得到
+
+全部是固定次数的乘加，没有迭代。
+
+    cam = Camera(480, 320, focal_px=500)
+    solver = PoseSolver(cam, 297, 210)
+    pose = solver.solve(rect.corners())
+    if pose:
+        distance_mm, x_mm, y_mm, depth_mm, tilt_deg = pose
+"""
+import math
+
+
+class Camera:
+    """针孔相机 + 两项径向畸变（k1, k2）"""
+
+    def __init__(self, width, height, focal_px, fy=None, cx=None, cy=None, k1=0.0, k2=0.0):
+        self.width = width
+        self.height = height
+        self.fx = float(focal_px)
+        self.fy = float(fy if fy is not None else focal_px)
+        self.cx = width / 2 if cx is None else cx
+        self.cy = height / 2 if cy is None else cy
+        self.k1 = k1
+        self.k2 = k2
+        self._ifx = 1.0 / self.fx
+        self._ify = 1.0 / self.fy
+
+    def normalize(self, x, y):
+        """像素坐标 -> 去畸变的归一化坐标；畸变按一步近似逆（小畸变足够）"""
+        u = (x - self.cx) * self._ifx
+        v = (y - self.cy) * self._ify
+        if self.k1 or self.k2:
+            r2 = u * u + v * v
+            s = 1.0 / (1.0 + r2 * (self.k1 + self.k2 * r2))
+            u *= s
+            v *= s
+        return u, v
+
+    def project(self, X, Y, Z):
+        """相机坐标(mm) -> 像素坐标（含畸变），仿真/自检用"""
+        u = X / Z
+        v = Y / Z
+        r2 = u * u + v * v
+        d = 1.0 + r2 * (self.k1 + self.k2 * r2)
+        return self.cx + self.fx * u * d, self.cy + self.fy * v * d
+
+
+def order_corners(corners):
+    """按 左上、右上、右下、左下（图像坐标，y 向下）排序"""
+    mx = (corners[0][0] + corners[1][0] + corners[2][0] + corners[3][0]) / 4
+    my = (corners[0][1] + corners[1][1] + corners[2][1] + corners[3][1]) / 4
+    pts = sorted(corners, key=lambda p: math.atan2(p[1] - my, p[0] - mx))
+    # atan2 从 -pi 开始，依次为 左上、右上、右下、左下（y 向下时顺时针）
+    start = 0
+    best = pts[0][0] + pts[0][1]
+    for i in range(1, 4):
+        s = pts[i][0] + pts[i][1]
+        if s < best:
+            best = s
+            start = i
+    return pts[start:] + pts[:start]
+
+
+def square_to_quad(p):
+    """单位正方形 (0,0),(1,0),(1,1),(0,1) 到四边形 p 的单应，返回 3x3 行主序元组"""
+    (x0, y0), (x1, y1), (x2, y2), (x3, y3) = p
+    sx = x0 - x1 + x2 - x3
+    sy = y0 - y1 + y2 - y3
+    if abs(sx) < 1e-12 and abs(sy) < 1e-12:
+        return (x1 - x0, x2 - x1, x0,
+                y1 - y0, y2 - y1, y0,
+                0.0, 0.0, 1.0)
+    dx1 = x1 - x2
+    dx2 = x3 - x2
+    dy1 = y1 - y2
+    dy2 = y3 - y2
+    den = dx1 * dy2 - dx2 * dy1
+    if den == 0:
+        return None
+    g = (sx * dy2 - dx2 * sy) / den
+    h = (dx1 * sy - sx * dy1) / den
+    return (x1 - x0 + g * x1, x3 - x0 + h * x3, x0,
+            y1 - y0 + g * y1, y3 - y0 + h * y3, y0,
+            g, h, 1.0)
+
+
+class PoseSolver:
+    def __init__(self, camera, long_mm, short_mm):
+        self.camera = camera
+        self.long_mm = long_mm
+        self.short_mm = short_mm
+        self.size_mm = (long_mm, short_mm)     # 最近一次解算的 (宽, 高)，跟随靶面朝向
+
+    def solve(self, corners):
+        """
+        返回 (distance_mm, x_mm, y_mm, depth_mm, tilt_deg)，退化时返回 None
+            distance_mm  相机到靶面中心的直线距离
+            x_mm, y_mm   靶面中心相对光轴落点的靶面坐标（与像素偏移同号）
+            depth_mm     靶面中心沿光轴的深度
+            tilt_deg     靶面法线与光轴的夹角
+        靶面横放/竖放两种朝向各解一次，取 r1、r2 更接近正交等长的一组。
+        """
+        norm = self.camera.normalize
+        m = square_to_quad([norm(x, y) for x, y in order_corners(corners)])
+        if m is None:
+            return None
+        best = self._solve(m, self.long_mm, self.short_mm)
+        if self.long_mm != self.short_mm:
+            other = self._solve(m, self.short_mm, self.long_mm)
+            if best is None or (other is not None and other[0] < best[0]):
+                best = other
+        if best is None:
+            return None
+        self.size_mm = best[1]
+        return best[2]
+
+    def _solve(self, m, w, h):
+        """按靶面宽 w、高 h 解算，返回 (正交残差, (w, h), 位姿)"""
+        a, b, c, d, e, f, g, k, _ = m
+        # 靶面坐标 (X, Y)(mm，中心为原点) -> 单位正方形: (X/w + 0.5, Y/h + 0.5)
+        h11, h12, h13 = a / w, b / h, (a + b) * 0.5 + c
+        h21, h22, h23 = d / w, e / h, (d + e) * 0.5 + f
+        h31, h32, h33 = g / w, k / h, (g + k) * 0.5 + 1.0
+
+        n1 = math.sqrt(h11 * h11 + h21 * h21 + h31 * h31)
+        n2 = math.sqrt(h12 * h12 + h22 * h22 + h32 * h32)
+        if n1 == 0 or n2 == 0:
+            return None
+        residual = abs(n1 - n2) / (n1 + n2) + abs(h11 * h12 + h21 * h22 + h31 * h32) / (n1 * n2)
+        s = 2.0 / (n1 + n2)
+        if h33 < 0:            # 靶面必须在相机前方
+            s = -s
+        tx, ty, tz = h13 * s, h23 * s, h33 * s
+        distance = math.sqrt(tx * tx + ty * ty + tz * tz)
+
+        # 法线 r1 x r2 的 z 分量给出倾角
+        nz = (h11 * h22 - h21 * h12) * s * s
+        tilt = math.degrees(math.acos(max(-1.0, min(1.0, abs(nz)))))
+
+        # 光轴 (u, v) = (0, 0) 在靶面上的落点: H 前两行 = 0
+        det = h11 * h22 - h12 * h21
+        if det == 0:
+            return None
+        ax = (h12 * h23 - h22 * h13) / det
+        ay = (h21 * h13 - h11 * h23) / det
+        return residual, (w, h), (distance, -ax, -ay, tz, tilt)
@@ -0,0 +1,163 @@
+"""
+逐阶段帧耗时分析
+
+每帧 start() 开始计时，每个阶段结束时 mark(名称)，记下距上一个标记的
+微秒数；同一阶段一帧内可标记多次，耗时累加。end() 把未标记的剩余时间
+计入 "other"，并写入各阶段的 log2 直方图（第 k 格为 [2^k, 2^(k+1)) us）。
+每 window 帧直方图计数减半，所以分位数反映的是最近几百帧。
+
+    prof = Profiler(("snapshot", "find_rects", "draw", "show", "gc"))
+    while True:
+        prof.start()
+        img = sensor.snapshot()
+        prof.mark("snapshot")
+        ...
+        prof.draw(img, 20, 200)      # 叠加显示上一帧为止的统计
+        Display.show_image(img)
+        prof.mark("show")
+        prof.end()
+    prof.dump()
+
+enabled=False 时所有方法立即返回。
+"""
+import time
+
+NBINS = 20      # 最后一格收纳 >= 2^19 us（约 0.5 s）
+
+
+def _bin(us):
+    b = 0
+    while us > 1 and b < NBINS - 1:
+        us >>= 1
+        b += 1
+    return b
+
+
+class Profiler:
+    def __init__(self, stages, enabled=True, window=128, alpha=0.1, dump_interval_ms=0):
+        self.stages = tuple(stages) + ("other", "frame")
+        self._index = {}
+        for i, name in enumerate(self.stages):
+            self._index[name] = i
+        n = len(self.stages)
+        self.enabled = enabled
+        self.window = window
+        self.alpha = alpha
+        self.dump_interval_ms = dump_interval_ms   # >0 时 end() 按间隔自动 dump
+        self.frames = 0
+        self.last = [0] * n       # 上一帧各阶段耗时 (us)
+        self.avg = [0.0] * n      # 指数平均 (us)
+        self.peak = [0] * n       # 窗口内最大值 (us)
+        self.hist = [[0] * NBINS for _ in range(n)]
+        self._cur = [-1] * n      # 本帧累计，-1 表示本帧未经过该阶段
+        self._t0 = 0
+        self._t = 0
+        self._last_dump = time.ticks_ms()
+
+    def start(self):
+        if not self.enabled:
+            return
+        cur = self._cur
+        for i in range(len(cur)):
+            cur[i] = -1
+        self._t0 = self._t = time.ticks_us()
+
+    def mark(self, name):
+        """把距上一个标记的时间记到 name 阶段"""
+        if not self.enabled:
+            return
+        now = time.ticks_us()
+        i = self._index[name]
+        dt = time.ticks_diff(now, self._t)
+        self._cur[i] = dt if self._cur[i] < 0 else self._cur[i] + dt
+        self._t = now
+
+    def end(self):
+        """结束本帧，返回整帧耗时 (us)"""
+        if not self.enabled:
+            return 0
+        now = time.ticks_us()
+        cur = self._cur
+        n = len(cur)
+        cur[n - 2] = time.ticks_diff(now, self._t)
+        cur[n - 1] = time.ticks_diff(now, self._t0)
+        a = self.alpha
+        for i in range(n):
+            us = cur[i]
+            if us < 0:
+                continue
+            self.last[i] = us
+            self.avg[i] += (us - self.avg[i]) * a
+            if us > self.peak[i]:
+                self.peak[i] = us
+            self.hist[i][_bin(us)] += 1
+        self.frames += 1
+        if self.frames % self.window == 0:
+            for i in range(n):
+                h = self.hist[i]
+                for b in range(NBINS):
+                    h[b] >>= 1
+                self.peak[i] = self.last[i]
+        if self.dump_interval_ms > 0 and time.ticks_diff(time.ticks_ms(), self._last_dump) >= self.dump_interval_ms:
+            self._last_dump = time.ticks_ms()
+            self.dump()
+        return cur[n - 1]
+
+    def percentile(self, name, p):
+        """name 阶段耗时的 p 分位数 (us)，取所在直方图格的上界（不超过窗口最大值）"""
+        i = self._index[name]
+        h = self.hist[i]
+        total = sum(h)
+        if total == 0:
+            return 0
+        need = total * p / 100
+        acc = 0
+        for b in range(NBINS):
+            acc += h[b]
+            if acc >= need:
+                break
+        return min(1 << (b + 1), self.peak[i]) if self.peak[i] else 1 << (b + 1)
+
+    def draw(self, img, x, y, scale=1.2, color=(255, 255, 0)):
+        """叠加显示各阶段平均/p90 耗时条形图和整帧耗时直方图"""
+        if not self.enabled or self.frames == 0:
+            return
+        line_h = int(20 * scale)
+        n = len(self.stages)
+        frame_avg = self.avg[n - 1] or 1
+        img.draw_string(x, y, f"stage   avg  p90 ms  n={self.frames}", color=color, scale=scale)
+        y += line_h
+        for i in range(n - 1):
+            if self.avg[i] == 0:      # 从未经过的阶段
+                continue
+            name = self.stages[i]
+            img.draw_string(x, y, f"{name[:7]:<7}{self.avg[i] / 1000:5.1f}{self.percentile(name, 90) / 1000:5.0f}",
+                            color=color, scale=scale)
+            img.draw_rectangle(x + int(190 * scale), y + 2, max(1, int(self.avg[i] / frame_avg * 60)),
+                               line_h - 6, color=(0, 200, 255), fill=True)
+            y += line_h
+        img.draw_string(x, y, f"frame  {frame_avg / 1000:5.1f}{self.percentile('frame', 90) / 1000:5.0f}",
+                        color=color, scale=scale)
+        y += line_h
+        # 整帧耗时直方图，每格宽 8 像素，从 1ms 格 (2^10 us) 起
+        h = self.hist[n - 1]
+        top = max(h) or 1
+        for b in range(10, NBINS):
+            bar = h[b] * 30 // top
+            if bar:
+                img.draw_rectangle(x + (b - 10) * 8, y + 30 - bar, 6, bar, color=(0, 255, 0), fill=True)
+        img.draw_line(x, y + 31, x + (NBINS - 10) * 8, y + 31, color=color)
+
+    def dump(self):
+        """打印各阶段统计表"""
+        n = len(self.stages)
+        frame_avg = self.avg[n - 1] or 1
+        print(f"[prof] {self.frames} frames, {1e6 / frame_avg:.1f} fps avg")
+        print("stage          last     avg     p50     p90     p99     max   share  (ms)")
+        for i, name in enumerate(self.stages):
+            if sum(self.hist[i]) == 0:
+                continue
+            print(f"{name:<12}{self.last[i] / 1000:>7.2f}{self.avg[i] / 1000:>8.2f}"
+                  f"{self.percentile(name, 50) / 1000:>8.1f}{self.percentile(name, 90) / 1000:>8.1f}"
+                  f"{self.percentile(name, 99) / 1000:>8.1f}{self.peak[i] / 1000:>8.2f}"
+                  f"{self.avg[i] * 100 / frame_avg:>7.1f}%")
@@ -0,0 +1,273 @@
+"""
+阈值方案存储
+
+调好的阈值按名称保存为方案，全部写在 SD 卡上的一个几百字节的二进制文件里。
+开机读一次、只解析一遍，毫秒级；运行中可以切换方案，或在文件被改写后
+重新加载，检测参数直接写回脚本里的字典，不需要重启摄像头。
+
+    store = ProfileStore("/sdcard/thresholds.prf")
+    store.load()                        # 文件不存在时返回 False，保持脚本里的缺省值
+    store.apply(current_values)         # 只覆盖两边都有的键
+    store.put("场地", current_values)    # 合并进方案（方案里其他键保留）并设为当前方案
+    store.save()
+    ...
+    if store.poll():                    # 每 poll_ms stat 一次，文件变了才读取、解析
+        store.apply(current_values)
+
+主机上查看/编辑方案文件（写入调参界面没有的参数，如长宽比、激光 LAB 阈值）:
+    python profiles.py show thresholds.prf
+    python profiles.py set thresholds.prf 场地 ASPECT_RATIO=1.1,1.8 LASER_THRESHOLDS=27,100,39,127,-51,127
+    python profiles.py use thresholds.prf 场地
+
+值可以是整数、浮点数或它们的元组（元组里可以混用），例如
+    {"BLACK_GRAY_THRESHOLD": 100, "ASPECT_RATIO": (1.1, 1.8), "ROI": (10, 0.5)}
+
+文件格式（小端）:
+    头部 8 字节 '<4sBBH'
+        magic    b'TPRF'
+        version  2
+        active   当前方案序号
+        count    方案个数
+    每个方案: name_len(B) entry_count(B) name(utf-8)
+        每项: key_len(B) kind(B) n(B) key(utf-8) 类型 n 字节 数据 n 个 int32/float64
+            kind 'v' 为单个值，'t' 为元组；每个元素各有一个类型字节 'i'/'d'，
+            整数和浮点混合的元组读回来各元素类型不变
+写入时先写临时文件再改名，掉电时至少保留一份完整文件。
+"""
+import os
+import struct
+import time
+
+MAGIC = b'TPRF'
+VERSION = 2
+HEADER = '<4sBBH'
+HEADER_SIZE = 8
+MTIME_RES_MS = 2000     # FAT 修改时间的精度
+_ITEM_SIZE = {'i': 4, 'd': 8}
+
+
+def _encode(key, value):
+    if isinstance(value, (tuple, list)):
+        items = tuple(value)
+        kind = 't'
+    else:
+        items = (value,)
+        kind = 'v'
+    types = ''.join('d' if isinstance(v, float) else 'i' for v in items)
+    k = key.encode()
+    return (struct.pack('<BBB', len(k), ord(kind), len(items)) + k + types.encode() +
+            struct.pack('<' + types, *items))
+
+
+def encode(profiles, names, active):
+    """方案字典编码为文件内容"""
+    out = [struct.pack(HEADER, MAGIC, VERSION, names.index(active) if active in names else 0, len(names))]
+    for name in names:
+        values = profiles[name]
+        n = name.encode()
+        out.append(struct.pack('<BB', len(n), len(values)) + n)
+        for key in values:
+            out.append(_encode(key, values[key]))
+    return b''.join(out)
+
+
+def decode(raw):
+    """解析文件内容，返回 (方案字典, 名称列表, 当前方案名)；格式不对时抛出 ValueError"""
+    if len(raw) < HEADER_SIZE:
+        raise ValueError("profile file too short")
+    magic, version, active, count = struct.unpack_from(HEADER, raw, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a profile file")
+    profiles = {}
+    names = []
+    pos = HEADER_SIZE
+    try:
+        for _ in range(count):
+            name_len, entries = struct.unpack_from('<BB', raw, pos)
+            pos += 2
+            name = str(raw[pos:pos + name_len], 'utf-8')
+            pos += name_len
+            values = {}
+            for _ in range(entries):
+                key_len, kind, n = struct.unpack_from('<BBB', raw, pos)
+                pos += 3
+                key = str(raw[pos:pos + key_len], 'utf-8')
+                pos += key_len
+                types = str(raw[pos:pos + n], 'ascii')
+                pos += n
+                items = struct.unpack_from('<' + types, raw, pos)
+                for t in types:
+                    pos += _ITEM_SIZE[t]
+                if kind == ord('t'):
+                    values[key] = items
+                elif kind == ord('v') and n == 1:
+                    values[key] = items[0]
+                else:
+                    raise ValueError
+            profiles[name] = values
+            names.append(name)
+    except Exception:        # 越界/坏编码：CPython 是 struct.error，MicroPython 是 ValueError
+        raise ValueError("profile file corrupt")
+    if pos != len(raw):
+        raise ValueError("profile file truncated")
+    return profiles, names, names[active] if active < len(names) else None
+
+
+class ProfileStore:
+    def __init__(self, path, poll_ms=1000):
+        self.path = path
+        self.poll_ms = poll_ms
+        self.profiles = {}
+        self.names = []           # 按创建顺序，文件里按此顺序存放
+        self.active = None
+        self._raw = None          # 上次读到或写入的文件内容，poll() 用来比较
+        self._stat = None         # 上次看到的 (大小, 修改时间)
+        self._since = None        # 看到 _stat 变化的时刻，None 为 load/save 之后还没 poll 过
+        self._last_poll = None
+
+    def _read(self, path):
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _stat_file(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st[6], st[8]
+
+    def load(self):
+        """读取方案文件，返回是否读到；格式不对时抛出 ValueError，已有方案不变"""
+        raw = self._read(self.path)
+        if raw is None:
+            raw = self._read(self.path + ".tmp")   # 改名前掉电时只剩临时文件
+        if raw is None:
+            return False
+        self.profiles, self.names, self.active = decode(raw)
+        self._raw = raw
+        self._stat = self._stat_file()
+        self._since = None
+        return True
+
+    def poll(self, now=None):
+        """每 poll_ms stat 一次文件，被改写时重新加载并返回 True"""
+        now = time.ticks_ms() if now is None else now
+        if self._last_poll is not None and time.ticks_diff(now, self._last_poll) < self.poll_ms:
+            return False
+        self._last_poll = now
+        st = self._stat_file()
+        if st != self._stat:
+            self._stat = st
+            self._since = now
+        elif self._since is None:
+            self._since = now
+        elif time.ticks_diff(now, self._since) > MTIME_RES_MS + self.poll_ms:
+            return False
+        # FAT 的修改时间只精确到 2 秒，同一时间窗内大小不变的改写从 stat 看不出来：
+        # stat 变化后的这段时间里每次 poll 仍读出内容和上次比较，之后只看 stat
+        raw = self._read(self.path)
+        if raw is None or raw == self._raw:
+            return False
+        self._raw = raw
+        try:
+            self.profiles, self.names, self.active = decode(raw)
+        except ValueError:
+            return False           # 写了一半的文件，等下次修改
+        return True
+
+    def get(self, name=None):
+        """方案的值字典，name 为 None 时取当前方案；不存在返回 None"""
+        return self.profiles.get(self.active if name is None else name)
+
+    def apply(self, target, name=None):
+        """把方案中 target 也有的键写入 target，返回方案名；没有方案时返回 None"""
+        values = self.get(name)
+        if values is None:
+            return None
+        for key in values:
+            if key in target:
+                target[key] = values[key]
+        return self.active if name is None else name
+
+    def switch(self, name):
+        """切换当前方案，方案不存在时返回 False（当前方案名仍会切换，保存时新建）"""
+        self.active = name
+        return name in self.profiles
+
+    def put(self, name, values, activate=True):
+        """把 values 合并进方案（不存在则新建），方案里其他键保留"""
+        if name not in self.profiles:
+            self.profiles[name] = {}
+            self.names.append(name)
+        profile = self.profiles[name]
+        for key in values:
+            profile[key] = values[key]
+        if activate:
+            self.active = name
+
+    def save(self):
+        """写入文件：先写临时文件再替换，返回写入字节数"""
+        raw = encode(self.profiles, self.names, self.active)
+        tmp = self.path + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(raw)
+        try:
+            os.remove(self.path)    # FAT 上 rename 不能覆盖已有文件
+        except OSError:
+            pass
+        os.rename(tmp, self.path)
+        self._raw = raw
+        self._stat = self._stat_file()
+        self._since = None
+        return len(raw)
+
+
+def _parse_value(text):
+    items = tuple(float(v) if '.' in v else int(v) for v in text.split(',') if v)
+    return items if len(items) > 1 or text.endswith(',') else items[0]
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="查看/编辑阈值方案文件")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_show = sub.add_parser("show", help="列出全部方案")
+    p_set = sub.add_parser("set", help="写入方案中的参数，方案不存在时新建")
+    p_use = sub.add_parser("use", help="设为当前方案")
+    for p in (p_show, p_set, p_use):
+        p.add_argument("path")
+    p_set.add_argument("name")
+    p_set.add_argument("values", nargs="+", help="KEY=值，元组用逗号分隔，如 ASPECT_RATIO=1.1,1.8")
+    p_set.add_argument("--activate", action="store_true", help="同时设为当前方案")
+    p_use.add_argument("name")
+    args = parser.parse_args(argv)
+
+    store = ProfileStore(args.path)
+    store.load()
+    if args.cmd == "set":
+        values = {}
+        for item in args.values:
+            key, _, text = item.partition("=")
+            values[key] = _parse_value(text)
+        store.put(args.name, values, activate=args.activate or store.active is None)
+        print(f"{args.path}: {store.save()} bytes")
+    elif args.cmd == "use":
+        if not store.switch(args.name):
+            raise SystemExit(f"no profile named {args.name}")
+        store.save()
+    for name in store.names:
+        mark = "*" if name == store.active else " "
+        print(f"{mark} {name}")
+        for key, value in store.profiles[name].items():
+            if isinstance(value, tuple):
+                value = ", ".join(f"{v:g}" if isinstance(v, float) else str(v) for v in value)
+            elif isinstance(value, float):
+                value = f"{value:g}"
+            print(f"    {key} = {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,15 @@ from media.sensor import *
 from media.display import *
 from media.media import *
 from machine import UART, FPIOA, TOUCH
+from frame_ctx import FrameContext
+from uart_proto import FrameEncoder
+from blackbox import Blackbox, INFO, DEBUG, EV_UART, EV_FRAME, EV_THRESH
+from profiler import Profiler
+from gcpolicy import GCPolicy
+import pyramid
+from pose import Camera, PoseSolver
+from profiles import ProfileStore
+from autothresh import AutoThreshold
 
 # ================ 系统配置 ================
 DISPLAY_WIDTH = 800
@@ -19,6 +28,10 @@ A4_HEIGHT_MM = 297
 FOCAL_LENGTH_PX = 500
 SENSOR_WIDTH_MM = 4.8
 SENSOR_HEIGHT_MM = 3.6
+PRINCIPAL_POINT = None   # 主点 (cx, cy)，None 为图像中心
+LENS_K1 = 0.0            # 径向畸变系数，标定后填写（使用去畸变表时保持 0）
+LENS_K2 = 0.0
+LENS_TABLE_PATH = f"/sdcard/lens_{DETECT_WIDTH}x{DETECT_HEIGHT}.udt"   # calib_lens.py 按检测分辨率生成
 
 # ================ 固定阈值配置 ================
 THRESHOLD_VALUES = {
@@ -27,18 +40,57 @@ THRESHOLD_VALUES = {
     "RECT_DETECT_THRESHOLD": 2500 # 矩形检测灵敏度
 }
 
+# 用通过检查的矩形 ROI 的直方图跟踪光照，把上面两个灰度阈值整体平移；
+# 偏移不超过 AUTO_THRESHOLD_WINDOW。方案里的 AUTO_THRESHOLD=1 可单独打开
+AUTO_THRESHOLD = False
+AUTO_THRESHOLD_WINDOW = 40
+auto_thresh = AutoThreshold(initial=(THRESHOLD_VALUES["BLACK_GRAY_THRESHOLD"] +
+                                     THRESHOLD_VALUES["CENTER_GRAY_THRESHOLD"]) // 2,
+                            window=AUTO_THRESHOLD_WINDOW)
+
+def gray_thresholds():
+    """(边框阈值, 中心阈值)，自动阈值开启时两者按学习到的偏移平移，间距不变"""
+    black, center = THRESHOLD_VALUES["BLACK_GRAY_THRESHOLD"], THRESHOLD_VALUES["CENTER_GRAY_THRESHOLD"]
+    if AUTO_THRESHOLD:
+        return auto_thresh.shifted(black, center)
+    return black, center
+
+PYRAMID_FACTOR = 2       # 先在 1/2 池化图上找候选再回原图细化，1 为整图搜索
+
+# 提示文字只在阈值变化（加载方案、自动阈值更新）时格式化，避免每帧分配字符串
+def format_threshold_labels():
+    black, center = gray_thresholds()
+    mark = " (自动)" if AUTO_THRESHOLD else ""
+    return (
+        (60, f"边框阈值: {black}{mark}"),
+        (100, f"中心阈值: {center}{mark}"),
+        (140, f"检测灵敏度: {THRESHOLD_VALUES['RECT_DETECT_THRESHOLD']}"),
+    )
+THRESHOLD_LABELS = format_threshold_labels()
+
 # ================ 矩形宽高比限制 ================
 MIN_ASPECT_RATIO = 1.1
 MAX_ASPECT_RATIO = 1.8
 
+# ================ 阈值方案 ================
+# get_rect.py / tuoji可调.py 的保存按钮写入此文件，开机加载后覆盖上面的固定值
+THRESHOLD_PROFILE_PATH = "/sdcard/thresholds.prf"
+THRESHOLD_PROFILE_NAME = None      # 使用的方案名，None 为文件中的当前方案
+THRESHOLD_PROFILE_POLL_MS = 1000   # 检查方案文件是否被改写的间隔，改写后不重启即生效
+
 # ================ 串口配置 ================
 UART_PORT = 2
 UART_BAUDRATE = 115200
 UART_TX_PIN = 11
 UART_RX_PIN = 12
-HEADER = 0x55
-CHECKSUM = 0x77
-FOOTER = 0x44
+# 帧格式（帧头0x55/帧尾0x44、序号、时间戳、CRC16）见 uart_proto.py
+
+# ================ 日志配置 ================
+LOG_LEVEL = INFO         # 低于此级别的记录不写入黑匣子，比赛时可改为 WARN
+PROFILE = True           # 逐阶段计时，比赛时可关闭
+PROFILE_OVERLAY = True   # 屏幕上叠加显示各阶段耗时
+PROFILE_DUMP_MS = 0      # >0 时按此间隔在控制台打印统计表
+FRAME_BUDGET_MS = 33     # 帧预算，垃圾回收尽量放在预算内的空闲时间
 
 # ================ 全局变量 ================
 sensor = None
@@ -47,6 +99,57 @@ tp = None
 running = True
 img_okcount = 0
 last_send_time = 0
+frame = FrameContext()   # 每帧的灰度图等中间结果
+encoder = FrameEncoder() # 复用同一个发送缓冲区
+
+# 镜头去畸变表，加载失败时只用 LENS_K1/K2 近似校正
+try:
+    import undistort
+    lens = undistort.load(LENS_TABLE_PATH, (DETECT_WIDTH, DETECT_HEIGHT))
+    print(f"去畸变表已加载: {lens.nx}x{lens.ny}")
+except (ImportError, OSError, ValueError) as e:
+    lens = None
+    print(f"去畸变表不可用: {e}")
+
+camera = Camera(DETECT_WIDTH, DETECT_HEIGHT, FOCAL_LENGTH_PX,
+                cx=PRINCIPAL_POINT[0] if PRINCIPAL_POINT else None,
+                cy=PRINCIPAL_POINT[1] if PRINCIPAL_POINT else None,
+                k1=0.0 if lens else LENS_K1, k2=0.0 if lens else LENS_K2)
+pose_solver = PoseSolver(camera, A4_HEIGHT_MM, A4_WIDTH_MM)
+bb = Blackbox(level=LOG_LEVEL)
+prof = Profiler(("snapshot", "gray", "find_rects", "filter", "stats", "draw", "uart", "show", "gc"),
+                enabled=PROFILE, dump_interval_ms=PROFILE_DUMP_MS)
+gcp = GCPolicy(frame_budget_ms=FRAME_BUDGET_MS)
+profile_store = ProfileStore(THRESHOLD_PROFILE_PATH, poll_ms=THRESHOLD_PROFILE_POLL_MS)
+
+def apply_profile():
+    """把方案写入检测参数，返回方案名；开机和方案文件被改写时调用"""
+    global MIN_ASPECT_RATIO, MAX_ASPECT_RATIO, THRESHOLD_LABELS, AUTO_THRESHOLD
+    if THRESHOLD_PROFILE_NAME is not None:
+        profile_store.switch(THRESHOLD_PROFILE_NAME)
+    name = profile_store.apply(THRESHOLD_VALUES)
+    if name is None:
+        return None
+    values = profile_store.get()
+    if "ASPECT_RATIO" in values:
+        MIN_ASPECT_RATIO, MAX_ASPECT_RATIO = values["ASPECT_RATIO"]
+    if "AUTO_THRESHOLD" in values:
+        AUTO_THRESHOLD = bool(values["AUTO_THRESHOLD"])
+    auto_thresh.reset((THRESHOLD_VALUES["BLACK_GRAY_THRESHOLD"] + THRESHOLD_VALUES["CENTER_GRAY_THRESHOLD"]) // 2)
+    THRESHOLD_LABELS = format_threshold_labels()
+    bb.log(INFO, EV_THRESH, THRESHOLD_VALUES["BLACK_GRAY_THRESHOLD"],
+           THRESHOLD_VALUES["CENTER_GRAY_THRESHOLD"], THRESHOLD_VALUES["RECT_DETECT_THRESHOLD"])
+    return name
+
+# 开机加载阈值方案，没有方案文件时使用固定阈值
+load_start = time.ticks_ms()
+try:
+    if profile_store.load() and apply_profile():
+        print(f"阈值方案 {profile_store.active} 已加载 ({time.ticks_diff(time.ticks_ms(), load_start)} ms)")
+    else:
+        print("阈值方案不可用，使用固定阈值")
+except ValueError as e:
+    print(f"阈值方案不可用，使用固定阈值: {e}")
 
 def camera_init():
     global sensor, uart, tp
@@ -91,36 +194,20 @@ def camera_deinit():
     except Exception as e:
         print(f"Camera deinit error: {e}")
 
-def calculate_physical_position(rect, img_width, img_height):
+def calculate_physical_position(corners):
     """
-    计算A4纸上的物理坐标(mm)
+    由矩形四个角点解算A4纸位姿（见 pose.py）
     参数:
-        rect: 检测到的矩形 (x,y,w,h)
-        img_width: 图像宽度(像素)
-        img_height: 图像高度(像素)
+        corners: find_rects 返回的四个角点
     返回:
-        (distance_mm, center_x_mm, center_y_mm, width_mm, height_mm)
+        (distance_mm, center_x_mm, center_y_mm, width_mm, height_mm)，角点退化时返回None
+        distance_mm 为相机到纸面中心的距离，center_x/y_mm 为纸面中心相对光轴落点的纸面坐标
     """
-    x, y, w, h = rect
-    pixel_width = w
-    pixel_height = h
-
-    # 计算实际距离
-    distance_mm_width = (A4_WIDTH_MM * FOCAL_LENGTH_PX) / pixel_width
-    distance_mm_height = (A4_HEIGHT_MM * FOCAL_LENGTH_PX) / pixel_height
-    distance_mm = (distance_mm_width + distance_mm_height) / 2
-    distance_mm = max(500, min(1600, distance_mm))
-
-    # 计算物理坐标
-    center_x_px = x + w/2 - img_width/2
-    center_y_px = y + h/2 - img_height/2
-    center_x_mm = (center_x_px * A4_WIDTH_MM) / pixel_width
-    center_y_mm = (center_y_px * A4_HEIGHT_MM) / pixel_height
-
-    # 计算实际尺寸
-    width_mm = (w * A4_WIDTH_MM) / pixel_width
-    height_mm = (h * A4_HEIGHT_MM) / pixel_height
-
+    pose = pose_solver.solve(corners)
+    if pose is None:
+        return None
+    distance_mm, center_x_mm, center_y_mm, _, _ = pose
+    width_mm, height_mm = pose_solver.size_mm
     return distance_mm, center_x_mm, center_y_mm, width_mm, height_mm
 
 def send_uart_data(center_x, center_y, delta_x, delta_y, physical_data):
@@ -128,7 +215,7 @@ def send_uart_data(center_x, center_y, delta_x, delta_y, physical_data):
     global uart, last_send_time
 
     current_time = time.ticks_ms()
-    if current_time - last_send_time < 20:
+    if time.ticks_diff(current_time, last_send_time) < 20:
         return False
 
     if not uart:
@@ -136,32 +223,22 @@ def send_uart_data(center_x, center_y, delta_x, delta_y, physical_data):
 
     distance_mm, center_x_mm, center_y_mm, _, _ = physical_data
 
-    data = bytearray([
-        HEADER,
-        (center_x >> 8) & 0xFF, center_x & 0xFF,
-        (center_y >> 8) & 0xFF, center_y & 0xFF,
-        (delta_x >> 8) & 0xFF, delta_x & 0xFF,
-        (delta_y >> 8) & 0xFF, delta_y & 0xFF,
-        int(distance_mm) >> 8 & 0xFF, int(distance_mm) & 0xFF,
-        int(center_x_mm * 10) >> 8 & 0xFF, int(center_x_mm * 10) & 0xFF,
-        int(center_y_mm * 10) >> 8 & 0xFF, int(center_y_mm * 10) & 0xFF,
-        CHECKSUM,
-        FOOTER
-    ])
+    data = encoder.encode(frame.t_ms, center_x, center_y, delta_x, delta_y,
+                          distance_mm, center_x_mm, center_y_mm)
 
     try:
         uart.write(data)
         last_send_time = current_time
-        print(f"[UART] 发送: {[hex(b) for b in data]}")
-        print(f"物理坐标: 距离={distance_mm:.1f}mm, X={center_x_mm:.1f}mm, Y={center_y_mm:.1f}mm")
+        bb.log(INFO, EV_UART, encoder.seq - 1, center_x, center_y, delta_x, delta_y,
+               distance_mm, center_x_mm * 10, center_y_mm * 10)
         return True
     except Exception as e:
         print(f"串口发送失败: {e}")
         return False
 
 def detect_outer_rectangle(img):
-    """使用固定阈值检测外接矩形"""
-    global img_okcount
+    """检测外接矩形，边框/中心阈值取自动阈值或固定值"""
+    global img_okcount, THRESHOLD_LABELS
 
     try:
         if img is None:
@@ -173,8 +250,11 @@ def detect_outer_rectangle(img):
         img_centerx = img_width // 2
         img_centery = img_height // 2
 
-        gray = img.to_grayscale()
-        counts = gray.find_rects(threshold=THRESHOLD_VALUES["RECT_DETECT_THRESHOLD"])
+        gray = frame.gray()
+        prof.mark("gray")
+        counts = pyramid.find_rects(gray, THRESHOLD_VALUES["RECT_DETECT_THRESHOLD"],
+                                    factor=PYRAMID_FACTOR, pool=frame.pooled)
+        prof.mark("find_rects")
 
         best_rect = None
         max_area = 0
@@ -186,6 +266,7 @@ def detect_outer_rectangle(img):
             if MIN_ASPECT_RATIO < aspect_ratio < MAX_ASPECT_RATIO and area > max_area:
                 max_area = area
                 best_rect = r
+        prof.mark("filter")
 
         if best_rect:
             x1, y1 = best_rect.rect()[0], best_rect.rect()[1]
@@ -196,11 +277,23 @@ def detect_outer_rectangle(img):
 
             border_gray = gray.get_statistics(roi=(x1, y1, best_rect.rect()[2], 5)).mean()
             center_gray = gray.get_statistics(roi=(center_x, center_y, 4, 4)).mean()
-
-            if (border_gray < THRESHOLD_VALUES["BLACK_GRAY_THRESHOLD"] and
-                center_gray > THRESHOLD_VALUES["CENTER_GRAY_THRESHOLD"]):
+            black_threshold, center_threshold = gray_thresholds()
+            prof.mark("stats")
+
+            physical_data = None
+            if border_gray < black_threshold and center_gray > center_threshold:
+                # 用更新前的阈值判断，只从通过判断的候选学习，新阈值下一帧生效
+                if AUTO_THRESHOLD and auto_thresh.update(gray, roi=best_rect.rect()):
+                    THRESHOLD_LABELS = format_threshold_labels()
+                    black, center = gray_thresholds()
+                    bb.log(INFO, EV_THRESH, black, center, THRESHOLD_VALUES["RECT_DETECT_THRESHOLD"])
+                corners = best_rect.corners()
+                if lens:
+                    corners = lens.points(corners)
+                physical_data = calculate_physical_position(corners)
+
+            if physical_data is not None:   # 角点退化时按未检测处理
                 img_okcount += 1
-                physical_data = calculate_physical_position(best_rect.rect(), img_width, img_height)
 
                 # 绘制检测结果
                 img.draw_rectangle(best_rect.rect(), color=(255, 0, 0), thickness=2)
@@ -215,8 +308,16 @@ def detect_outer_rectangle(img):
                 img.draw_string(10, 70, f"距离: {physical_data[0]:.1f}mm", color=(255,255,255), scale=1.5)
                 img.draw_string(10, 100, f"物理坐标: X={physical_data[1]:.1f}mm Y={physical_data[2]:.1f}mm",
                             color=(255,255,255), scale=1.2)
-
+                prof.mark("draw")
+
+                # 绘制和灰度统计用原始坐标，发送的中心和偏移用去畸变坐标
+                if lens:
+                    ux, uy = lens.point(center_x, center_y)
+                    center_x, center_y = int(ux + 0.5), int(uy + 0.5)
+                    delta_x = center_x - img_centerx
+                    delta_y = center_y - img_centery
                 send_uart_data(center_x, center_y, delta_x, delta_y, physical_data)
+                prof.mark("uart")
                 return True
 
         img.draw_string(10, 10, "未检测到目标", color=(255,0,0), scale=2)
@@ -226,34 +327,42 @@ def detect_outer_rectangle(img):
         return False
 
 def main_loop():
+    global running
     fps = time.clock()
     while running:
         try:
             fps.tick()
+            prof.start()
             os.exitpoint()
 
             img = sensor.snapshot()
+            frame.reset(img)
+            prof.mark("snapshot")
 
             if detect_outer_rectangle(img):
                 img.draw_string(20, 20, "检测成功!", color=(0, 255, 0), scale=3)
             else:
                 img.draw_string(20, 20, "未检测到目标", color=(255, 0, 0), scale=3)
 
-            # 显示固定阈值信息
-            img.draw_string(20, 60, f"边框阈值: {THRESHOLD_VALUES['BLACK_GRAY_THRESHOLD']}",
-                          color=(255, 255, 255), scale=2)
-            img.draw_string(20, 100, f"中心阈值: {THRESHOLD_VALUES['CENTER_GRAY_THRESHOLD']}",
-                          color=(255, 255, 255), scale=2)
-            img.draw_string(20, 140, f"检测灵敏度: {THRESHOLD_VALUES['RECT_DETECT_THRESHOLD']}",
-                          color=(255, 255, 255), scale=2)
+            # 显示当前阈值信息
+            for y, label in THRESHOLD_LABELS:
+                img.draw_string(20, y, label, color=(255, 255, 255), scale=2)
 
             img.draw_string(DISPLAY_WIDTH - 150, DISPLAY_HEIGHT - 40,
                           f"FPS: {fps.fps():.1f}", color=(255, 255, 255), scale=2)
+            if PROFILE_OVERLAY:
+                prof.draw(img, 20, 180)
+            prof.mark("draw")
             Display.show_image(img)
-            gc.collect()
+            prof.mark("show")
+            bb.stream()
+            if profile_store.poll() and apply_profile():
+                print(f"阈值方案已重新加载: {profile_store.active}")
+            gcp.poll()
+            prof.mark("gc")
+            bb.log(DEBUG, EV_FRAME, prof.end(), int(fps.fps() * 10), gcp.mem_free // 1024)
 
         except KeyboardInterrupt:
-            global running
             running = False
         except Exception as e:
             print(f"主循环错误: {e}")
@@ -268,6 +377,9 @@ def main():
         print(f"主程序错误: {e}")
     finally:
         camera_deinit()
+        bb.dump(20)
+        prof.dump()
+        gcp.dump()
         print("程序结束")
 
 if __name__ == "__main__":
@@ -0,0 +1,18 @@
+"""
+主机上测试设备端模块
+
+仓库根目录和 emu/（image、media 等仿真模块）加入 sys.path，
+并由 hostboard.install() 补上 MicroPython 的 time.ticks_ms / ticks_diff 等接口。
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "emu"))
+sys.path.insert(0, ROOT)
+
+import hostboard  # noqa: E402
+
+hostboard.install()
@@ -0,0 +1,80 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import image
+from autothresh import AutoThreshold
+
+
+def _target(dark, bright, size=64, border=12):
+    """暗边框、亮中心的灰度图"""
+    a = np.full((size, size), dark, np.uint8)
+    a[border:size - border, border:size - border] = bright
+    return image.Image.from_array(a)
+
+
+def test_measure_splits_between_dark_and_bright():
+    auto = AutoThreshold()
+    value = auto.measure(_target(40, 200))
+    assert 100 <= value <= 140
+
+
+def test_low_contrast_roi_is_held():
+    auto = AutoThreshold(initial=120)
+    assert not auto.update(_target(100, 110))
+    assert auto.value == 120 and auto.held == 1
+
+
+def test_roi_restricts_histogram():
+    auto = AutoThreshold()
+    img = _target(40, 200)
+    assert auto.measure(img, roi=(16, 16, 32, 32)) is None     # 只有亮中心
+
+
+def test_first_measurement_becomes_the_reference():
+    auto = AutoThreshold(initial=138, window=40)
+    img = _target(40, 200)
+    raw = auto.measure(img)
+    assert auto.update(img)
+    assert auto.ref == auto.value == raw
+    assert (auto.lo, auto.hi) == (raw - 40, raw + 40)
+    auto.reset(138)
+    assert auto.ref is None and auto.value == 138
+
+
+def test_hysteresis_and_snap():
+    auto = AutoThreshold(initial=120, alpha=0.3, hysteresis=3, snap=24)
+    auto.update(_target(30, 110))
+    ref = auto.value
+    # 与当前阈值相差不超过 hysteresis 时不更新
+    assert abs(auto.measure(_target(20, 120)) - ref) <= 3
+    assert not auto.update(_target(20, 120))
+    assert auto.value == ref
+    # 光照突变直接跳到测量值
+    img = _target(40, 200)
+    assert auto.update(img)
+    assert auto.value == auto.measure(img)
+
+
+def test_window_clamps_learned_value():
+    auto = AutoThreshold(initial=200, window=40)
+    assert auto.update(_target(20, 90))     # 参考电平约 55
+    ref = auto.ref
+    assert auto.update(_target(150, 250))   # 测量值约 200，超出参考电平 + window
+    assert auto.value == ref + 40
+    assert not auto.update(_target(150, 250))
+    auto.reset(100)
+    assert (auto.lo, auto.hi) == (60, 140)
+
+
+def test_shifted_follows_drift_from_the_reference():
+    auto = AutoThreshold(initial=(149 + 128) // 2, window=40)
+    assert auto.shifted(149, 128) == (149, 128)
+    # 参考电平（约 71）与滑块中点 138 相差很远，但光照没变时阈值不应平移
+    auto.update(_target(20, 120))
+    assert auto.shifted(149, 128) == (149, 128)
+    # 之后光照变暗，两个阈值按漂移一起下移，间距不变
+    auto.update(_target(10, 100))
+    black, center = auto.shifted(149, 128)
+    assert black - center == 21
+    assert black - 149 == auto.value - auto.ref < 0
@@ -0,0 +1,60 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import bench_rect
+import frames
+from image import Image
+
+
+def test_pooled_images_are_timed_under_their_own_stages():
+    clock = bench_rect.StageClock()
+    clock.reset()
+    timer = bench_rect.ImageTimer(clock).install()
+    try:
+        corpus, _ = frames.synthetic_corpus(1, 160, 120, seed=0, lightings=["normal"])
+        gray = Image.from_array(corpus[0]).to_grayscale()
+        small = gray.mean_pooled(2, 2)
+        small.find_rects(threshold=1000)       # 脚本里新建的图像上的调用也要计时
+        buf = Image(80, 60, gray.format())
+        buf.draw_image(gray, 0, 0, x_scale=0.5, y_scale=0.5)
+    finally:
+        timer.uninstall()
+    assert clock.frame["grayscale"] > 0
+    assert clock.frame["pool"] > 0
+    assert clock.frame["find_rects"] > 0
+    assert clock.frame["draw"] == 0 and clock.frame["select"] == 0
+    assert "call" not in Image.find_rects.__qualname__
+
+
+def test_probe_records_the_first_rect_drawn_on_the_frame():
+    clock = bench_rect.StageClock()
+    clock.reset()
+    timer = bench_rect.ImageTimer(clock).install()
+    try:
+        img = Image(64, 48)
+        timer.frame(img)
+        Image(64, 48).draw_rectangle(1, 1, 5, 5)        # 别的图像上画的不算
+        img.draw_rectangle((2, 3, 10, 12), color=(255, 0, 0))
+        img.draw_rectangle(0, 0, 4, 4)
+    finally:
+        timer.uninstall()
+    assert timer.probe["rect"] == (2, 3, 10, 12)
+    assert clock.frame["draw"] > 0
+
+
+def test_bench_variant_reports_stages_and_hits():
+    corpus, truths = frames.synthetic_corpus(6, 640, 480, seed=0, lightings=["normal"])
+    result = bench_rect.bench_variant("serial2", corpus, truths, warmup=1)
+    assert result["counts"]["frames"] == 5
+    assert len(result["total"]) == 5
+    report = bench_rect.summarize(result)
+    assert report["hit_rate"] is not None and report["hit_rate"] > 0.5
+    assert {"grayscale", "pool", "find_rects"} <= set(report["stages"])
+
+
+def test_compare_flags_slower_p50_and_lower_hit_rate():
+    base = {"serial2": {"total_p50": 10.0, "hit_rate": 0.8}}
+    assert bench_rect.compare({"serial2": {"total_p50": 12.0, "hit_rate": 0.8}}, base, 0.25) == []
+    problems = bench_rect.compare({"serial2": {"total_p50": 13.0, "hit_rate": 0.7}}, base, 0.25)
+    assert len(problems) == 2
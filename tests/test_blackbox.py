@@ -0,0 +1,32 @@
+import blackbox
+from blackbox import DEBUG, EV_DETECT, EV_THRESH, INFO, Blackbox
+
+
+def test_ring_keeps_latest_records_in_order():
+    bb = Blackbox(capacity=4, level=INFO)
+    for i in range(6):
+        bb.log(INFO, EV_DETECT, 1, i, 2 * i)
+    recs = bb.records()
+    assert [r[4][1] for r in recs] == [2, 3, 4, 5]
+    assert [r[1] for r in recs] == [2, 3, 4, 5]
+    assert bb.records(2)[-1][4][:3] == (1, 5, 10)
+
+
+def test_level_filter():
+    bb = Blackbox(capacity=4, level=INFO)
+    bb.log(DEBUG, EV_DETECT, 1)
+    assert bb.count == 0
+
+
+def test_save_and_load(tmp_path):
+    bb = Blackbox(capacity=3)
+    for i in range(5):
+        bb.log(INFO, EV_THRESH, 100 + i, 50, -7)
+    path = str(tmp_path / "bb.bin")
+    bb.save(path)
+    assert blackbox.load(path) == bb.records()
+
+
+def test_format_record_names_fields():
+    text = blackbox.format_record(5, 1, EV_THRESH, INFO, (149, 128, 2500, 0, 0, 0, 0, 0))
+    assert text == "[I 5 #1] thresh black=149 center=128 rect=2500"
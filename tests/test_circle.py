@@ -0,0 +1,63 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("matplotlib")
+
+from matplotlib.figure import Figure
+
+import circle
+
+
+def _attached(capacity, chunk):
+    trail = circle.TrailBuffer(capacity, chunk=chunk)
+    ax = Figure().add_subplot()
+    calls = []
+    for b, c in enumerate(trail.attach(ax)):
+        c.set_segments = lambda segs, b=b: calls.append((b, len(segs)))
+    return trail, calls
+
+
+def test_trail_updates_only_the_written_block():
+    trail, calls = _attached(40, 8)
+    trail.apply()
+    assert len(calls) == trail.blocks
+    for k in range(100):
+        trail.append(k, 0.0)
+        calls.clear()
+        trail.apply()
+        # 每帧只重设一块，段数不超过 chunk，与轨迹总长无关
+        assert len(calls) <= 1 and all(n <= 8 for _, n in calls)
+    assert trail.count == 40 and trail.total == 99
+
+
+def test_trail_overwrites_oldest_segment():
+    trail = circle.TrailBuffer(4, chunk=2)
+    for k in range(7):
+        trail.append(float(k), 0.0)
+    starts = sorted(trail.segments[:, 0, 0])
+    assert starts == [2.0, 3.0, 4.0, 5.0]
+
+
+def test_default_scan_reaches_full_dose():
+    result = circle.simulate()
+    assert result["coverage"] == 1.0
+    half = circle.simulate(intensity=circle.exposure_intensity / 2)
+    assert half["coverage"] < 0.5
+
+
+def test_circle_points_do_not_repeat_the_start():
+    pts = circle.get_circle_points(100, 0.5)
+    closed = np.vstack([pts, pts[:1]])
+    step = np.hypot(*np.diff(closed, axis=0).T)
+    # 首尾不重合，回到起点的一段与其他段等长
+    assert np.allclose(step, step[0])
+
+
+def test_headless_export(tmp_path):
+    result = circle.simulate(steps=60)
+    circle.export_results(result, out=str(tmp_path / "run.npz"), csv=str(tmp_path / "run.csv"))
+    data = np.load(tmp_path / "run.npz")
+    assert np.array_equal(data["points"], result["points"]) and float(data["steps"]) == 60
+    table = np.loadtxt(tmp_path / "run.csv", delimiter=",", skiprows=1)
+    assert table.shape == (60, 6)
+    assert np.allclose(table[:, 3], np.degrees(result["alpha"]), atol=1e-4)
@@ -0,0 +1,67 @@
+import importlib.util
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import hostboard
+from image import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def dianji():
+    """在仿真板上加载 dianji.py（不运行主循环）"""
+    hostboard.install()
+    hostboard.configure(max_frames=None)
+    spec = importlib.util.spec_from_file_location("dianji_under_test", os.path.join(ROOT, "dianji.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _scene(spots=(), noise=(), size=1):
+    """灰色背景上的红色光斑（半径 3，29 个像素）和 size x size 的红色噪点"""
+    a = np.full((480, 800, 3), 90, np.uint8)
+    yy, xx = np.mgrid[0:480, 0:800]
+    for x, y in spots:
+        a[(xx - x) ** 2 + (yy - y) ** 2 <= 9] = (255, 40, 40)
+    for x, y in noise:
+        a[y:y + size, x:x + size] = (255, 40, 40)
+    return Image.from_array(a)
+
+
+def test_single_pixel_noise_is_rejected(dianji):
+    rng = np.random.default_rng(0)
+    noise = [(int(x), int(y)) for x, y in zip(rng.integers(0, 800, 200), rng.integers(0, 480, 200))]
+    assert dianji.find_laser_blobs(_scene(noise=noise)) == []
+    blobs = dianji.find_laser_blobs(_scene(spots=[(400, 240)], noise=noise))
+    assert [(b.cx(), b.cy()) for b in blobs] == [(400, 240)]
+
+
+def test_small_specks_are_rejected(dianji):
+    # 3x3 的噪点（9 个像素）在固件缺省阈值下也不会生成blob
+    specks = [(100 + 40 * i, 100 + 20 * (i % 5)) for i in range(15)]
+    assert dianji.find_laser_blobs(_scene(noise=specks, size=3)) == []
+    roi = (80, 80, 200, 120)
+    assert dianji.find_laser_blobs(_scene(spots=[(150, 150)], noise=specks, size=3), roi)[0].cx() == 150
+
+
+def test_thresholds_are_not_below_firmware_defaults(dianji):
+    assert dianji.LASER_PIXELS_MIN >= 10 and dianji.LASER_AREA_MIN >= 10
+
+
+def test_laser_window_follows_the_tracker(dianji):
+    dianji.laser_tracker.reset()
+    assert dianji.laser_window(0) is None
+    for k in range(8):
+        dianji.get_red_blobs(_scene(spots=[(200 + 10 * k, 240)]), now=33 * k)
+    vx, vy = dianji.laser_tracker.velocity()
+    assert 250 < vx < 350 and abs(vy) < 30
+    # 下一帧窗口中心在跟踪器外推的位置，横向比纵向宽
+    x, y, w, h = dianji.laser_window(33 * 8)
+    cx, cy = dianji.laser_tracker.predict(33)
+    assert abs(x + w / 2 - cx) <= 1 and abs(y + h / 2 - cy) <= 1
+    assert abs(cx - 280) <= 3 and w > h
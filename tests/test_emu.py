@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import frames
+import image
+import machine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_ticks_wrap_like_micropython():
+    # ticks 在 30 位处回绕，ticks_diff 给出有符号差
+    a = 0x3FFFFFF0
+    b = time.ticks_add(a, 0x20)
+    assert b == 0x10
+    assert time.ticks_diff(b, a) == 0x20
+    assert time.ticks_diff(a, b) == -0x20
+
+
+def test_uart_is_a_loopback():
+    uart = machine.UART(machine.UART.UART2, baudrate=115200)
+    assert uart.read() is None
+    uart.write(b"ab\ncd")
+    assert uart.any() == 5
+    assert uart.readline() == b"ab\n"
+    assert uart.read() == b"cd"
+    assert uart.tx_log == [b"ab\ncd"]
+
+
+def test_synthetic_target_is_found_by_find_rects():
+    corpus, truths = frames.synthetic_corpus(6, 320, 240, seed=1, lightings=["normal"])
+    hits = 0
+    for frame, truth in zip(corpus, truths):
+        if truth["rect"] is None:
+            continue
+        gray = image.Image.from_array(frame).to_grayscale()
+        rects = [r.rect() for r in gray.find_rects(threshold=2500)]
+        hits += truth["rect"] in rects or any(
+            abs(x - truth["rect"][0]) <= 2 and abs(w - truth["rect"][2]) <= 4 for x, _, w, _ in rects)
+    assert hits >= 4
+
+
+def test_corpus_roundtrip_and_fit(tmp_path):
+    corpus, truths = frames.synthetic_corpus(3, 64, 48, seed=2)
+    path = str(tmp_path / "c.npz")
+    frames.save_corpus(path, corpus, truths)
+    loaded, loaded_truths = frames.load_corpus(path)
+    assert len(loaded) == 3 and np.array_equal(loaded[0], corpus[0])
+    assert [t["rect"] for t in loaded_truths] == [t["rect"] for t in truths]
+    assert frames.fit_frame(corpus[0], 32, 24).shape == (24, 32, 3)
+
+
+def test_run_stops_after_max_frames():
+    out = subprocess.run([sys.executable, os.path.join("emu", "run.py"), "--max-frames", "3", "serial2.py"],
+                         cwd=ROOT, capture_output=True, text=True, timeout=120)
+    assert out.returncode == 0, out.stderr
+    assert "[emu] 3 frames" in out.stderr
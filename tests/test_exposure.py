@@ -0,0 +1,40 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import exposure
+from exposure import DoseGrid, FULL_DOSE
+
+SPOT = 0.2
+SIGMA = SPOT / 4
+
+
+def _circle(radius=0.6, n=721):
+    theta = np.linspace(0, 2 * np.pi, n)
+    return radius * np.cos(theta), radius * np.sin(theta)
+
+
+def test_single_spot_peak_and_total_dose():
+    grid = DoseGrid(1.0, 1.0, cell=0.01)
+    grid.deposit(0.005, 0.005, 0.5, 2.0, SPOT)
+    assert abs(grid.dose.max() - 1.0) < 0.01
+    # 高斯光斑的总剂量 = 峰值 * 2 pi sigma^2
+    total = grid.dose.sum() * grid.cell ** 2
+    assert abs(total - 2 * np.pi * SIGMA ** 2) / total < 0.01
+
+
+def test_fastest_scan_matches_line_dose():
+    # 速度 v 扫过时线条中心剂量 = rate * sqrt(2 pi) sigma / v，线条区域边缘（距中心 sigma）再乘 e^-0.5
+    v0 = 0.2
+    rate = FULL_DOSE * v0 / (np.sqrt(2 * np.pi) * SIGMA * np.exp(-0.5))
+    xs, ys = _circle()
+    best, results = exposure.fastest_scan(xs, ys, [0.8 * v0, 0.95 * v0, 1.05 * v0, 1.25 * v0],
+                                          rate, SPOT, 4.0, 3.0)
+    assert best == pytest.approx(0.95 * v0)
+    covs = [cov for _, cov, _ in results]
+    assert covs[0] == covs[1] == 1.0 and covs[2] < 1.0 and covs[3] < covs[2]
+
+
+def test_coverage_of_an_empty_mask_is_zero():
+    grid = DoseGrid(1.0, 1.0)
+    assert grid.coverage(np.zeros(grid.dose.shape, bool)) == 0.0
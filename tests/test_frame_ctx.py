@@ -0,0 +1,68 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import image
+from frame_ctx import FrameContext
+
+
+def _frame():
+    a = np.zeros((60, 80, 3), np.uint8)
+    a[:, :40] = 200
+    a[:, 40:] = 20
+    return image.Image.from_array(a)
+
+
+def _mean(img):
+    return int(img.to_numpy_ref().mean())
+
+
+def test_results_are_memoized_per_frame():
+    f = FrameContext().reset(_frame())
+    assert f.gray() is f.gray()
+    assert f.binary([(100, 255)]) is f.binary([(100, 255)])
+
+
+def test_same_size_rois_do_not_alias():
+    f = FrameContext().reset(_frame())
+    left = f.gray((0, 0, 20, 20))
+    assert _mean(left) == 200
+    right = f.gray((50, 0, 20, 20))
+    assert _mean(right) == 20
+    # 两个 ROI 共用一块缓冲区，先算的那个从缓存中去掉，再取时重新计算
+    assert _mean(f.gray((0, 0, 20, 20))) == 200
+    assert _mean(f.equalized((0, 0, 20, 20))) == _mean(f.equalized((0, 0, 20, 20)))
+
+
+def test_full_frame_and_roi_results_do_not_alias():
+    f = FrameContext().reset(_frame())
+    full = f.gray()
+    roi = f.gray((50, 0, 20, 20))
+    assert f.gray() is full and _mean(full) == 110 and _mean(roi) == 20
+
+
+def test_drifting_roi_reuses_one_block_per_kind():
+    f = FrameContext()
+    f.reset(_frame())
+    f.binary([(100, 255)], erode=1, roi=(0, 0, 30, 20))
+    kinds = f.allocs
+    for i in range(100):
+        f.reset(_frame())
+        roi = (i % 7, i % 5, 20 + (i * 7) % 50, 12 + (i * 3) % 40)
+        out = f.binary([(100, 255)], erode=1, roi=roi)
+        assert (out.width(), out.height()) == roi[2:]
+        f.pooled(out, 2, 2)
+    # 每种结果（src/gray/eq/bin，以及池化图）只分配过一次
+    assert f.allocs == kinds + 1
+
+
+def test_pooled_matches_mean_pooled_and_follows_its_source():
+    f = FrameContext().reset(_frame())
+    a = f.gray((0, 0, 40, 20))
+    p = f.pooled(a, 4, 4)
+    assert f.pooled(a, 4, 4) is p
+    assert np.array_equal(p.to_numpy_ref(), a.mean_pooled(4, 4).to_numpy_ref())
+    # 源缓冲区被另一个 ROI 覆盖后，池化结果按新的内容重新计算
+    b = f.gray((40, 0, 40, 20))
+    assert _mean(f.pooled(b, 4, 4)) == 20
+    assert _mean(f.pooled(f.img, 4, 4)) == 110
@@ -0,0 +1,82 @@
+import gcpolicy
+from gcpolicy import FORCED, IDLE, LOW, GCPolicy
+
+
+class FakeHeap:
+    """替换 gcpolicy 模块里的 gc 和 time：分配量和时钟都由测试推进"""
+    def __init__(self, size=1024 * 1024, live=100 * 1024, pause_us=2000):
+        self.size = size
+        self.live = live          # 回收后仍存活的量
+        self.alloc = live
+        self.pause_us = pause_us
+        self.us = 0
+        self.collections = 0
+
+    def mem_alloc(self):
+        return self.alloc
+
+    def mem_free(self):
+        return self.size - self.alloc
+
+    def collect(self):
+        self.collections += 1
+        self.us += self.pause_us
+        self.alloc = self.live
+
+    def ticks_us(self):
+        return self.us
+
+    def ticks_diff(self, a, b):
+        return a - b
+
+
+def _policy(monkeypatch, heap, **kwargs):
+    monkeypatch.setattr(gcpolicy, "gc", heap)
+    monkeypatch.setattr(gcpolicy, "time", heap)
+    return GCPolicy(**kwargs)
+
+
+def _frame(heap, gcp, alloc, busy_us):
+    heap.alloc += alloc
+    heap.us += busy_us
+    return gcp.poll()
+
+
+def test_idle_step_triggers_only_within_budget(monkeypatch):
+    heap = FakeHeap()
+    gcp = _policy(monkeypatch, heap, min_free=0, idle_step=32 * 1024, max_step=256 * 1024,
+                  frame_budget_ms=33)
+    assert _frame(heap, gcp, 16 * 1024, 10000) == -1        # 未到 idle_step
+    assert _frame(heap, gcp, 16 * 1024, 10000) == IDLE      # 累计 32KB，且有空闲时间
+    assert heap.collections == 1
+    # 帧已接近预算，回收会拖慢帧率：跳过
+    assert _frame(heap, gcp, 40 * 1024, 32000) == -1
+    assert heap.collections == 1
+
+
+def test_max_step_forces_collection(monkeypatch):
+    heap = FakeHeap()
+    gcp = _policy(monkeypatch, heap, min_free=0, idle_step=32 * 1024, max_step=256 * 1024,
+                  frame_budget_ms=33)
+    reasons = [_frame(heap, gcp, 100 * 1024, 40000) for _ in range(3)]
+    assert reasons == [-1, -1, FORCED]
+    assert gcp.counts[FORCED] == 1 and heap.alloc == heap.live
+
+
+def test_low_memory_collects_first(monkeypatch):
+    heap = FakeHeap(size=256 * 1024)
+    gcp = _policy(monkeypatch, heap, min_free=128 * 1024, idle_step=1 << 30, max_step=1 << 30)
+    assert _frame(heap, gcp, 8 * 1024, 1000) == -1
+    assert _frame(heap, gcp, 40 * 1024, 1000) == LOW
+    assert gcp.mem_free == heap.size - heap.live
+
+
+def test_automatic_collection_resets_the_baseline(monkeypatch):
+    heap = FakeHeap()
+    gcp = _policy(monkeypatch, heap, min_free=0, idle_step=32 * 1024, max_step=256 * 1024)
+    heap.alloc += 200 * 1024
+    heap.alloc = heap.live - 4 * 1024     # 期间系统自己回收过
+    assert gcp.poll() == -1
+    # 基线跟着回落，之后按新的基线累计
+    assert _frame(heap, gcp, 31 * 1024, 1000) == -1
+    assert _frame(heap, gcp, 2 * 1024, 1000) == IDLE
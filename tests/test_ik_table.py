@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import ik_table
+import iklut
+
+
+@pytest.fixture(scope="module")
+def table_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("ik") / "ik_image.ikl")
+    iklut.build_image(800, 480, 80.0, 10.0, margin=160).save(path)
+    return path
+
+
+def test_load_roundtrip(table_path):
+    t = ik_table.load(table_path)
+    assert t.kind == ik_table.KIND_IMAGE
+    assert t.angles(400, 240) == (0.0, 0.0)
+
+
+def test_matches_host_lookup_on_fractional_inputs(table_path):
+    t = ik_table.load(table_path)
+    host = iklut.load(table_path)
+    rng = random.Random(0)
+    for _ in range(500):
+        x = rng.uniform(-200.0, 1000.0)
+        y = rng.uniform(-200.0, 700.0)
+        yaw, pitch = host.lookup(np.array(x), np.array(y))
+        assert t.lookup(x, y) == (int(yaw), int(pitch))
+
+
+def test_fractional_input_is_not_truncated(table_path):
+    t = ik_table.load(table_path)
+    # 原来 int(x) 截断: 400.9 与 400 相同，399.9 却跳到 399，形成单侧死区
+    assert t.angles(400.5, 240)[0] > t.angles(400, 240)[0]
+    assert t.angles(399.5, 240)[0] == -t.angles(400.5, 240)[0]
+    lo, mid, hi = t.angles(401, 260)[0], t.angles(401.5, 260)[0], t.angles(402, 260)[0]
+    assert lo < mid < hi
+
+
+def _integer_lookup(t, x, y):
+    """改用定点插值之前的整数版本，整数输入的结果应与之逐位相同"""
+    shift, cell = t.shift, 1 << t.shift
+    fx = min(max(x - t.x0, 0), ((t.nx - 1) << shift) - 1)
+    fy = min(max(y - t.y0, 0), ((t.ny - 1) << shift) - 1)
+    u, v = fx & (cell - 1), fy & (cell - 1)
+    i = ((fy >> shift) * t.nx + (fx >> shift)) << 1
+    j = i + (t.nx << 1)
+    d = t.data
+    half = 1 << (2 * shift - 1)
+    out = []
+    for k in (0, 1):
+        acc = ((d[i + k] * (cell - u) + d[i + 2 + k] * u) * (cell - v) +
+               (d[j + k] * (cell - u) + d[j + 2 + k] * u) * v)
+        out.append((acc + half) >> (2 * shift))
+    return tuple(out)
+
+
+def test_integer_input_unchanged_by_fixed_point(table_path):
+    t = ik_table.load(table_path)
+    rng = random.Random(1)
+    # 网格范围内（超出时两者钳位的位置差不到 1/16 单位）
+    x1 = t.x0 + ((t.nx - 1) << t.shift) - 1
+    y1 = t.y0 + ((t.ny - 1) << t.shift) - 1
+    points = [(t.x0, t.y0), (400, 240), (x1, y1)]
+    points += [(rng.randint(t.x0, x1), rng.randint(t.y0, y1)) for _ in range(300)]
+    for x, y in points:
+        assert t.lookup(x, y) == _integer_lookup(t, x, y)
+
+
+def test_image_table_records_its_resolution(table_path, tmp_path):
+    assert ik_table.load(table_path, (800, 480)).size == (800, 480)
+    assert iklut.load(table_path).size == (800, 480)
+    with pytest.raises(ValueError):
+        ik_table.load(table_path, (640, 480))
+    # 平面表与图像尺寸无关
+    plane = str(tmp_path / "ik_plane.ikl")
+    iklut.build_plane(4.0, 3.0, 10.0).save(plane)
+    assert ik_table.load(plane).size == (0, 0)
+
+
+def test_rejects_other_table(tmp_path):
+    path = tmp_path / "bad.ikl"
+    path.write_bytes(b"UDST" + bytes(ik_table.HEADER_SIZE - 4))
+    with pytest.raises(ValueError):
+        ik_table.load(str(path))
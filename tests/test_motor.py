@@ -0,0 +1,52 @@
+import struct
+
+from motor import FRAME_SIZE, MotorWriter
+
+
+class FakeUart:
+    def __init__(self):
+        self.frames = []
+
+    def write(self, buf):
+        self.frames.append(bytes(buf))
+
+
+def _pulses(frame):
+    return struct.unpack('>ii', frame[3:11])
+
+
+def test_coalescing_drops_superseded_writes():
+    uart = FakeUart()
+    motor = MotorWriter(uart, motor_id=0x01, steps_per_degree=100, min_gap_ms=5)
+    motor.set(1.0, 2.0)
+    assert motor.poll(0)
+    # 间隔未到时连续提交三次，只有最后一次会写出
+    motor.set(3.0, 4.0)
+    motor.set(5.0, 6.0)
+    motor.set(7.0, -8.0)
+    assert not motor.poll(3)
+    assert motor.poll(5)
+    assert [_pulses(f) for f in uart.frames] == [(100, 200), (700, -800)]
+    assert motor.sent == 2 and motor.coalesced == 2
+
+
+def test_unchanged_target_is_not_resent():
+    uart = FakeUart()
+    motor = MotorWriter(uart, min_gap_ms=5)
+    motor.set(1.0, 1.0)
+    motor.poll(0)
+    motor.set(1.0, 1.0)
+    assert not motor.poll(10)
+    assert len(uart.frames) == 1 and motor.unchanged == 1
+
+
+def test_frame_layout_and_checksum():
+    uart = FakeUart()
+    motor = MotorWriter(uart, motor_id=0x02, steps_per_degree=10)
+    motor.set(-1.5, 25.0)
+    motor.poll(0)
+    frame = uart.frames[0]
+    assert len(frame) == FRAME_SIZE
+    assert frame[:3] == b'\xaa\x55\x02'
+    assert _pulses(frame) == (-15, 250)
+    assert frame[-1] == sum(frame[2:-1]) & 0xFF
@@ -0,0 +1,61 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from osd_layer import OSDLayer
+
+
+def _layer():
+    layer = OSDLayer(200, 100)
+    calls = []
+
+    def part(name, color, rect, mode="a", alpha=None):
+        def draw(img):
+            calls.append(name)
+            img.draw_rectangle(*rect, color=color, fill=True, alpha=alpha)
+        layer.add(name, draw, mode, rect)
+
+    part("bg", (30, 30, 30), (0, 0, 100, 100), alpha=150)
+    part("slider", (255, 0, 0), (10, 10, 20, 20))
+    part("button", (0, 255, 0), (150, 10, 20, 20))
+    part("back", (0, 0, 255), (150, 60, 20, 20), mode="b")
+    layer.set_mode("a")
+    layer.render()
+    calls.clear()
+    return layer, calls
+
+
+def test_clean_layer_is_not_redrawn():
+    layer, calls = _layer()
+    assert not layer.render()
+    assert calls == []
+
+
+def test_only_dirty_and_overlapping_parts_are_redrawn():
+    layer, calls = _layer()
+    before = layer.img.to_numpy_ref().copy()
+    layer.invalidate("slider")
+    assert layer.render()
+    # 滑块下面的半透明背景一起重画，按钮不动
+    assert calls == ["bg", "slider"]
+    assert (layer.img.to_numpy_ref() == before).all()
+
+    calls.clear()
+    layer.invalidate("button")
+    layer.render()
+    assert calls == ["button"]
+
+
+def test_hidden_part_keeps_dirty_flag_until_shown():
+    layer, calls = _layer()
+    layer.invalidate("back")
+    assert not layer.render()
+    assert layer._dirty["back"]
+    layer.set_mode("b")
+    layer.render()
+    assert calls == ["back"]
+    assert not layer._dirty["back"]
+    # 切回后 "a" 的部件整层重画，"back" 的区域已被清空
+    layer.set_mode("a")
+    layer.render()
+    assert layer.img.to_numpy_ref()[70, 160, 3] == 0
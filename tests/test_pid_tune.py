@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import gimbal_sim
+import pid
+import pid_tune
+
+
+def test_encode_decode_roundtrip():
+    gains = gimbal_sim.default_gains(1)
+    back = pid_tune.decode(pid_tune.encode(gains))
+    for k in gains:
+        assert np.allclose(back[k], gains[k])
+
+
+def test_pareto_front_keeps_only_non_dominated():
+    metrics = np.array([
+        [1.0, 5.0, 1.0, 0.0],
+        [2.0, 1.0, 1.0, 0.0],
+        [2.0, 5.0, 1.0, 0.0],      # 被第 0 组支配
+        [np.inf, 0.0, 0.0, 0.0],   # 未稳定，不参与
+        [0.5, 9.0, 3.0, 0.0],
+    ])
+    assert pid_tune.pareto_front(metrics).tolist() == [4, 0, 1]
+
+
+def test_search_does_not_lose_the_default(tmp_path):
+    sim_kwargs = dict(duration=1.0, seed=0)
+    vecs, metrics = pid_tune.search(random_n=16, generations=2, population=16, workers=1,
+                                    sim_kwargs=sim_kwargs, log=lambda *a: None)
+    assert len(vecs) == len(metrics) == 1 + 16 + 2 * 16
+    s = pid_tune.score(metrics, 1.0)
+    # 第 0 组是 pid.py 的缺省增益，选出的一组不会比它差
+    assert s.min() <= s[0]
+    # 选出的增益表能被 pid.load_gains 读回并构造 PID
+    best = vecs[int(np.argmin(s))]
+    path = tmp_path / "gains.json"
+    path.write_text(json.dumps(pid_tune.gain_table(best)))
+    kwargs = pid.load_gains(str(path))
+    assert kwargs == gimbal_sim.to_schedule(pid_tune.decode(best), 0)
+    pid.PID(**kwargs)
@@ -0,0 +1,56 @@
+import math
+import random
+
+import pytest
+
+from pose import Camera, PoseSolver, order_corners, square_to_quad
+
+
+def _corners(cam, w, h, t, yaw_deg=0.0):
+    """靶面 (宽 w, 高 h, mm) 绕 y 轴转 yaw_deg 后中心放在 t，投影成像素角点"""
+    c, s = math.cos(math.radians(yaw_deg)), math.sin(math.radians(yaw_deg))
+    out = []
+    for X, Y in ((-w / 2, -h / 2), (w / 2, -h / 2), (w / 2, h / 2), (-w / 2, h / 2)):
+        out.append(cam.project(t[0] + c * X, t[1] + Y, t[2] - s * X))
+    return out
+
+
+def test_order_corners():
+    pts = [(10, 90), (90, 90), (10, 10), (90, 10)]
+    random.Random(0).shuffle(pts)
+    assert order_corners(pts) == [(10, 10), (90, 10), (90, 90), (10, 90)]
+
+
+def test_square_to_quad_maps_unit_corners():
+    quad = [(3.0, 4.0), (10.0, 5.0), (12.0, 11.0), (2.0, 9.0)]
+    a, b, c, d, e, f, g, h, i = square_to_quad(quad)
+    for (u, v), (x, y) in zip(((0, 0), (1, 0), (1, 1), (0, 1)), quad):
+        w = g * u + h * v + i
+        assert (a * u + b * v + c) / w == pytest.approx(x)
+        assert (d * u + e * v + f) / w == pytest.approx(y)
+
+
+def test_frontal_target_position():
+    cam = Camera(480, 320, focal_px=500)
+    solver = PoseSolver(cam, 297, 210)
+    distance, x_mm, y_mm, depth, tilt = solver.solve(_corners(cam, 297, 210, (50.0, -30.0, 1000.0)))
+    assert distance == pytest.approx(math.sqrt(50 ** 2 + 30 ** 2 + 1000 ** 2), rel=1e-6)
+    assert (x_mm, y_mm) == (pytest.approx(50.0), pytest.approx(-30.0))
+    assert depth == pytest.approx(1000.0)
+    assert tilt == pytest.approx(0.0, abs=1e-3)
+
+
+def test_tilted_and_rotated_target():
+    cam = Camera(480, 320, focal_px=500)
+    solver = PoseSolver(cam, 297, 210)
+    # 竖放的靶面：宽高对调后按另一种朝向解出
+    pose = solver.solve(_corners(cam, 210, 297, (0.0, 20.0, 800.0), yaw_deg=25.0))
+    _, _, _, depth, tilt = pose
+    assert solver.size_mm == (210, 297)
+    assert depth == pytest.approx(800.0, rel=1e-6)
+    assert tilt == pytest.approx(25.0, abs=1e-3)
+
+
+def test_degenerate_corners():
+    cam = Camera(480, 320, focal_px=500)
+    assert PoseSolver(cam, 297, 210).solve([(10, 10)] * 4) is None
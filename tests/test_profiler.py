@@ -0,0 +1,89 @@
+import profiler
+from profiler import Profiler, _bin
+
+
+class FakeClock:
+    """替换 profiler 模块里的 time，时间只在 advance 时前进"""
+    def __init__(self):
+        self.us = 0
+
+    def advance(self, us):
+        self.us += us
+
+    def ticks_us(self):
+        return self.us
+
+    def ticks_ms(self):
+        return self.us // 1000
+
+    def ticks_diff(self, a, b):
+        return a - b
+
+
+def _profiler(monkeypatch, **kwargs):
+    clock = FakeClock()
+    monkeypatch.setattr(profiler, "time", clock)
+    return Profiler(("detect", "draw"), **kwargs), clock
+
+
+def test_marks_accumulate_per_stage(monkeypatch):
+    prof, clock = _profiler(monkeypatch)
+    prof.start()
+    clock.advance(300)
+    prof.mark("detect")
+    clock.advance(100)
+    prof.mark("draw")
+    clock.advance(200)
+    prof.mark("detect")      # 同一阶段一帧内第二次标记，耗时累加
+    clock.advance(50)
+    assert prof.end() == 650
+    detect, draw, other, frame = (prof.stages.index(s) for s in ("detect", "draw", "other", "frame"))
+    assert prof.last[detect] == 500
+    assert prof.last[draw] == 100
+    assert prof.last[other] == 50
+    assert prof.last[frame] == 650
+
+
+def test_unvisited_stage_keeps_last_value(monkeypatch):
+    prof, clock = _profiler(monkeypatch)
+    prof.start()
+    clock.advance(100)
+    prof.mark("draw")
+    prof.end()
+    prof.start()
+    clock.advance(100)
+    prof.mark("detect")
+    prof.end()
+    draw = prof.stages.index("draw")
+    assert prof.last[draw] == 100
+    assert sum(prof.hist[draw]) == 1
+
+
+def test_percentile_and_window_decay(monkeypatch):
+    prof, clock = _profiler(monkeypatch, window=8)
+    for k in range(7):
+        prof.start()
+        clock.advance(1000 if k < 6 else 100000)
+        prof.mark("detect")
+        prof.end()
+    assert _bin(1000) == 9
+    # 6 帧 1ms、1 帧 100ms：p50 取 [512, 1024) 格的上界，p99 被窗口最大值截到 100ms
+    assert prof.percentile("detect", 50) == 1024
+    assert prof.percentile("detect", 99) == 100000
+    prof.start()
+    clock.advance(1000)
+    prof.mark("detect")
+    prof.end()
+    # 第 window 帧结束后直方图减半，最大值重置为最近一帧
+    detect = prof.stages.index("detect")
+    assert sum(prof.hist[detect]) == 3
+    assert prof.peak[detect] == 1000
+
+
+def test_disabled_profiler_records_nothing(monkeypatch):
+    prof, clock = _profiler(monkeypatch, enabled=False)
+    prof.start()
+    clock.advance(100)
+    prof.mark("detect")
+    assert prof.end() == 0
+    assert prof.frames == 0
@@ -0,0 +1,124 @@
+import struct
+
+import pytest
+
+import profiles
+from profiles import ProfileStore
+
+
+def test_encode_decode_roundtrip():
+    values = {"BLACK_GRAY_THRESHOLD": 100, "ASPECT_RATIO": (1.1, 1.8),
+              "LASER_THRESHOLDS": (27, 100, 39, 127, -51, 127), "GAIN": 0.3}
+    raw = profiles.encode({"默认": {"X": 1}, "场地": values}, ["默认", "场地"], "场地")
+    decoded, names, active = profiles.decode(raw)
+    assert names == ["默认", "场地"] and active == "场地"
+    # 浮点按 float64 保存，1.1 读回来仍是 1.1
+    assert decoded["场地"] == values
+    assert decoded["场地"]["ASPECT_RATIO"] == (1.1, 1.8)
+
+
+def test_mixed_tuples_keep_element_types():
+    values = {"ROI": (10, 0.5, -3), "ONE": (2.0,), "EMPTY": (), "F": 1.0, "I": 1}
+    decoded = profiles.decode(profiles.encode({"a": values}, ["a"], "a"))[0]["a"]
+    assert decoded == values
+    assert [type(v) for v in decoded["ROI"]] == [int, float, int]
+    assert type(decoded["ONE"][0]) is float and type(decoded["F"]) is float and type(decoded["I"]) is int
+
+
+def test_rejects_version_1_files():
+    raw = profiles.encode({"a": {"X": 1}}, ["a"], "a")
+    with pytest.raises(ValueError):
+        profiles.decode(raw[:4] + struct.pack('<B', 1) + raw[5:])
+
+
+def test_decode_rejects_bad_files():
+    raw = profiles.encode({"a": {"X": 1}}, ["a"], "a")
+    for bad in (b"", b"XXXX" + raw[4:], raw[:-1], raw + b"\0"):
+        with pytest.raises(ValueError):
+            profiles.decode(bad)
+
+
+def test_store_save_load_and_apply(tmp_path):
+    path = str(tmp_path / "t.prf")
+    store = ProfileStore(path)
+    assert not store.load()
+    store.put("场地", {"BLACK": 90, "CENTER": 130})
+    store.put("强光", {"BLACK": 60}, activate=False)
+    store.save()
+
+    other = ProfileStore(path)
+    assert other.load()
+    target = {"BLACK": 0, "CENTER": 0, "RECT": 2500}
+    assert other.apply(target) == "场地"
+    assert target == {"BLACK": 90, "CENTER": 130, "RECT": 2500}
+    assert other.apply(target, "强光") == "强光" and target["BLACK"] == 60
+    assert other.apply(target, "没有") is None
+
+
+def test_poll_sees_same_size_rewrite(tmp_path):
+    path = str(tmp_path / "t.prf")
+    writer = ProfileStore(path)
+    writer.put("a", {"BLACK": 90})
+    writer.save()
+    reader = ProfileStore(path, poll_ms=1000)
+    reader.load()
+    assert not reader.poll(now=0)
+
+    # 大小不变、在 FAT 的 2 秒时间窗内的改写也要能看到
+    writer.put("a", {"BLACK": 91})
+    writer.save()
+    assert not reader.poll(now=500)          # 还没到 poll_ms
+    assert reader.poll(now=1000)
+    assert reader.get() == {"BLACK": 91}
+    assert not reader.poll(now=2000)
+
+
+def test_poll_reads_only_after_stat_changes(tmp_path, monkeypatch):
+    path = str(tmp_path / "t.prf")
+    writer = ProfileStore(path)
+    writer.put("a", {"BLACK": 90})
+    writer.save()
+    reader = ProfileStore(path, poll_ms=1000)
+    reader.load()
+    reads = []
+    read = reader._read
+    monkeypatch.setattr(reader, "_read", lambda p: reads.append(p) or read(p))
+
+    # 修改时间的精度窗口（2s + poll_ms）过后，stat 不变就不再读文件
+    for t in range(0, 10000, 1000):
+        assert not reader.poll(now=t)
+    assert len(reads) == 4
+
+    # 大小变了的改写随时能看到
+    writer.put("a", {"BLACK": 90, "CENTER": 120})
+    writer.save()
+    assert reader.poll(now=10000)
+    assert reader.get() == {"BLACK": 90, "CENTER": 120}
+
+
+def test_poll_ignores_half_written_file(tmp_path):
+    path = tmp_path / "t.prf"
+    writer = ProfileStore(str(path))
+    writer.put("a", {"BLACK": 90})
+    writer.save()
+    reader = ProfileStore(str(path), poll_ms=0)
+    reader.load()
+    full = path.read_bytes()
+    writer.put("a", {"BLACK": 91})
+    path.write_bytes(profiles.encode(writer.profiles, writer.names, writer.active)[:-3])
+    assert not reader.poll(now=1)
+    assert reader.get() == {"BLACK": 90}
+    path.write_bytes(profiles.encode(writer.profiles, writer.names, writer.active))
+    assert reader.poll(now=2)
+    assert reader.get() == {"BLACK": 91}
+    assert full != path.read_bytes()
+
+
+def test_cli_set_and_show(tmp_path, capsys):
+    path = str(tmp_path / "t.prf")
+    profiles.main(["set", path, "场地", "ASPECT_RATIO=1.1,1.8", "BLACK=90"])
+    out = capsys.readouterr().out
+    assert "* 场地" in out and "ASPECT_RATIO = 1.1, 1.8" in out
+    store = ProfileStore(path)
+    store.load()
+    assert store.get() == {"ASPECT_RATIO": (1.1, 1.8), "BLACK": 90}
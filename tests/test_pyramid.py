@@ -0,0 +1,63 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import image
+import pyramid
+from frame_ctx import FrameContext
+
+
+def _scene(x, y, w, h, width=160, height=120, border=4):
+    """白底上一个黑框"""
+    a = np.full((height, width), 220, np.uint8)
+    a[y:y + h, x:x + w] = 20
+    a[y + border:y + h - border, x + border:x + w - border] = 220
+    return image.Image.from_array(a)
+
+
+def _rects(rects):
+    return sorted(r.rect() for r in rects)
+
+
+@pytest.mark.parametrize("target", [(50, 30, 60, 50), (0, 20, 60, 50), (100, 70, 60, 50)])
+def test_matches_full_search(target):
+    gray = _scene(*target)
+    assert _rects(pyramid.find_rects(gray, 2000)) == _rects(gray.find_rects(threshold=2000))
+    assert target in _rects(pyramid.find_rects(gray, 2000))
+
+
+def test_factor_one_is_a_full_search():
+    gray = _scene(50, 30, 60, 50)
+    assert _rects(pyramid.find_rects(gray, 2000, factor=1)) == _rects(gray.find_rects(threshold=2000))
+
+
+def test_rect_cut_by_an_inner_roi_edge_is_dropped(monkeypatch):
+    gray = _scene(50, 30, 60, 50)
+    # 候选 ROI 只覆盖黑框左半，右边界落在画面内部：截断的矩形不是完整目标
+    monkeypatch.setattr(pyramid, "candidate_rois", lambda *a: [(40, 20, 45, 70)])
+    cut = [r.rect() for r in gray.find_rects(roi=(40, 20, 45, 70), threshold=2000)]
+    assert cut and all(x + w == 85 for x, _, w, _ in cut)
+    assert pyramid.find_rects(gray, 2000) == []
+
+
+def test_pool_writes_into_the_frame_buffer():
+    img = _scene(50, 30, 60, 50)
+    frame = FrameContext().reset(img)
+    gray = frame.gray()
+    calls = []
+
+    def pool(src, x_div, y_div):
+        calls.append((x_div, y_div))
+        return frame.pooled(src, x_div, y_div)
+
+    assert _rects(pyramid.find_rects(gray, 2000, pool=pool)) == _rects(pyramid.find_rects(gray, 2000))
+    allocs = frame.allocs
+    for _ in range(3):
+        frame.reset(img)
+        pyramid.find_rects(frame.gray(), 2000, pool=pool)
+    assert calls == [(2, 2)] * 4
+    assert frame.allocs == allocs
+
+
+def test_overlapping_rois_are_merged():
+    assert pyramid._merge([(0, 0, 10, 10), (30, 30, 5, 5), (5, 5, 10, 10)]) == [(0, 0, 15, 15), (30, 30, 5, 5)]
@@ -0,0 +1,34 @@
+from tracker import MAX_REJECTS, Tracker
+
+
+def test_tracks_constant_velocity():
+    tr = Tracker()
+    for k in range(30):
+        tr.update((100 + 3 * k, 50 - 2 * k), k * 10)
+    vx, vy = tr.velocity()
+    assert abs(vx - 300) < 15 and abs(vy + 200) < 15
+    # 29 帧后位置 (187, -8)，外推 40ms 再走 (12, -8)
+    x, y = tr.predict(40)
+    assert abs(x - 199) <= 2 and abs(y + 16) <= 2
+
+
+def test_coasts_then_drops_after_timeout():
+    tr = Tracker(max_coast_ms=100)
+    tr.update((10, 10), 0)
+    assert tr.update(None, 50)
+    assert tr.valid
+    assert not tr.update(None, 200)
+    assert tr.predict() is None
+
+
+def test_outlier_is_gated_then_reinitialized():
+    tr = Tracker()
+    for k in range(10):
+        tr.update((100, 100), k * 10)
+    t = 100
+    for _ in range(MAX_REJECTS - 1):
+        tr.update((400, 400), t)
+        assert tr.predict() == (100, 100)
+        t += 10
+    tr.update((400, 400), t)
+    assert tr.predict() == (400, 400)
@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import trajectory
+from trajectory import _deviation, _traced
+
+
+def _max_error(path, points, dist=10.0, n=4000):
+    """真实路径上的点到插补轨迹（逐段按角度线性插补）的最大距离"""
+    traced = np.vstack([_traced(a, b, dist, 64) for a, b in zip(points[:-1], points[1:])])
+    return _deviation(path(np.linspace(0, 1, n)), traced)
+
+
+@pytest.mark.parametrize("tol", [0.01, 0.002])
+def test_circle_stays_within_tolerance(tol):
+    path = trajectory.circle(0.6)
+    points, t = trajectory.sample(path, tol)
+    assert np.all(np.diff(t) > 0) and t[0] == 0.0 and t[-1] == 1.0
+    assert _max_error(path, points) <= tol * 1.05
+
+
+def test_looser_tolerance_needs_fewer_points():
+    path = trajectory.circle(0.6)
+    fine, _ = trajectory.sample(path, 0.001)
+    coarse, _ = trajectory.sample(path, 0.01)
+    assert len(coarse) < len(fine)
+    # 圆上 4 个 knot 必须保留
+    assert len(coarse) >= 5
+
+
+def test_polyline_keeps_corners_and_straight_edges():
+    corners = [(0.5, 0.4), (-0.5, 0.4), (-0.5, -0.4), (0.5, -0.4)]
+    path = trajectory.rectangle(corners)
+    points, t = trajectory.sample(path, 0.002)
+    for c in corners:
+        assert np.min(np.hypot(*(points - c).T)) < 1e-9
+    assert _max_error(path, points) <= 0.002 * 1.05
+
+
+def test_motor_steps_drop_repeated_commands():
+    steps = trajectory.to_motor_steps([(0.0, 0.0), (1e-6, 0.0), (0.1, 0.0)])
+    assert steps.tolist() == [[0, 0], [57, 0]]
+
+
+def test_does_not_pull_in_matplotlib():
+    code = "import sys, trajectory; print('matplotlib' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(trajectory.__file__),
+                         capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "False"
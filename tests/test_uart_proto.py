@@ -0,0 +1,37 @@
+from uart_proto import FRAME_SIZE, FrameDecoder, FrameEncoder, crc16
+
+
+def test_crc16_ccitt_false_check_value():
+    assert crc16(b"123456789") == 0x29B1
+
+
+def test_roundtrip_and_clamping():
+    enc = FrameEncoder()
+    dec = FrameDecoder()
+    raw = bytes(enc.encode(1234, 320, 240, -10, 5, 1500.4, 12.34, -56.78))
+    raw += bytes(enc.encode(0x1_0000_0010, 70000, -70000, 0, 0, -5, 0, 0))
+    frames = dec.feed(raw)
+    assert frames[0] == (0, 1234, 320, 240, -10, 5, 1500, 123, -567)
+    assert frames[1] == (1, 0x10, 32767, -32768, 0, 0, 0, 0, 0)
+
+
+def test_resync_after_garbage_and_split_feed():
+    enc = FrameEncoder()
+    frame = bytes(enc.encode(1, 2, 3, 4, 5, 6, 7, 8))
+    dec = FrameDecoder()
+    stream = b"\x55\x00garbage" + frame
+    assert dec.feed(stream[:10]) == []
+    out = dec.feed(stream[10:])
+    assert len(out) == 1 and out[0][1] == 1
+    assert dec.resyncs == len(stream) - FRAME_SIZE
+
+
+def test_crc_error_is_dropped():
+    enc = FrameEncoder()
+    bad = bytearray(enc.encode(1, 2, 3, 4, 5, 6, 7, 8))
+    bad[10] ^= 0xFF
+    good = bytes(enc.encode(9, 2, 3, 4, 5, 6, 7, 8))
+    dec = FrameDecoder()
+    out = dec.feed(bytes(bad) + good)
+    assert [f[1] for f in out] == [9]
+    assert dec.crc_errors == 1
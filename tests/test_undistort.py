@@ -0,0 +1,71 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import calib_lens
+import grid_table
+import ik_table
+import undistort
+
+K = (500.0, 500.0, 240.0, 160.0)
+DIST = (-0.2, 0.05, 0.0, 0.0, 0.0)
+
+
+@pytest.fixture(scope="module")
+def table_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("lens") / "lens.udt"
+    nx, ny, data = calib_lens.build(K, DIST, 480, 320, shift=4)
+    path.write_bytes(calib_lens.to_bytes(4, nx, ny, data, (480, 320)))
+    return str(path)
+
+
+def test_both_tables_share_the_grid_lookup(table_path):
+    lens = undistort.load(table_path)
+    assert isinstance(lens, grid_table.GridTable)
+    assert undistort.LensTable.lookup is ik_table.IKTable.lookup is grid_table.GridTable.lookup
+    assert undistort.HEADER == ik_table.HEADER == grid_table.HEADER
+
+
+def test_subpixel_points_match_model(table_path):
+    lens = undistort.load(table_path)
+    rng = np.random.default_rng(0)
+    us = rng.uniform(0, 479, 300)
+    vs = rng.uniform(0, 319, 300)
+    eu, ev = calib_lens.undistort_pixels(us, vs, K, DIST)
+    for u, v, x, y in zip(us, vs, eu, ev):
+        px, py = lens.point(float(u), float(v))
+        assert abs(px - x) < 0.15 and abs(py - y) < 0.15
+
+
+def test_fractional_input_is_interpolated(table_path):
+    lens = undistort.load(table_path)
+    # 畸变最大的角上，半像素的输入应落在两个整像素结果之间
+    x0 = lens.point(10, 20)[0] - 10
+    xh = lens.point(10.5, 20)[0] - 10.5
+    x1 = lens.point(11, 20)[0] - 11
+    assert min(x0, x1) <= xh <= max(x0, x1)
+    assert xh != x0
+
+
+def test_points(table_path):
+    lens = undistort.load(table_path)
+    pts = [(10.25, 20.75), (240, 160)]
+    assert lens.points(pts) == [lens.point(*p) for p in pts]
+    assert lens.point(240, 160) == pytest.approx((240, 160), abs=1 / 16)
+
+
+def test_rejects_ik_table_and_truncated_file(table_path, tmp_path):
+    bad = tmp_path / "ik.udt"
+    raw = open(table_path, "rb").read()
+    bad.write_bytes(b"IKLT" + raw[4:])
+    with pytest.raises(ValueError):
+        undistort.load(str(bad))
+    bad.write_bytes(raw[:-2])
+    with pytest.raises(ValueError):
+        undistort.load(str(bad))
+
+
+def test_rejects_table_for_another_resolution(table_path):
+    assert undistort.load(table_path, (480, 320)).size == (480, 320)
+    with pytest.raises(ValueError, match="480x320"):
+        undistort.load(table_path, (640, 480))
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from osd_layer import OSDLayer
+from widgets import EVENT_UP, Button, Slider, WidgetUI
+
+EVENT_DOWN = 2
+EVENT_MOVE = 3
+
+
+class _Point:
+    def __init__(self, x, y, event):
+        self.x = x
+        self.y = y
+        self.event = event
+
+
+class _Touch:
+    """按顺序返回预设的触摸点，None 表示没有触摸"""
+
+    def __init__(self, script):
+        self.script = list(script)
+
+    def read(self, n=1):
+        p = self.script.pop(0)
+        return [] if p is None else [_Point(*p)]
+
+
+def _ui():
+    ui = WidgetUI(OSDLayer(800, 480), 800, 480)
+    values = {"BLACK": 100}
+    pressed = []
+    changed = []
+    ui.add(Slider("black", "边框黑度", values, "BLACK", 0, 255, 100, 500, 100,
+                  on_change=lambda k, v: changed.append(v)), mode="adjust")
+    ui.add(Button("退出", (620, 260, 150, 60), (200, 50, 50),
+                  on_press=lambda: pressed.append("退出")), mode="adjust")
+    ui.add(Button("返回", (620, 260, 150, 60), (0, 150, 255),
+                  on_press=lambda: pressed.append("返回")), mode="detect")
+    ui.set_mode("adjust")
+    ui.render()
+    return ui, values, pressed, changed
+
+
+def test_hit_index_respects_mode():
+    ui, _, _, _ = _ui()
+    assert ui.widget_at(650, 280).name == "退出"
+    assert ui.widget_at(300, 110).name == "black"
+    assert ui.widget_at(300, 300) is None
+    ui.set_mode("detect")
+    assert ui.widget_at(650, 280).name == "返回"
+    assert ui.widget_at(300, 110) is None
+
+
+def test_slider_follows_drag_outside_its_area():
+    ui, values, _, changed = _ui()
+    tp = _Touch([(300, 100, EVENT_DOWN), (400, 300, EVENT_MOVE), (900, 300, EVENT_MOVE),
+                 (900, 300, EVENT_UP)])
+    for _ in range(4):
+        ui.poll(tp, now=1000)
+    assert values["BLACK"] == 255
+    assert changed == [127, 191, 255]
+    assert ui.layer._dirty["black"]
+
+
+def test_button_fires_once_per_contact_with_debounce():
+    ui, _, pressed, _ = _ui()
+    tp = _Touch([(650, 280, EVENT_DOWN), (650, 280, EVENT_MOVE), None,
+                 (650, 280, EVENT_DOWN), None, (650, 280, EVENT_DOWN)])
+    t0 = time.ticks_ms() + 1000
+    for dt in (0, 10, 20, 50, 60, 200):
+        ui.poll(tp, now=t0 + dt)
+    # 第二次接触距上次触发只有 50ms，被去抖忽略
+    assert pressed == ["退出", "退出"]
+
+
+def test_slider_area_covers_labels():
+    s = Slider("s", "x", {"k": 0}, "k", 0, 10, 100, 500, 100)
+    x, y, w, h = s.area
+    assert x <= 50 and x + w >= 560 and y <= 70
@@ -0,0 +1,153 @@
+"""
+匀速模型卡尔曼跟踪器（激光光斑 / 矩形中心）
+
+每个轴独立的 [位置, 速度] 两状态滤波，全部是标量运算，适合在 K230 上逐帧调用。
+update() 输入本帧测量（丢失时传 None 继续外推），predict(lead_ms) 把位置外推到
+电机指令真正执行的时刻，用来抵消摄像头、处理和串口的延迟。
+
+    tr = Tracker()
+    tr.update((cx, cy), time.ticks_ms())
+    pos = tr.predict(40)          # 40ms 之后的位置，丢失超时返回 None
+    tr.innovation, tr.confidence  # 本次测量与预测之差、置信度 0~1
+"""
+import math
+import time
+
+# ================ 默认参数 ================
+MEAS_NOISE = 4.0        # 测量噪声方差 (像素^2)
+ACCEL_NOISE = 200000.0  # 加速度噪声谱密度 (像素^2/s^3)，越大越信任测量
+MAX_COAST_MS = 200      # 丢失后最多外推的时间
+MAX_SPEED = 3000.0      # 速度上限 (像素/s)，防止外推飞出画面
+GATE = 16.0             # 归一化新息平方和超过此值视为野值
+MAX_REJECTS = 3         # 连续野值次数达到后按新目标重新初始化
+
+
+class _Axis:
+    """单轴 [p, v] 卡尔曼滤波，协方差 [[p00, p01], [p01, p11]]"""
+
+    def __init__(self, pos):
+        self.p = float(pos)
+        self.v = 0.0
+        self.p00 = MEAS_NOISE
+        self.p01 = 0.0
+        self.p11 = MAX_SPEED * MAX_SPEED / 4
+
+    def predict(self, dt, q):
+        self.p += self.v * dt
+        dt2 = dt * dt
+        self.p00 += dt * (2 * self.p01 + dt * self.p11) + q * dt2 * dt / 3
+        self.p01 += dt * self.p11 + q * dt2 / 2
+        self.p11 += q * dt
+
+    def innovation(self, z, r):
+        """返回 (新息, 新息方差)"""
+        return z - self.p, self.p00 + r
+
+    def correct(self, y, s):
+        k0 = self.p00 / s
+        k1 = self.p01 / s
+        self.p += k0 * y
+        self.v += k1 * y
+        if self.v > MAX_SPEED:
+            self.v = MAX_SPEED
+        elif self.v < -MAX_SPEED:
+            self.v = -MAX_SPEED
+        self.p11 -= k1 * self.p01
+        self.p01 -= k0 * self.p01
+        self.p00 -= k0 * self.p00
+
+
+class Tracker:
+    def __init__(self, meas_noise=MEAS_NOISE, accel_noise=ACCEL_NOISE,
+                 max_coast_ms=MAX_COAST_MS, gate=GATE):
+        self.r = meas_noise
+        self.q = accel_noise
+        self.max_coast_ms = max_coast_ms
+        self.gate = gate
+        self.reset()
+
+    def reset(self):
+        self._x = None
+        self._y = None
+        self.t = None            # 状态对应的时刻 (ticks_ms)
+        self.last_seen = None    # 最近一次接受测量的时刻
+        self.innovation = (0.0, 0.0)
+        self.confidence = 0.0
+        self.rejects = 0
+
+    @property
+    def valid(self):
+        return self._x is not None
+
+    @property
+    def coasting_ms(self):
+        if self.last_seen is None or self.t is None:
+            return 0
+        return time.ticks_diff(self.t, self.last_seen)
+
+    def update(self, meas, now=None):
+        """输入本帧测量 (x, y)，丢失时传 None；返回是否仍在跟踪"""
+        now = time.ticks_ms() if now is None else now
+        if self._x is None:
+            if meas is None:
+                return False
+            self._start(meas, now)
+            return True
+
+        dt = time.ticks_diff(now, self.t) / 1000.0
+        if dt > 0:
+            self._x.predict(dt, self.q)
+            self._y.predict(dt, self.q)
+            self.t = now
+
+        if meas is None:
+            return self._coast()
+
+        yx, sx = self._x.innovation(meas[0], self.r)
+        yy, sy = self._y.innovation(meas[1], self.r)
+        nis = yx * yx / sx + yy * yy / sy
+        if nis > self.gate:
+            self.rejects += 1
+            if self.rejects >= MAX_REJECTS:
+                self._start(meas, now)   # 连续野值，认为目标跳变
+                return True
+            return self._coast()
+
+        self.rejects = 0
+        self._x.correct(yx, sx)
+        self._y.correct(yy, sy)
+        self.innovation = (yx, yy)
+        self.confidence = math.exp(-0.5 * nis)
+        self.last_seen = now
+        return True
+
+    def _start(self, meas, now):
+        self._x = _Axis(meas[0])
+        self._y = _Axis(meas[1])
+        self.t = now
+        self.last_seen = now
+        self.innovation = (0.0, 0.0)
+        self.confidence = 0.5
+        self.rejects = 0
+
+    def _coast(self):
+        coast = self.coasting_ms
+        if coast > self.max_coast_ms:
+            self.reset()
+            return False
+        self.confidence *= 1.0 - coast / self.max_coast_ms
+        return True
+
+    def velocity(self):
+        """(vx, vy)，像素/s"""
+        if self._x is None:
+            return 0.0, 0.0
+        return self._x.v, self._y.v
+
+    def predict(self, lead_ms=0):
+        """外推 lead_ms 之后的位置（整数像素），未跟踪时返回 None"""
+        if self._x is None:
+            return None
+        dt = lead_ms / 1000.0
+        return (int(self._x.p + self._x.v * dt + 0.5),
+                int(self._y.p + self._y.v * dt + 0.5))
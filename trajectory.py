@@ -0,0 +1,201 @@
+"""
+步进云台轨迹：形状定义、曲率自适应采样和批量角度转换
+
+电机在两个指令点之间按角度线性插补，激光在平面上走出的并不是直线弦。
+sample() 以“真实路径到插补轨迹的最大偏差 <= tol”为约束，用尽量少的点
+覆盖整条路径：先二分细化得到足够密的候选点，再贪心地跳过不必要的点。
+
+    python trajectory.py --shape circle --radius 0.6 --tol 0.002
+    python trajectory.py --shape rect --corners="0.5,0.4;-0.5,0.4;-0.5,-0.4;0.5,-0.4" --csv rect.csv
+"""
+import argparse
+import numpy as np
+
+from geometry import angles_to_xy, d as DEFAULT_DISTANCE, xy_to_angles
+
+STEPS_PER_DEGREE = 100   # 与 dianji.py 一致
+
+
+# ================ 形状 ================
+class Path:
+    """参数曲线 t∈[0, 1] -> 平面 (x, y)；knots 是必须保留的参数点（折线拐角等）"""
+
+    def __init__(self, fn, knots=(0.0, 1.0), closed=False):
+        self.fn = fn
+        self.knots = np.unique(np.clip(np.asarray(knots, np.float64), 0.0, 1.0))
+        self.closed = closed
+
+    def __call__(self, t):
+        return self.fn(np.asarray(t, np.float64))
+
+
+def circle(radius, center=(0.0, 0.0)):
+    cx, cy = center
+    return Path(lambda t: np.stack([cx + radius * np.cos(2 * np.pi * t),
+                                    cy + radius * np.sin(2 * np.pi * t)], axis=-1),
+                knots=(0.0, 0.25, 0.5, 0.75, 1.0), closed=True)
+
+
+def polyline(points, closed=False):
+    pts = np.asarray(points, np.float64)
+    if closed:
+        pts = np.vstack([pts, pts[:1]])
+    seg = np.hypot(*np.diff(pts, axis=0).T)
+    knots = np.concatenate([[0.0], np.cumsum(seg)]) / max(seg.sum(), 1e-12)
+
+    def fn(t):
+        i = np.clip(np.searchsorted(knots, t, "right") - 1, 0, len(seg) - 1)
+        u = (t - knots[i]) / np.maximum(knots[i + 1] - knots[i], 1e-12)
+        return pts[i] + (pts[i + 1] - pts[i]) * u[..., None]
+
+    return Path(fn, knots=knots, closed=closed)
+
+
+def rectangle(corners):
+    """由四个检测角点构成的闭合矩形（角点按绕中心的角度排序，与检测顺序无关）"""
+    pts = np.asarray(corners, np.float64)
+    c = pts.mean(axis=0)
+    order = np.argsort(np.arctan2(pts[:, 1] - c[1], pts[:, 0] - c[0]))
+    return polyline(pts[order], closed=True)
+
+
+def sine(amplitude, wavelength, length, phase=0.0, start=(0.0, 0.0), angle=0.0):
+    """沿 angle 方向、从 start 出发、总长 length 的正弦曲线"""
+    ca, sa = np.cos(angle), np.sin(angle)
+    sx, sy = start
+
+    def fn(t):
+        u = t * length
+        v = amplitude * np.sin(2 * np.pi * u / wavelength + phase)
+        return np.stack([sx + u * ca - v * sa, sy + u * sa + v * ca], axis=-1)
+
+    return Path(fn)
+
+
+# ================ 角度映射 ================
+def _traced(p0, p1, dist, n=32):
+    """两指令点之间电机按角度线性插补时激光在平面上的轨迹，(n+1, 2)"""
+    a0, b0 = xy_to_angles(p0[0], p0[1], dist)
+    a1, b1 = xy_to_angles(p1[0], p1[1], dist)
+    s = np.linspace(0.0, 1.0, n + 1)
+    x, y = angles_to_xy(a0 + (a1 - a0) * s, b0 + (b1 - b0) * s, dist)
+    return np.stack([x, y], axis=1)
+
+
+def _deviation(points, curve):
+    """points (k, 2) 到折线 curve (m, 2) 的最大距离"""
+    a = curve[:-1][None]
+    ab = (curve[1:] - curve[:-1])[None]
+    ap = points[:, None] - a
+    u = np.clip((ap * ab).sum(-1) / np.maximum((ab * ab).sum(-1), 1e-18), 0.0, 1.0)
+    dist = np.hypot(*(ap - ab * u[..., None]).transpose(2, 0, 1))
+    return float(dist.min(axis=1).max()) if len(points) else 0.0
+
+
+# ================ 自适应采样 ================
+def _refine(path, tol, dist, max_iter=24):
+    """二分细化：每段中点及四分点到插补轨迹的偏差都小于 tol/4 为止"""
+    t = path.knots.copy()
+    for _ in range(max_iter):
+        t0, t1 = t[:-1], t[1:]
+        p0, p1 = path(t0), path(t1)
+        a0, b0 = xy_to_angles(p0[:, 0], p0[:, 1], dist)
+        a1, b1 = xy_to_angles(p1[:, 0], p1[:, 1], dist)
+        err = np.zeros(len(t0))
+        for s in (0.25, 0.5, 0.75):
+            true = path(t0 + (t1 - t0) * s)
+            x, y = angles_to_xy(a0 + (a1 - a0) * s, b0 + (b1 - b0) * s, dist)
+            err = np.maximum(err, np.hypot(true[:, 0] - x, true[:, 1] - y))
+        bad = err > tol / 4
+        if not bad.any():
+            break
+        t = np.sort(np.concatenate([t, 0.5 * (t0[bad] + t1[bad])]))
+    return t
+
+
+def sample(path, tol, dist=None):
+    """
+    返回满足偏差约束的最少指令点 (N, 2) 及其参数 t
+    tol: 平面上允许的最大偏差（与坐标同单位）
+    """
+    dist = DEFAULT_DISTANCE if dist is None else dist
+    t = _refine(path, tol, dist)
+    fine = path(t)
+    keep_knot = np.isin(t, path.knots)
+    keep = [0]
+    a = 0
+    n = len(t)
+    while a < n - 1:
+        # 倍增 + 二分，找到从 a 出发仍满足偏差约束的最远点 b（不能跨越拐角）
+        limit = a + 1
+        while limit < n - 1 and not keep_knot[limit]:
+            limit += 1
+        lo, step = a + 1, 1
+        while lo + step <= limit and _deviation(fine[a + 1:lo + step], _traced(fine[a], fine[lo + step], dist)) <= tol:
+            lo += step
+            step *= 2
+        hi = min(lo + step, limit + 1)
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if _deviation(fine[a + 1:mid], _traced(fine[a], fine[mid], dist)) <= tol:
+                lo = mid
+            else:
+                hi = mid
+        keep.append(lo)
+        a = lo
+    idx = np.array(keep)
+    return fine[idx], t[idx]
+
+
+def to_angles(points, dist=None):
+    """批量转换为 (alpha, beta)，单位弧度"""
+    dist = DEFAULT_DISTANCE if dist is None else dist
+    pts = np.asarray(points, np.float64)
+    return xy_to_angles(pts[:, 0], pts[:, 1], dist)
+
+
+def to_motor_steps(points, dist=None, steps_per_degree=STEPS_PER_DEGREE):
+    """
+    转换为电机脉冲 (yaw, pitch) 整数数组，并去掉量化后与上一条相同的指令
+    返回: (N, 2) int32
+    """
+    alpha, beta = to_angles(points, dist)
+    steps = np.rint(np.degrees(np.stack([beta, alpha], axis=1)) * steps_per_degree).astype(np.int32)
+    if len(steps) < 2:
+        return steps
+    changed = np.r_[True, np.any(np.diff(steps, axis=0) != 0, axis=1)]
+    return steps[changed]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="轨迹自适应采样")
+    parser.add_argument("--shape", choices=["circle", "rect", "polyline", "sine"], default="circle")
+    parser.add_argument("--radius", type=float, default=0.6)
+    parser.add_argument("--corners", help="rect/polyline 顶点，格式 \"x,y;x,y;...\"")
+    parser.add_argument("--amplitude", type=float, default=0.3)
+    parser.add_argument("--wavelength", type=float, default=1.0)
+    parser.add_argument("--length", type=float, default=3.0)
+    parser.add_argument("--tol", type=float, default=0.002, help="平面上允许的偏差")
+    parser.add_argument("--d", type=float, default=DEFAULT_DISTANCE, help="平面距离")
+    parser.add_argument("--csv", help="输出 x,y,alpha_deg,beta_deg")
+    args = parser.parse_args(argv)
+
+    if args.shape == "circle":
+        path = circle(args.radius)
+    elif args.shape == "sine":
+        path = sine(args.amplitude, args.wavelength, args.length, start=(-args.length / 2, 0.0))
+    else:
+        pts = [tuple(float(v) for v in c.split(",")) for c in (args.corners or "").split(";") if c]
+        path = rectangle(pts) if args.shape == "rect" else polyline(pts)
+
+    points, _ = sample(path, args.tol, args.d)
+    alpha, beta = to_angles(points, args.d)
+    steps = to_motor_steps(points, args.d)
+    print(f"{args.shape}: {len(points)} points, {len(steps)} motor commands (tol={args.tol})")
+    if args.csv:
+        np.savetxt(args.csv, np.column_stack([points, np.degrees(alpha), np.degrees(beta)]),
+                   delimiter=",", fmt="%.6f", header="x,y,alpha_deg,beta_deg", comments="")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,15 @@ from media.sensor import *
 from media.display import *
 from media.media import *
 from machine import TOUCH
+from frame_ctx import FrameContext
+from blackbox import Blackbox, INFO, EV_DETECT, EV_THRESH
+from profiler import Profiler
+from gcpolicy import GCPolicy
+from osd_layer import OSDLayer
+from widgets import WidgetUI, Slider, Button
+from profiles import ProfileStore
+from autothresh import AutoThreshold
+import pyramid
 
 # ================ 系统配置 ================
 DISPLAY_WIDTH = 800
@@ -39,14 +48,46 @@ THRESHOLD_CONFIG = {
 FUNCTION_BUTTONS = {
     "重置": {"rect": (620, 100, 150, 60), "color": (255, 165, 0)},  # 橙色
     "保存": {"rect": (620, 180, 150, 60), "color": (0, 200, 0)},    # 绿色
-    "退出": {"rect": (620, 260, 150, 60), "color": (200, 50, 50)}   # 红色
+    "退出": {"rect": (620, 260, 150, 60), "color": (200, 50, 50)},  # 红色
+    "方案": {"rect": (620, 340, 150, 60), "color": (120, 80, 200)}   # 紫色，依次切换阈值方案
 }
+BACK_BUTTON = {"rect": (620, 400, 150, 60), "color": (0, 150, 255)}
+PROFILE_AREA = (0, 200, 300, 240)    # 检测模式下点击耗时叠加层打印统计表
+# 静态部件的绘制区域，OSD 图层重画时只清除脏部件的区域
+PANEL_AREA = (20, 20, 530, 430)          # 标题和滑块背景
+PROFILE_NAME_AREA = (600, 50, 200, 40)
+LABELS_AREA = (20, 60, 400, 110)         # 检测模式的阈值文字
+
+# 滑块布局：滑轨左右端、第一个滑块的 y、相邻滑块间距
+SLIDER_X1, SLIDER_X2 = 100, 500
+SLIDER_Y0, SLIDER_GAP = 100, 120
+
+# ================ 阈值方案 ================
+THRESHOLD_PROFILE_PATH = "/sdcard/thresholds.prf"   # serial2.py / dianji.py 开机读取同一文件
+THRESHOLD_PROFILE_NAMES = ("默认", "场地", "强光")  # 方案按钮依次切换的名称
 
 # ================ 全局变量 ================
 sensor = None
 tp = None
 current_values = {key: cfg["default"] for key, cfg in THRESHOLD_CONFIG.items()}
 adjust_mode = True  # 默认进入调整模式
+frame = FrameContext()   # 每帧的灰度图等中间结果
+LOG_LEVEL = INFO         # 低于此级别的记录不写入黑匣子，比赛时可改为 WARN
+bb = Blackbox(level=LOG_LEVEL)
+PROFILE = True           # 逐阶段计时，比赛时可关闭
+prof = Profiler(("snapshot", "touch", "gray", "find_rects", "filter", "stats", "draw", "show", "gc"),
+                enabled=PROFILE)
+FRAME_BUDGET_MS = 33     # 帧预算，垃圾回收尽量放在预算内的空闲时间
+gcp = GCPolicy(frame_budget_ms=FRAME_BUDGET_MS)
+profile_store = ProfileStore(THRESHOLD_PROFILE_PATH)
+PYRAMID_FACTOR = 2       # 先在 1/2 池化图上找候选再回原图细化，1 为整图搜索
+AUTO_THRESHOLD = False   # 检测模式下用通过检查的矩形 ROI 的直方图跟踪光照，把滑块阈值整体平移
+AUTO_THRESHOLD_WINDOW = 40   # 平移量上限
+auto_thresh = AutoThreshold(initial=(current_values["BLACK_GRAY_THRESHOLD"] +
+                                     current_values["CENTER_GRAY_THRESHOLD"]) // 2,
+                            window=AUTO_THRESHOLD_WINDOW)
+# 界面部件画在独立图层上，叠在摄像头图层之上
+ui = WidgetUI(OSDLayer(DISPLAY_WIDTH, DISPLAY_HEIGHT), DISPLAY_WIDTH, DISPLAY_HEIGHT)
 
 def camera_init():
     global sensor, tp
@@ -58,8 +99,9 @@ def camera_init():
         sensor.set_pixformat(Sensor.RGB565)
 
         # 初始化显示
-        Display.init(Display.ST7701, width=DISPLAY_WIDTH, height=DISPLAY_HEIGHT, fps=15)
+        Display.init(Display.ST7701, width=DISPLAY_WIDTH, height=DISPLAY_HEIGHT, osd_num=2, fps=15)
         MediaManager.init()
+        ui_init()
 
         # 初始化触摸屏
         tp = TOUCH(0)
@@ -79,96 +121,120 @@ def camera_deinit():
     except Exception as e:
         print(f"Camera deinit error: {e}")
 
-def draw_threshold_sliders(img):
-    """绘制阈值调节滑块"""
-    # 绘制标题
+def draw_panel(img):
+    """调整模式的标题和滑块区域背景"""
     img.draw_string(20, 20, "阈值调节面板", color=(255, 255, 0), scale=3)
-
-    # 绘制滑块区域背景
     img.draw_rectangle(50, 50, 500, 400, color=(30, 30, 30), fill=True, alpha=150)
 
-    # 绘制每个阈值滑块
-    for i, (key, cfg) in enumerate(THRESHOLD_CONFIG.items()):
-        y_pos = 100 + i * 120
-        track_x1, track_x2 = 100, 500
-
-        # 计算滑块位置
-        ratio = (current_values[key] - cfg["min_val"]) / (cfg["max_val"] - cfg["min_val"])
-        thumb_x = track_x1 + int(ratio * (track_x2 - track_x1))
-
-        # 绘制参数名称
-        img.draw_string(track_x1, y_pos - 30,
-                       f"{cfg['name']}: {current_values[key]}",
-                       color=(255, 255, 255), scale=2.5)
-
-        # 绘制滑轨
-        img.draw_line(track_x1, y_pos, track_x2, y_pos,
-                     color=(200, 200, 200), thickness=10)
-
-        # 绘制滑块
-        img.draw_circle(thumb_x, y_pos, 25, color=cfg["color"], fill=True)
-
-        # 绘制最小值/最大值标签
-        img.draw_string(track_x1 - 50, y_pos + 15, str(cfg["min_val"]),
-                       color=(200, 200, 200), scale=1.5)
-        img.draw_string(track_x2 + 20, y_pos + 15, str(cfg["max_val"]),
-                       color=(200, 200, 200), scale=1.5)
-
-def draw_function_buttons(img):
-    """绘制功能按钮"""
-    for name, btn in FUNCTION_BUTTONS.items():
-        # 绘制按钮背景
-        img.draw_rectangle(btn["rect"][0], btn["rect"][1],
-                          btn["rect"][2], btn["rect"][3],
-                          color=btn["color"], fill=True)
-
-        # 绘制按钮文字
-        text_x = btn["rect"][0] + (btn["rect"][2] - len(name)*20) // 2
-        img.draw_string(text_x, btn["rect"][1] + 15,
-                       name, color=(255, 255, 255), scale=2.5)
-
-def handle_touch():
-    """处理触摸事件"""
-    p = tp.read(1)
-    if p == (): return False
-
-    x, y = p[0].x, p[0].y
-    print(f"Touch at ({x}, {y})")  # 调试触摸位置
-
-    # 检查滑块触摸
+def draw_profile_name(img):
+    img.draw_string(600, 50, f"方案: {profile_store.active}", color=(255, 255, 0), scale=2)
+
+def log_thresholds():
+    """阈值变化时写入黑匣子，便于回放时对照检测结果"""
+    bb.log(INFO, EV_THRESH, current_values["BLACK_GRAY_THRESHOLD"],
+           current_values["CENTER_GRAY_THRESHOLD"], current_values["RECT_DETECT_THRESHOLD"])
+
+def gray_thresholds():
+    """(边框阈值, 中心阈值)，自动阈值开启时两者按学习到的偏移平移，间距不变"""
+    black, center = current_values["BLACK_GRAY_THRESHOLD"], current_values["CENTER_GRAY_THRESHOLD"]
+    if AUTO_THRESHOLD:
+        return auto_thresh.shifted(black, center)
+    return black, center
+
+def draw_threshold_labels(img):
+    """检测模式下的当前阈值"""
+    black, center = gray_thresholds()
+    mark = " (自动)" if AUTO_THRESHOLD else ""
+    img.draw_string(20, 60, f"边框阈值: {black}{mark}",
+                   color=(255, 255, 255), scale=2)
+    img.draw_string(20, 100, f"中心阈值: {center}{mark}",
+                   color=(255, 255, 255), scale=2)
+    img.draw_string(20, 140, f"检测灵敏度: {current_values['RECT_DETECT_THRESHOLD']}",
+                   color=(255, 255, 255), scale=2)
+
+def on_slider(key, value):
+    ui.invalidate("labels")
+    log_thresholds()
+
+def on_reset():
+    for key in current_values:
+        current_values[key] = THRESHOLD_CONFIG[key]["default"]
+    print("重置所有阈值")
+    thresholds_changed()
+    log_thresholds()
+
+def on_save():
+    """当前阈值写入当前方案；方案里其他程序用的参数保持不变"""
+    name = profile_store.active
+    profile_store.put(name, current_values)
+    try:
+        size = profile_store.save()
+        print(f"阈值已保存到方案 {name} ({size} 字节)")
+    except OSError as e:
+        print(f"保存失败: {e}")
+
+def on_switch_profile():
+    """切换到下一个方案；已保存的方案立即生效，未保存的沿用当前阈值，保存时新建"""
+    names = list(THRESHOLD_PROFILE_NAMES)
+    names += [n for n in profile_store.names if n not in names]
+    i = names.index(profile_store.active) + 1 if profile_store.active in names else 0
+    name = names[i % len(names)]
+    if profile_store.switch(name):
+        profile_store.apply(current_values)
+        thresholds_changed()
+        log_thresholds()
+    ui.invalidate("profile_name")
+    print(f"切换到方案 {name}")
+
+def load_profiles():
+    """开机读取方案文件并应用当前方案"""
+    t = time.ticks_ms()
+    try:
+        if profile_store.load() and profile_store.apply(current_values):
+            print(f"阈值方案 {profile_store.active} 已加载 ({time.ticks_diff(time.ticks_ms(), t)} ms)")
+            return
+    except ValueError as e:
+        print(f"阈值方案文件损坏: {e}")
+    profile_store.switch(THRESHOLD_PROFILE_NAMES[0])
+    print("使用默认阈值")
+
+def on_exit():
+    global adjust_mode
+    adjust_mode = False
+    # 进入检测时以滑块值作为自动阈值的起点
+    auto_thresh.reset((current_values["BLACK_GRAY_THRESHOLD"] + current_values["CENTER_GRAY_THRESHOLD"]) // 2)
+    print("退出调整模式")
+
+def on_back():
+    global adjust_mode
+    adjust_mode = True
+    print("返回调整模式")
+
+def on_prof_overlay():
+    prof.dump()
+    gcp.dump()
+
+def ui_init():
+    """声明界面部件；几何位置只在这里给出，绘制和触摸命中共用"""
+    ui.add_static("panel", draw_panel, mode="adjust", rect=PANEL_AREA)
+    ui.add_static("profile_name", draw_profile_name, mode="adjust", rect=PROFILE_NAME_AREA)
     for i, (key, cfg) in enumerate(THRESHOLD_CONFIG.items()):
-        y_pos = 100 + i * 120
-        if 100 <= x <= 500 and y_pos - 30 <= y <= y_pos + 30:
-            # 计算新值
-            new_val = int(cfg["min_val"] + (x - 100) / 400 * (cfg["max_val"] - cfg["min_val"]))
-            current_values[key] = max(cfg["min_val"], min(cfg["max_val"], new_val))
-            print(f"{cfg['name']} updated to {current_values[key]}")
-            return True
-
-    # 检查功能按钮触摸
+        ui.add(Slider(key, cfg["name"], current_values, key, cfg["min_val"], cfg["max_val"],
+                      SLIDER_X1, SLIDER_X2, SLIDER_Y0 + i * SLIDER_GAP,
+                      color=cfg["color"], on_change=on_slider), mode="adjust")
+    actions = {"重置": on_reset, "保存": on_save, "退出": on_exit, "方案": on_switch_profile}
     for name, btn in FUNCTION_BUTTONS.items():
-        rect = btn["rect"]
-        if rect[0] <= x <= rect[0] + rect[2] and rect[1] <= y <= rect[1] + rect[3]:
-            if name == "重置":
-                for key in current_values:
-                    current_values[key] = THRESHOLD_CONFIG[key]["default"]
-                print("重置所有阈值")
-            elif name == "保存":
-                print("保存当前阈值设置")
-            elif name == "退出":
-                global adjust_mode
-                adjust_mode = False
-                print("退出调整模式")
-            return True
+        ui.add(Button(name, btn["rect"], btn["color"], on_press=actions[name]), mode="adjust")
+    ui.add_static("labels", draw_threshold_labels, mode="detect", rect=LABELS_AREA)
+    ui.add(Button("prof_overlay", PROFILE_AREA, None, on_press=on_prof_overlay), mode="detect")
+    ui.add(Button("返回调整", BACK_BUTTON["rect"], BACK_BUTTON["color"], on_press=on_back), mode="detect")
 
-    # 检查返回调整按钮（仅在非调整模式下）
-    if not adjust_mode and 620 <= x <= 770 and 400 <= y <= 460:
-        global adjust_mode
-        adjust_mode = True
-        print("返回调整模式")
-        return True
+def thresholds_changed():
+    """阈值被整体改动后重画全部滑块和标签"""
+    for key in THRESHOLD_CONFIG:
+        ui.invalidate(key)
+    ui.invalidate("labels")
 
-    return False
 
 #def detect_outer_rectangle(img):
 #    """使用当前阈值检测外接矩形"""
@@ -235,8 +301,11 @@ def detect_outer_rectangle(img):
     img_height = img.height()
     img_centerx = img_width//2
     img_centery = img_height//2
-    gray = img.to_grayscale()
-    counts = gray.find_rects(threshold=current_values["RECT_DETECT_THRESHOLD"])
+    gray = frame.gray()
+    prof.mark("gray")
+    counts = pyramid.find_rects(gray, current_values["RECT_DETECT_THRESHOLD"],
+                                factor=PYRAMID_FACTOR, pool=frame.pooled)
+    prof.mark("find_rects")
 
     best_rect = None
     max_area = 0
@@ -246,6 +315,7 @@ def detect_outer_rectangle(img):
         if area > max_area:
             max_area = area
             best_rect = r
+    prof.mark("filter")
 
     if best_rect:
         x1, y1 = best_rect.rect()[0], best_rect.rect()[1]
@@ -256,20 +326,23 @@ def detect_outer_rectangle(img):
         border_roi = (x1, y1, best_rect.rect()[2], 5)
         border_gray = gray.get_statistics(roi=border_roi).mean()
         center_gray = gray.get_statistics(roi=(center_x, center_y, 4, 4)).mean()
+        black_threshold, center_threshold = gray_thresholds()
+        prof.mark("stats")
 
-        # 输出格式与第二个程序保持一致
-        print(f"Center gray: {center_gray}, Border gray: {border_gray}")
-
-        if (border_gray < current_values["BLACK_GRAY_THRESHOLD"] and
-            center_gray > current_values["CENTER_GRAY_THRESHOLD"]):
+        if border_gray < black_threshold and center_gray > center_threshold:
+            # 用更新前的阈值判断，只从通过判断的候选学习，新阈值下一帧生效
+            if AUTO_THRESHOLD and auto_thresh.update(gray, roi=best_rect.rect()):
+                ui.invalidate("labels")
+                black, center = gray_thresholds()
+                bb.log(INFO, EV_THRESH, black, center, current_values["RECT_DETECT_THRESHOLD"])
 
             # 计算偏移量
             dx = center_x - img_centerx
             dy = center_y - img_centery
 
-            # 输出坐标信息（与第二个程序相同格式）
-            print(f"Center: ({center_x}, {center_y}), ScreenCenter: ({img_centerx}, {img_centery})")
-            print(f"Offset: ΔX={dx}, ΔY={dy}")
+            # 记录检测结果（替代逐帧print）
+            bb.log(INFO, EV_DETECT, 1, center_x, center_y, dx, dy,
+                   border_gray, center_gray, best_rect.rect()[2])
 
             # 绘制检测结果
             img.draw_rectangle(best_rect.rect(), color=(255,0,0), thickness=2)
@@ -280,7 +353,11 @@ def detect_outer_rectangle(img):
 
             return True
 
-    print("No target detected")  # 未检测到目标时也输出提示
+        bb.log(INFO, EV_DETECT, 0, center_x, center_y, 0, 0,
+               border_gray, center_gray, best_rect.rect()[2])
+        return False
+
+    bb.log(INFO, EV_DETECT, 0)   # 未检测到目标
     return False
 
 def main_loop():
@@ -288,44 +365,42 @@ def main_loop():
     while True:
         fps.tick()
         try:
+            prof.start()
             os.exitpoint()
 
             # 获取图像
             img = sensor.snapshot()
+            frame.reset(img)
+            prof.mark("snapshot")
 
-            # 处理触摸事件
-            handle_touch()
+            # 处理触摸事件（按下/拖动/抬起）
+            ui.poll(tp)
+            prof.mark("touch")
 
-            if adjust_mode:
-                # 调整模式：显示阈值调节界面
-                draw_threshold_sliders(img)
-                draw_function_buttons(img)
-            else:
+            # 静态界面在独立图层上，只在阈值或模式变化时重画
+            ui.set_mode("adjust" if adjust_mode else "detect")
+            ui.render()
+
+            if not adjust_mode:
                 # 检测模式：执行矩形检测
                 if detect_outer_rectangle(img):
                     img.draw_string(20, 20, "检测成功!", color=(0, 255, 0), scale=3)
                 else:
                     img.draw_string(20, 20, "未检测到目标", color=(255, 0, 0), scale=3)
-
-                # 显示当前阈值设置
-                img.draw_string(20, 60, f"边框阈值: {current_values['BLACK_GRAY_THRESHOLD']}",
-                               color=(255, 255, 255), scale=2)
-                img.draw_string(20, 100, f"中心阈值: {current_values['CENTER_GRAY_THRESHOLD']}",
-                               color=(255, 255, 255), scale=2)
-                img.draw_string(20, 140, f"检测灵敏度: {current_values['RECT_DETECT_THRESHOLD']}",
-                               color=(255, 255, 255), scale=2)
-
-                # 绘制返回调整按钮（更醒目的设计）
-                img.draw_rectangle(620, 400, 150, 60, color=(0, 150, 255), fill=True)
-                img.draw_string(635, 415, "返回调整", color=(255, 255, 255), scale=2.5)
+                prof.draw(img, 20, 200)
 
             # 显示帧率
             img.draw_string(DISPLAY_WIDTH - 150, DISPLAY_HEIGHT - 40,
                            f"FPS: {fps.fps():.1f}", color=(255, 255, 255), scale=2)
 
             # 显示图像
-            Display.show_image(img)
-            gc.collect()
+            prof.mark("draw")
+            Display.show_image(img, layer=Display.LAYER_OSD0)
+            prof.mark("show")
+            bb.stream()
+            gcp.poll()
+            prof.mark("gc")
+            prof.end()
 
         except KeyboardInterrupt:
             break
@@ -336,12 +411,16 @@ def main_loop():
 def main():
     os.exitpoint(os.EXITPOINT_ENABLE)
     try:
+        load_profiles()
         camera_init()
         main_loop()
     except Exception as e:
         print(f"Main error: {e}")
     finally:
         camera_deinit()
+        prof.dump()
+        gcp.dump()
+        bb.dump(20)
         print("Program ended")
 
 if __name__ == "__main__":
@@ -0,0 +1,174 @@
+"""
+串口遥测帧（serial2.py -> 下位机）
+
+版本 1 帧格式，多字节字段大端，共 26 字节:
+    0   HEADER      0x55
+    1   VERSION     0x01
+    2   LEN         负载长度 (20)
+    3   SEQ         u16  帧序号，回绕
+    5   TS          u32  图像采集时刻 ticks_ms
+    9   CENTER_X    i16  目标中心（像素）
+    11  CENTER_Y    i16
+    13  DELTA_X     i16  目标中心 - 画面中心（像素）
+    15  DELTA_Y     i16
+    17  DISTANCE    u16  距离 (mm)
+    19  X_MM10      i16  物理坐标 X (0.1mm)
+    21  Y_MM10      i16  物理坐标 Y (0.1mm)
+    23  CRC         u16  CRC-16/CCITT-FALSE（poly 0x1021, init 0xFFFF），覆盖 VERSION..Y_MM10
+    25  FOOTER      0x44
+
+设备端 FrameEncoder 写入预分配缓冲区，不产生内存分配；
+主机端 FrameDecoder 从字节流中解析，遇到错帧按 HEADER/FOOTER 重新同步。
+"""
+import struct
+
+try:
+    from binascii import crc_hqx   # CPython；MicroPython 没有，使用查表实现
+except ImportError:
+    crc_hqx = None
+
+HEADER = 0x55
+FOOTER = 0x44
+VERSION = 1
+
+PAYLOAD = '>HIhhhhHhh'
+PAYLOAD_SIZE = 20
+FRAME_SIZE = 3 + PAYLOAD_SIZE + 3
+_CRC_START = 1                      # CRC 从 VERSION 开始
+_CRC_END = 3 + PAYLOAD_SIZE         # 到负载末尾（不含）
+
+
+# ================ CRC16-CCITT ================
+def _make_table():
+    table = [0] * 256
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        table[i] = crc & 0xFFFF
+    return table
+
+_TABLE = _make_table()
+
+
+def crc16(buf, start=0, end=None, crc=0xFFFF):
+    """buf[start:end] 的 CRC-16/CCITT-FALSE，不做切片拷贝"""
+    if end is None:
+        end = len(buf)
+    table = _TABLE
+    for i in range(start, end):
+        crc = ((crc << 8) & 0xFFFF) ^ table[((crc >> 8) ^ buf[i]) & 0xFF]
+    return crc
+
+
+def _i16(v):
+    v = int(v)
+    return -32768 if v < -32768 else (32767 if v > 32767 else v)
+
+
+def _u16(v):
+    v = int(v)
+    return 0 if v < 0 else (65535 if v > 65535 else v)
+
+
+# ================ 编码（设备端） ================
+class FrameEncoder:
+    def __init__(self):
+        self.buf = bytearray(FRAME_SIZE)
+        self.buf[0] = HEADER
+        self.buf[1] = VERSION
+        self.buf[2] = PAYLOAD_SIZE
+        self.buf[FRAME_SIZE - 1] = FOOTER
+        self.seq = 0
+
+    def encode(self, timestamp, center_x, center_y, delta_x, delta_y,
+               distance_mm, x_mm, y_mm):
+        """写入下一帧并返回缓冲区（每次复用同一个 bytearray）"""
+        buf = self.buf
+        struct.pack_into(PAYLOAD, buf, 3, self.seq, timestamp & 0xFFFFFFFF,
+                         _i16(center_x), _i16(center_y), _i16(delta_x), _i16(delta_y),
+                         _u16(distance_mm), _i16(x_mm * 10), _i16(y_mm * 10))
+        crc = crc16(buf, _CRC_START, _CRC_END)
+        buf[_CRC_END] = crc >> 8
+        buf[_CRC_END + 1] = crc & 0xFF
+        self.seq = (self.seq + 1) & 0xFFFF
+        return buf
+
+
+# ================ 解码（主机端） ================
+class FrameDecoder:
+    """
+    流式解码：feed() 追加任意长度的字节，返回本次解析出的帧元组
+    (seq, timestamp, center_x, center_y, delta_x, delta_y, distance_mm, x_mm10, y_mm10)
+    """
+
+    def __init__(self):
+        self._buf = bytearray()
+        self.frames = 0
+        self.crc_errors = 0
+        self.resyncs = 0           # 因帧头/帧尾不对而丢弃的字节数
+
+    def feed(self, data):
+        buf = self._buf
+        buf += data
+        out = []
+        pos = 0
+        n = len(buf)
+        unpack = struct.Struct(PAYLOAD).unpack_from
+        while True:
+            start = buf.find(HEADER, pos)
+            if start < 0:
+                self.resyncs += n - pos
+                pos = n
+                break
+            self.resyncs += start - pos
+            if n - start < FRAME_SIZE:
+                pos = start
+                break
+            if (buf[start + 1] != VERSION or buf[start + 2] != PAYLOAD_SIZE or
+                    buf[start + FRAME_SIZE - 1] != FOOTER):
+                self.resyncs += 1
+                pos = start + 1
+                continue
+            end = start + _CRC_END
+            if crc_hqx is not None:
+                crc = crc_hqx(bytes(buf[start + 1:end]), 0xFFFF)
+            else:
+                crc = crc16(buf, start + 1, end)
+            if crc != (buf[end] << 8 | buf[end + 1]):
+                self.crc_errors += 1
+                pos = start + 1
+                continue
+            out.append(unpack(buf, start + 3))
+            pos = start + FRAME_SIZE
+        del buf[:pos]
+        self.frames += len(out)
+        return out
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="解析串口抓包中的遥测帧")
+    parser.add_argument("capture", help="原始字节流文件")
+    parser.add_argument("--show", type=int, default=5, help="打印前几帧")
+    args = parser.parse_args(argv)
+
+    dec = FrameDecoder()
+    frames = []
+    with open(args.capture, "rb") as f:
+        while True:
+            chunk = f.read(65536)
+            if not chunk:
+                break
+            frames += dec.feed(chunk)
+    for fr in frames[:args.show]:
+        print(fr)
+    lost = 0
+    for a, b in zip(frames, frames[1:]):
+        lost += (b[0] - a[0] - 1) & 0xFFFF
+    print(f"{dec.frames} frames, {dec.crc_errors} CRC errors, {dec.resyncs} bytes skipped, "
+          f"{lost} missing by sequence number")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+镜头去畸变表（设备端加载器）
+
+由主机上的 calib_lens.py 生成：在像素网格上存放 去畸变坐标 - 原坐标 的偏移，
+查询时做定点双线性插值（grid_table.py，与 ik_table.py 共用）。只校正用到的
+几个点（矩形角点、激光光斑），不对整幅图像重映射；亚像素的角点坐标按小数
+插值，不会被截断到整像素。
+
+文件格式见 grid_table.py，头部 3 个保留字节依次为:
+    shift   网格间距 = 1 << shift（像素）
+    保留 x2
+magic 为 b'UDST'，scale 为每像素对应的 LSB 数，数据按 (dx, dy) 交错。
+
+去畸变后的坐标与 pose.Camera 使用同一组内参，
+所以用了本表时 Camera 的 k1/k2 应设为 0。
+表只对标定时的分辨率有效，各分辨率各用一个文件:
+
+    lens = undistort.load(f"/sdcard/lens_{W}x{H}.udt", (W, H))
+"""
+from grid_table import FRAC_BITS, HEADER, HEADER_SIZE, GridTable, read
+
+MAGIC = b'UDST'
+VERSION = 2
+
+
+class LensTable(GridTable):
+    def __init__(self, shift, x0, y0, nx, ny, scale, data, size=(0, 0)):
+        GridTable.__init__(self, shift, x0, y0, nx, ny, scale, data, size)
+        self._inv = 1.0 / scale
+
+    def point(self, x, y):
+        """去畸变后的像素坐标（浮点）"""
+        dx, dy = self.lookup(x, y)
+        return x + dx * self._inv, y + dy * self._inv
+
+    def points(self, pts):
+        return [self.point(x, y) for x, y in pts]
+
+
+def load(path, size=None):
+    """读取去畸变表文件，格式不对或不是按 size=(宽, 高) 标定的表时抛出 ValueError"""
+    (shift, _, _), wh, x0, y0, nx, ny, scale, data = read(path, MAGIC, VERSION, "lens table", size)
+    return LensTable(shift, x0, y0, nx, ny, scale, data, wh)
@@ -0,0 +1,217 @@
+"""
+触摸界面部件
+
+部件只声明一次几何位置，绘制和命中判断共用同一份数据；部件画在 OSDLayer
+上，只有值变化的部件被标记为脏，重画时只清除并重画它的绘制区域 area。
+
+    ui = WidgetUI(OSDLayer(800, 480), 800, 480)
+    ui.add(Slider("black", "边框黑度", values, "BLACK", 0, 255, 100, 500, 100, on_change=f), mode="adjust")
+    ui.add(Button("退出", (620, 260, 150, 60), (200, 50, 50), on_press=g), mode="adjust")
+    ui.set_mode("adjust")
+    while True:
+        ui.poll(tp)        # 每帧读一次触摸，按 按下/拖动/抬起 分发
+        ui.render()
+
+触摸处理:
+    - 命中通过预先建立的网格索引：每个格子记着与之相交的部件，
+      每次触摸只检查一个格子里的一两个部件
+    - 一次接触（按下到抬起）只触发一次按钮；两次触发间隔小于 debounce_ms 时忽略
+    - 按下时抓住的滑块在拖动中持续跟随，手指移出滑块区域也不丢失
+    - 读不到触摸点或收到 EVENT_UP 即视为抬起
+"""
+import time
+
+EVENT_UP = 1    # 与 machine.TOUCH.EVENT_UP 相同
+
+
+class Widget:
+    def __init__(self, name, rect):
+        self.name = name
+        self.rect = rect          # 命中区域 (x, y, w, h)
+        self.area = rect          # 绘制区域，超出命中区域的部件（文字标签）另行给出
+
+    def contains(self, x, y):
+        rx, ry, rw, rh = self.rect
+        return rx <= x < rx + rw and ry <= y < ry + rh
+
+    def draw(self, img):
+        pass
+
+    def press(self, x, y):
+        """按下，返回是否有变化"""
+        return False
+
+    def drag(self, x, y):
+        """按下后拖动，返回是否有变化"""
+        return False
+
+
+class Button(Widget):
+    def __init__(self, name, rect, color, on_press=None, text=None, scale=2.5):
+        Widget.__init__(self, name, rect)
+        self.color = color
+        self.on_press = on_press
+        self.text = name if text is None else text
+        self.scale = scale
+
+    def draw(self, img):
+        if self.color is None:    # 不可见的热区
+            return
+        x, y, w, h = self.rect
+        img.draw_rectangle(x, y, w, h, color=self.color, fill=True)
+        text_x = x + (w - len(self.text) * 20) // 2
+        img.draw_string(text_x, y + 15, self.text, color=(255, 255, 255), scale=self.scale)
+
+    def press(self, x, y):
+        if self.on_press:
+            self.on_press()
+        return False
+
+
+class Slider(Widget):
+    """水平滑块，值保存在 values[key] 中"""
+
+    def __init__(self, name, label, values, key, min_val, max_val, x1, x2, y,
+                 color=(255, 255, 255), on_change=None, grab=30):
+        Widget.__init__(self, name, (x1 - grab, y - grab, x2 - x1 + 2 * grab, 2 * grab))
+        # 标签在轨道上方 30，最小/最大值标在两端外侧
+        self.area = (x1 - 50, y - 30, x2 - x1 + 110, 66)
+        self.label = label
+        self.values = values
+        self.key = key
+        self.min_val = min_val
+        self.max_val = max_val
+        self.x1 = x1
+        self.x2 = x2
+        self.y = y
+        self.color = color
+        self.on_change = on_change
+
+    def value_at(self, x):
+        x = max(self.x1, min(self.x2, x))
+        return int(self.min_val + (x - self.x1) / (self.x2 - self.x1) * (self.max_val - self.min_val))
+
+    def press(self, x, y):
+        return self.drag(x, y)
+
+    def drag(self, x, y):
+        value = self.value_at(x)
+        if value == self.values[self.key]:
+            return False
+        self.values[self.key] = value
+        if self.on_change:
+            self.on_change(self.key, value)
+        return True
+
+    def draw(self, img):
+        x1, x2, y = self.x1, self.x2, self.y
+        value = self.values[self.key]
+        ratio = (value - self.min_val) / (self.max_val - self.min_val)
+        thumb_x = x1 + int(ratio * (x2 - x1))
+        img.draw_string(x1, y - 30, f"{self.label}: {value}", color=(255, 255, 255), scale=2.5)
+        img.draw_line(x1, y, x2, y, color=(200, 200, 200), thickness=10)
+        img.draw_circle(thumb_x, y, 25, color=self.color, fill=True)
+        img.draw_string(x1 - 50, y + 15, str(self.min_val), color=(200, 200, 200), scale=1.5)
+        img.draw_string(x2 + 20, y + 15, str(self.max_val), color=(200, 200, 200), scale=1.5)
+
+
+class WidgetUI:
+    def __init__(self, layer, width, height, cell=40, debounce_ms=100):
+        self.layer = layer
+        self.width = width
+        self.height = height
+        self.cell = cell
+        self.debounce_ms = debounce_ms
+        self.widgets = {}
+        self.mode = None
+        self._cols = (width + cell - 1) // cell
+        self._rows = (height + cell - 1) // cell
+        self._grids = {}           # 模式 -> 每格的部件列表；None 键存放所有模式都显示的部件
+        self._active = None        # 当前接触抓住的部件
+        self._touching = False
+        self._last_fire = time.ticks_ms()
+
+    def _grid(self, mode):
+        grid = self._grids.get(mode)
+        if grid is None:
+            grid = [None] * (self._cols * self._rows)
+            self._grids[mode] = grid
+        return grid
+
+    def add(self, widget, mode=None):
+        """注册部件并写入网格索引；mode 为 None 时所有模式都显示"""
+        self.widgets[widget.name] = widget
+        self.layer.add(widget.name, widget.draw, mode, widget.area)
+        grid = self._grid(mode)
+        x, y, w, h = widget.rect
+        c0 = max(0, x // self.cell)
+        c1 = min(self._cols - 1, (x + w - 1) // self.cell)
+        r0 = max(0, y // self.cell)
+        r1 = min(self._rows - 1, (y + h - 1) // self.cell)
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                i = r * self._cols + c
+                if grid[i] is None:
+                    grid[i] = [widget]
+                else:
+                    grid[i].append(widget)
+        return widget
+
+    def add_static(self, name, draw, mode=None, rect=None):
+        """不接收触摸的静态部件（标题、背景、文字），rect 为绘制区域"""
+        self.layer.add(name, draw, mode, rect)
+
+    def set_mode(self, mode):
+        if mode != self.mode:
+            self.mode = mode
+            self._active = None
+            self.layer.set_mode(mode)
+
+    def invalidate(self, name=None):
+        self.layer.invalidate(name)
+
+    def widget_at(self, x, y):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        i = (y // self.cell) * self._cols + x // self.cell
+        for mode in (self.mode, None):
+            grid = self._grids.get(mode)
+            cell = grid[i] if grid else None
+            if cell:
+                for w in cell:
+                    if w.contains(x, y):
+                        return w
+        return None
+
+    def poll(self, tp, now=None):
+        """读一次触摸并分发，返回本次是否有部件响应"""
+        points = tp.read(1)
+        if not points or points[0].event == EVENT_UP:
+            self._touching = False
+            self._active = None
+            return False
+        x, y = points[0].x, points[0].y
+        if self._touching:
+            # 同一次接触：只把拖动交给按下时抓住的部件
+            w = self._active
+            if w is not None and w.drag(x, y):
+                self.layer.invalidate(w.name)
+                return True
+            return False
+
+        self._touching = True
+        w = self.widget_at(x, y)
+        self._active = w
+        if w is None:
+            return False
+        if isinstance(w, Button):
+            now = time.ticks_ms() if now is None else now
+            if time.ticks_diff(now, self._last_fire) < self.debounce_ms:
+                return False
+            self._last_fire = now
+        if w.press(x, y):
+            self.layer.invalidate(w.name)
+        return True
+
+    def render(self):
+        return self.layer.render()